@@ -1,3 +1,5 @@
+from datetime import date
+
 from odoo import models, fields, api
 
 class FleetVehicle(models.Model):
@@ -65,22 +67,24 @@ class FleetVehicleOdometer(models.Model):
     @api.model_create_multi
     def create(self, vals_list):
         odometers = super().create(vals_list)
-        for odometer in odometers:
-            odometer.vehicle_id._update_equipment_usage(odometer.value)
+        odometers._update_equipment_usage()
         return odometers
 
     def write(self, vals):
         res = super().write(vals)
         if 'value' in vals:
-            for odometer in self:
-                odometer.vehicle_id._update_equipment_usage(vals['value'])
+            self._update_equipment_usage()
         return res
 
-    # Helper method on vehicle to update equipment
-    def _update_equipment_usage(self, value):
-        # This method should be on fleet.vehicle, but called from here.
-        # Wait, I can't define it here. I'll define it in FleetVehicle above.
-        pass
+    def _update_equipment_usage(self):
+        """ Push the latest odometer value of each vehicle to its equipment,
+        one write per vehicle whatever the size of the batch. """
+        latest_values = {}
+        # Readings are applied oldest first so the latest one of each vehicle wins
+        for odometer in self.sorted(lambda odometer: (odometer.date or date.min, odometer.id)):
+            latest_values[odometer.vehicle_id] = odometer.value
+        for vehicle, value in latest_values.items():
+            vehicle._update_equipment_usage(value)
 
 # Extending FleetVehicle again to add the helper method properly
 class FleetVehicle(models.Model):
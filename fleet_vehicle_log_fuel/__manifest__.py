@@ -4,7 +4,7 @@
 {
     "name": "Fleet Vehicle Log Fuel",
     "summary": "Add Log Fuels for your vehicles.",
-    "version": "19.0.1.0.0",
+    "version": "19.0.1.1.0",
     "category": "Fleet",
     "author": "ForgeFlow, Tecnativa, Odoo Community Association (OCA)",
     "website": "https://github.com/OCA/fleet",
@@ -13,11 +13,14 @@
     "data": [
         "security/ir.model.access.csv",
         "security/fleet_security.xml",
+        "data/ir_cron_data.xml",
         "views/fleet_board_view.xml",
         "views/fleet_vehicle_log_fuel_views.xml",
         "views/product_views.xml",
         "views/fleet_vehicle_views.xml",
+        "views/fleet_vehicle_fuel_analysis_views.xml",
     ],
+    "external_dependencies": {"python": ["numpy"]},
     "installable": True,
     "auto_install": False,
 }
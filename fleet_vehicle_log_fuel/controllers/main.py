@@ -0,0 +1,135 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from odoo import fields, http
+from odoo.http import request
+
+
+class TTLCache:
+    """Small process-wide LRU cache whose entries expire after ``ttl`` seconds.
+
+    Keys embed the version of the data the values are derived from, so any
+    change yields a new key; the TTL only evicts entries nobody asks for
+    anymore.
+    """
+
+    def __init__(self, ttl=300, max_size=4096):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+fill_limit_cache = TTLCache()
+dashboard_cache = TTLCache(ttl=600, max_size=256)
+
+
+def get_fill_limit_preview(env, vehicle_id, odometer=0.0):
+    """Return the memoized fill limit preview of ``vehicle_id``.
+
+    Access to the vehicle is checked with the caller's rights before the
+    cache is consulted.
+    """
+    vehicle = env["fleet.vehicle"].browse(int(vehicle_id)).exists()
+    if not vehicle:
+        return False
+    vehicle.check_access("read")
+    odometer = float(odometer or 0.0)
+    stats = env["fleet.vehicle.fuel.stats"]._get_for_vehicle(vehicle)
+    # The key holds the vehicle's fuel statistics and the validation settings
+    # the limit is derived from.
+    key = (
+        env.cr.dbname,
+        vehicle.id,
+        odometer,
+        vehicle.fuel_tank_capacity,
+        stats.last_log_id.id,
+        stats.last_odometer,
+        stats.last_date_time,
+        stats.lifetime_liter,
+        stats.lifetime_distance,
+        tuple(tuple(fill) for fill in stats.recent_fills or ()),
+        env["fleet.vehicle.log.fuel"]._get_fuel_settings(),
+        env.lang,
+    )
+    preview = fill_limit_cache.get(key)
+    if preview is None:
+        preview = env["fleet.vehicle.log.fuel"]._get_fill_limit_preview(
+            vehicle, odometer
+        )
+        fill_limit_cache.set(key, preview)
+    return preview
+
+
+def get_fuel_dashboard(env, date_from=None):
+    """Return ``(etag, data)`` of the fuel dashboard seen by the env's user.
+
+    The aggregates are cached per user, companies and language, and keyed on
+    the version of the fuel logs so the ETag changes with the data.
+    """
+    Log = env["fleet.vehicle.log.fuel"]
+    Log.check_access("read")
+    date_from = date_from and fields.Date.to_date(date_from)
+    key = (
+        env.cr.dbname,
+        env.uid,
+        tuple(env.companies.ids),
+        env.lang,
+        date_from,
+        *Log._get_fuel_dashboard_version(),
+    )
+    etag = hashlib.sha1(repr(key).encode()).hexdigest()
+    data = dashboard_cache.get(etag)
+    if data is None:
+        domain = [("date", ">=", date_from)] if date_from else []
+        data = Log._get_fuel_dashboard_data(domain)
+        dashboard_cache.set(etag, data)
+    return etag, data
+
+
+class FleetVehicleLogFuelController(http.Controller):
+    @http.route("/fleet_vehicle_log_fuel/fill_limit", type="jsonrpc", auth="user")
+    def fill_limit(self, vehicle_id, odometer=0.0):
+        """Fill limit, its explanation and the expected litres of a new fill,
+        so the pump UI can prefetch them as soon as a vehicle is selected."""
+        return get_fill_limit_preview(request.env, vehicle_id, odometer)
+
+    @http.route(
+        "/fleet_vehicle_log_fuel/dashboard", type="http", auth="user", methods=["GET"]
+    )
+    def dashboard(self, date_from=None):
+        """Fuel totals per fleet category, vehicle model and month in one
+        response, answered with ``304 Not Modified`` while the data is the
+        same as the one the client already holds."""
+        etag, data = get_fuel_dashboard(request.env, date_from)
+        headers = [("ETag", f'"{etag}"'), ("Cache-Control", "private, no-cache")]
+        if request.httprequest.if_none_match.contains(etag):
+            return request.make_response("", headers=headers, status=304)
+        return request.make_json_response(data, headers=headers)
@@ -1,4 +1,9 @@
 from . import fleet_vehicle
 from . import fleet_vehicle_log_fuel
+from . import fleet_vehicle_fuel_stats
+from . import fleet_vehicle_fuel_ledger
+from . import fleet_vehicle_fuel_archive
+from . import fleet_vehicle_fuel_job_cursor
 from . import fleet_service_type
 from . import product
+from . import fleet_vehicle_fuel_analytics
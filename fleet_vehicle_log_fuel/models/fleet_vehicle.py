@@ -15,6 +15,7 @@ class FleetVehicle(models.Model):
         tracking=True,
         help="Maximum fuel tank volume in litres. Used to validate fuel log entries.",
     )
+    fuel_stats_ids = fields.One2many("fleet.vehicle.fuel.stats", "vehicle_id")
 
     @api.depends("log_fuels")
     def _compute_fuel_count(self):
@@ -0,0 +1,211 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import numpy as np
+
+from odoo import api, models
+from odoo.tools import SQL
+
+SERIES_FIELDS = ("id", "vehicle_id", "date_time", "odometer", "liter")
+
+
+class FleetVehicleFuelAnalytics(models.AbstractModel):
+    """Consumption analytics over fuel logs, computed on NumPy arrays.
+
+    The odometer / litre series of the selected logs is loaded with a single
+    query and every statistic is derived in one vectorized pass, so the cost
+    does not depend on the ORM prefetching years of fuel logs.
+    """
+
+    _name = "fleet.vehicle.fuel.analytics"
+    _description = "Fuel consumption analytics"
+
+    @api.model
+    def _fetch_series_rows(self, model_name, domain, id_field="id"):
+        Model = self.env[model_name]
+        Model.flush_model(["vehicle_id", "date_time", "odometer", "liter", "state"])
+        query = Model._search(
+            list(domain) + [("state", "!=", "cancelled")],
+            order=f"vehicle_id, date_time, {id_field}",
+        )
+        columns = [
+            SQL.identifier(query.table, id_field if name == "id" else name)
+            for name in SERIES_FIELDS
+        ]
+        self.env.cr.execute(query.select(*columns))
+        return self.env.cr.fetchall()
+
+    @api.model
+    def _load_series(self, domain, include_archived=False):
+        """Return the non-cancelled fuel logs matching ``domain`` as arrays,
+        ordered by vehicle then fill order.
+
+        :param include_archived: also read the detail rows of the archived
+            logs kept in ``fleet.vehicle.log.fuel.cold``
+        """
+        rows = self._fetch_series_rows("fleet.vehicle.log.fuel", domain)
+        if include_archived:
+            # Archived logs all precede the live ones of their vehicle.
+            rows = sorted(
+                self._fetch_series_rows(
+                    "fleet.vehicle.log.fuel.cold", domain, id_field="log_id"
+                )
+                + rows,
+                key=lambda row: row[1],
+            )
+        ids, vehicle_ids, date_times, odometers, liters = (
+            zip(*rows) if rows else ((),) * len(SERIES_FIELDS)
+        )
+        return {
+            "id": np.array(ids, dtype=np.int64),
+            "vehicle_id": np.array(vehicle_ids, dtype=np.int64),
+            "date_time": np.array(date_times, dtype="datetime64[s]"),
+            "odometer": np.nan_to_num(np.array(odometers, dtype=float)),
+            "liter": np.nan_to_num(np.array(liters, dtype=float)),
+        }
+
+    @api.model
+    def _analyse(self, series, window=5, z_threshold=3.0):
+        """Compute consumption statistics of a series from :meth:`_load_series`.
+
+        :param window: number of fills in the rolling consumption window
+        :param z_threshold: absolute z-score above which a fill is an anomaly
+        :return: dict with per-log arrays (``logs``), per-vehicle statistics
+            (``vehicles``) and per vehicle and month aggregates (``months``)
+        """
+        vehicle = series["vehicle_id"]
+        odometer = series["odometer"]
+        liter = series["liter"]
+        size = len(vehicle)
+        if not size:
+            return {"logs": {}, "vehicles": {}, "months": []}
+        positions = np.arange(size)
+        first = np.r_[True, vehicle[1:] != vehicle[:-1]]
+        group_start = np.maximum.accumulate(np.where(first, positions, 0))
+
+        # Distance since the previous fill; the first fill of a vehicle has no
+        # baseline and, as in ``_compute_consumption``, does not count.
+        distance = np.where(first, 0.0, np.diff(odometer, prepend=odometer[0]))
+        distance = np.clip(distance, 0.0, None)
+        measured = distance > 0
+        measured_liter = np.where(measured, liter, 0.0)
+        rate = np.divide(
+            measured_liter, distance, out=np.zeros(size), where=measured
+        )
+
+        # Rolling consumption over the last ``window`` fills of each vehicle.
+        window_start = np.maximum(positions - max(window, 1) + 1, group_start)
+        cum_liter = np.r_[0.0, np.cumsum(measured_liter)]
+        cum_distance = np.r_[0.0, np.cumsum(distance)]
+        rolling_liter = cum_liter[positions + 1] - cum_liter[window_start]
+        rolling_distance = cum_distance[positions + 1] - cum_distance[window_start]
+        rolling_rate = np.divide(
+            rolling_liter,
+            rolling_distance,
+            out=np.zeros(size),
+            where=rolling_distance > 0,
+        )
+
+        # Per-vehicle distribution of the consumption rate.
+        vehicle_ids, inverse = np.unique(vehicle, return_inverse=True)
+        count = np.bincount(inverse, weights=measured)
+        total_rate = np.bincount(inverse, weights=rate)
+        total_rate_sq = np.bincount(inverse, weights=rate * rate)
+        counted = count > 0
+        mean = np.divide(total_rate, count, out=np.zeros(len(count)), where=counted)
+        mean_sq = np.divide(
+            total_rate_sq, count, out=np.zeros(len(count)), where=counted
+        )
+        variance = mean_sq - mean * mean
+        std = np.sqrt(np.clip(variance, 0.0, None))
+        deviation = std[inverse]
+        zscore = np.divide(
+            rate - mean[inverse],
+            deviation,
+            out=np.zeros(size),
+            where=measured & (deviation > 0),
+        )
+        anomaly = measured & (np.abs(zscore) > z_threshold)
+        lifetime_liter = np.bincount(inverse, weights=measured_liter)
+        lifetime_distance = np.bincount(inverse, weights=distance)
+
+        # Logs are sorted by vehicle, so each vehicle is a contiguous slice.
+        bounds = np.r_[np.flatnonzero(first), size]
+        vehicles = {}
+        for index, vehicle_id in enumerate(vehicle_ids.tolist()):
+            segment = slice(bounds[index], bounds[index + 1])
+            rates = rate[segment][measured[segment]]
+            p10, p50, p90 = (
+                np.percentile(rates, [10, 50, 90]) if len(rates) else (0.0,) * 3
+            )
+            vehicles[vehicle_id] = {
+                "fill_count": int(bounds[index + 1] - bounds[index]),
+                "measured_count": int(count[index]),
+                "liter": float(np.sum(liter[segment])),
+                "distance": float(lifetime_distance[index]),
+                "avg_rate": (
+                    float(lifetime_liter[index] / lifetime_distance[index])
+                    if lifetime_distance[index] > 0
+                    else 0.0
+                ),
+                "mean_rate": float(mean[index]),
+                "std_rate": float(std[index]),
+                "p10_rate": float(p10),
+                "p50_rate": float(p50),
+                "p90_rate": float(p90),
+                "anomaly_count": int(np.count_nonzero(anomaly[segment])),
+            }
+
+        # Per vehicle and month aggregates.
+        month = series["date_time"].astype("datetime64[M]")
+        keys, month_inverse = np.unique(
+            np.stack([vehicle, month.astype(np.int64)], axis=1),
+            axis=0,
+            return_inverse=True,
+        )
+        month_inverse = month_inverse.ravel()
+        month_liter = np.bincount(month_inverse, weights=liter)
+        month_measured_liter = np.bincount(month_inverse, weights=measured_liter)
+        month_distance = np.bincount(month_inverse, weights=distance)
+        month_fills = np.bincount(month_inverse)
+        month_anomalies = np.bincount(month_inverse, weights=anomaly)
+        months = []
+        for index, (vehicle_id, month_value) in enumerate(keys.tolist()):
+            months.append(
+                {
+                    "vehicle_id": vehicle_id,
+                    "month": np.datetime64(month_value, "M")
+                    .astype("datetime64[D]")
+                    .item(),
+                    "fill_count": int(month_fills[index]),
+                    "liter": float(month_liter[index]),
+                    "distance": float(month_distance[index]),
+                    "consumption_rate": (
+                        float(month_measured_liter[index] / month_distance[index])
+                        if month_distance[index] > 0
+                        else 0.0
+                    ),
+                    "anomaly_count": int(month_anomalies[index]),
+                }
+            )
+
+        return {
+            "logs": {
+                "id": series["id"],
+                "distance": distance,
+                "consumption_rate": rate,
+                "rolling_rate": rolling_rate,
+                "zscore": zscore,
+                "anomaly": anomaly,
+            },
+            "vehicles": vehicles,
+            "months": months,
+        }
+
+    @api.model
+    def analyse(self, domain, window=5, z_threshold=3.0, include_archived=False):
+        """Load and analyse the fuel logs matching ``domain``."""
+        return self._analyse(
+            self._load_series(domain, include_archived=include_archived),
+            window=window,
+            z_threshold=z_threshold,
+        )
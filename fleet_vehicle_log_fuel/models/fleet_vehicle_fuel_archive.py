@@ -0,0 +1,115 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+
+class FleetVehicleFuelArchive(models.Model):
+    """Lifetime aggregates of the archived fuel logs of a vehicle.
+
+    Besides the totals the hot statistics add up with the live logs, it keeps
+    the last archived fill so the first live fill still has a predecessor.
+    """
+
+    _name = "fleet.vehicle.fuel.archive"
+    _description = "Archived fuel totals per vehicle"
+    _rec_name = "vehicle_id"
+
+    vehicle_id = fields.Many2one(
+        "fleet.vehicle", required=True, ondelete="cascade", readonly=True
+    )
+    archived_until = fields.Datetime(
+        readonly=True, help="Fuel logs before this date have been archived."
+    )
+    fill_count = fields.Integer(string="Fills", readonly=True)
+    liter = fields.Float(
+        string="Litres", readonly=True, help="Litres of every archived fill."
+    )
+    measured_liter = fields.Float(
+        string="Measured Litres",
+        readonly=True,
+        help="Litres of the archived fills with a measured distance.",
+    )
+    distance = fields.Float(readonly=True)
+    amount = fields.Float(string="Cost", readonly=True)
+    rate_count = fields.Integer(readonly=True)
+    rate_sum = fields.Float(readonly=True)
+    rate_sq_sum = fields.Float(readonly=True)
+    last_log_id = fields.Integer(
+        string="Last Archived Log ID",
+        readonly=True,
+        help="Identifier of the last archived fill, kept as a plain value as "
+        "the log itself no longer exists.",
+    )
+    last_odometer = fields.Float(readonly=True)
+    last_date = fields.Date(readonly=True)
+    last_date_time = fields.Datetime(readonly=True)
+
+    _vehicle_uniq = models.Constraint(
+        "UNIQUE(vehicle_id)",
+        "Only one fuel archive row per vehicle is allowed.",
+    )
+
+    @api.model
+    def _get_for_vehicle(self, vehicle):
+        if not vehicle:
+            return self.browse()
+        return self.sudo().search([("vehicle_id", "=", vehicle.id)], limit=1)
+
+
+class FleetVehicleFuelArchiveMonth(models.Model):
+    _name = "fleet.vehicle.fuel.archive.month"
+    _description = "Archived fuel logs per vehicle and month"
+    _order = "date_start desc, vehicle_id"
+
+    vehicle_id = fields.Many2one(
+        "fleet.vehicle", required=True, ondelete="cascade", readonly=True
+    )
+    date_start = fields.Date(string="Month", required=True, readonly=True)
+    fill_count = fields.Integer(string="Fills", readonly=True)
+    liter = fields.Float(string="Litres", readonly=True)
+    measured_liter = fields.Float(string="Measured Litres", readonly=True)
+    distance = fields.Float(readonly=True)
+    amount = fields.Float(string="Cost", readonly=True)
+
+    _vehicle_month_uniq = models.Constraint(
+        "UNIQUE(vehicle_id, date_start)",
+        "Only one fuel archive row per vehicle and month is allowed.",
+    )
+
+
+class FleetVehicleLogFuelCold(models.Model):
+    """Detail rows of archived fuel logs, kept out of the live table.
+
+    Only the columns the reports and analytics read are kept. They are not
+    part of any hot-path query and are only read when explicitly asked for.
+    """
+
+    _name = "fleet.vehicle.log.fuel.cold"
+    _description = "Archived fuel log"
+    _order = "date_time desc, id desc"
+    _rec_name = "log_id"
+
+    log_id = fields.Integer(string="Original Log ID", readonly=True, index=True)
+    vehicle_id = fields.Many2one(
+        "fleet.vehicle", "Vehicle", ondelete="cascade", readonly=True
+    )
+    category_id = fields.Many2one(
+        related="vehicle_id.category_id", string="Fleet Category", store=True
+    )
+    company_id = fields.Many2one("res.company", "Company", readonly=True)
+    product_id = fields.Many2one("product.product", "Fuel Product", readonly=True)
+    location_id = fields.Many2one("stock.location", "Source Location", readonly=True)
+    date = fields.Date(readonly=True)
+    date_time = fields.Datetime(string="Date & Time", readonly=True)
+    state = fields.Char(readonly=True)
+    active = fields.Boolean(readonly=True)
+    odometer = fields.Float(readonly=True)
+    liter = fields.Float(string="Litres", readonly=True)
+    price_per_liter = fields.Float(readonly=True)
+    amount = fields.Float(string="Cost", readonly=True)
+    distance = fields.Float(readonly=True)
+    consumption_rate = fields.Float(readonly=True)
+    pump_meter = fields.Float(readonly=True)
+    physical_pump_reading = fields.Float(readonly=True)
+
+    _vehicle_date_time_idx = models.Index("(vehicle_id, date_time, log_id)")
@@ -0,0 +1,51 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class FleetVehicleFuelJobCursor(models.Model):
+    """Position reached by an incremental fuel job, such as the id of the last
+    fuel log checked for anomalies.
+
+    Kept out of ``ir.config_parameter``, whose writes clear the ormcache of
+    every worker.
+    """
+
+    _name = "fleet.vehicle.fuel.job.cursor"
+    _description = "Fuel job cursor"
+
+    name = fields.Char(required=True, readonly=True)
+    last_id = fields.Integer(string="Last Processed ID", readonly=True)
+
+    _name_uniq = models.Constraint(
+        "UNIQUE(name)",
+        "Only one cursor per fuel job is allowed.",
+    )
+
+    @api.model
+    def _get_position(self, name):
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                "SELECT last_id FROM fleet_vehicle_fuel_job_cursor WHERE name = %s",
+                name,
+            )
+        )
+        row = self.env.cr.fetchone()
+        return row[0] if row else 0
+
+    @api.model
+    def _set_position(self, name, last_id):
+        self.env.cr.execute(
+            SQL(
+                """
+                INSERT INTO fleet_vehicle_fuel_job_cursor (name, last_id)
+                VALUES (%s, %s)
+                ON CONFLICT (name) DO UPDATE SET last_id = EXCLUDED.last_id
+                """,
+                name,
+                last_id,
+            )
+        )
+        self.invalidate_model(["last_id"])
@@ -0,0 +1,237 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class FleetVehicleFuelLedger(models.Model):
+    """Running totals of the fills of each vehicle.
+
+    One row per dated, active and non-cancelled fuel log, in fill order. New
+    fills are appended from the vehicle's last row; when an older fill is
+    inserted, changed or removed, the rows from that point on are dropped and
+    rebuilt from the fuel logs. The rows of archived fills have no log to be
+    rebuilt from, so they are never dropped: they stay the base the live rows
+    accumulate from. The latest row of a vehicle is its current state.
+    """
+
+    _name = "fleet.vehicle.fuel.ledger"
+    _description = "Fuel ledger per vehicle"
+    _order = "vehicle_id, sequence desc"
+    _rec_name = "log_id"
+
+    vehicle_id = fields.Many2one(
+        "fleet.vehicle", required=True, ondelete="cascade", readonly=True
+    )
+    # Rows of archived fills outlive their log, so that the running totals
+    # keep accumulating from them.
+    log_id = fields.Many2one(
+        "fleet.vehicle.log.fuel",
+        "Fuel Log",
+        index=True,
+        ondelete="set null",
+        readonly=True,
+    )
+    sequence = fields.Integer(
+        readonly=True, help="Position of the fill in the vehicle's history."
+    )
+    date_time = fields.Datetime(string="Date & Time", readonly=True)
+    liter = fields.Float(string="Litres", readonly=True)
+    distance = fields.Float(readonly=True)
+    cumulative_liter = fields.Float(string="Cumulative Litres", readonly=True)
+    cumulative_distance = fields.Float(readonly=True)
+    tank_level = fields.Float(
+        string="Estimated Tank Level (L)",
+        readonly=True,
+        help="Estimated level after the fill: previous level, minus the "
+        "distance driven at the fill's average consumption rate, plus the "
+        "litres filled, capped by the tank capacity. The rate is the one the "
+        "fill had when its row was written; rows are only rewritten when an "
+        "earlier fill changes, so the estimate of older fills may rely on "
+        "rates that have changed since.",
+    )
+
+    _vehicle_sequence_uniq = models.Constraint(
+        "UNIQUE(vehicle_id, sequence)",
+        "The ledger sequence must be unique per vehicle.",
+    )
+    _vehicle_date_time_idx = models.Index("(vehicle_id, date_time, log_id)")
+
+    def init(self):
+        # Build the ledger of the existing fuel logs on installation.
+        self.env.cr.execute("SELECT 1 FROM fleet_vehicle_fuel_ledger LIMIT 1")
+        if self.env.cr.rowcount:
+            return
+        self.env.cr.execute("SELECT DISTINCT vehicle_id FROM fleet_vehicle_log_fuel")
+        vehicle_ids = [row[0] for row in self.env.cr.fetchall()]
+        if vehicle_ids:
+            self._append(vehicle_ids)
+
+    @api.model
+    def _rewind(self, positions):
+        """Bring the ledger in line with the fuel logs.
+
+        :param positions: iterable of ``(vehicle_id, date_time, log_id)`` of
+            the fills that were created, changed or removed; the rows of each
+            vehicle from its earliest position on are rebuilt, which is a
+            plain append when the fills are the vehicle's latest ones.
+
+        The row of a removed fill has lost its ``log_id`` by the time it is
+        rewound, so rows without a log at the position itself are dropped too.
+        Rows before the vehicle's archive boundary are kept whatever the
+        position: their fills are archived and could not be appended again.
+        """
+        earliest = {}
+        for vehicle_id, date_time, log_id in positions:
+            if not vehicle_id or not date_time:
+                continue
+            position = (date_time, log_id)
+            if vehicle_id not in earliest or position < earliest[vehicle_id]:
+                earliest[vehicle_id] = position
+        if not earliest:
+            return
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                """
+                DELETE FROM fleet_vehicle_fuel_ledger ledger
+                 USING unnest(%s::int[], %s::timestamp[], %s::int[])
+                       AS pos(vehicle_id, date_time, log_id)
+                 WHERE ledger.vehicle_id = pos.vehicle_id
+                   AND (ledger.date_time > pos.date_time
+                        OR (ledger.date_time = pos.date_time
+                            AND (ledger.log_id IS NULL
+                                 OR ledger.log_id >= pos.log_id)))
+                   AND NOT EXISTS (
+                        SELECT 1
+                          FROM fleet_vehicle_fuel_archive archive
+                         WHERE archive.vehicle_id = ledger.vehicle_id
+                           AND ledger.date_time < archive.archived_until
+                   )
+                """,
+                list(earliest),
+                [date_time for date_time, _log_id in earliest.values()],
+                [log_id or 0 for _date_time, log_id in earliest.values()],
+            )
+        )
+        if self.env.cr.rowcount:
+            self.invalidate_model()
+        self._append(list(earliest))
+
+    @api.model
+    def _append(self, vehicle_ids):
+        """Append the fills following the last ledger row of ``vehicle_ids``."""
+        self.env["fleet.vehicle.log.fuel"].flush_model()
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT fv.id, COALESCE(fv.fuel_tank_capacity, 0.0),
+                       last.sequence, last.date_time, last.log_id,
+                       last.cumulative_liter, last.cumulative_distance,
+                       last.tank_level
+                  FROM fleet_vehicle fv
+             LEFT JOIN LATERAL (
+                        SELECT sequence, date_time, log_id, cumulative_liter,
+                               cumulative_distance, tank_level
+                          FROM fleet_vehicle_fuel_ledger
+                         WHERE vehicle_id = fv.id
+                      ORDER BY sequence DESC
+                         LIMIT 1
+                  ) last ON TRUE
+                 WHERE fv.id = ANY(%s)
+                """,
+                vehicle_ids,
+            )
+        )
+        anchors = {row[0]: row[1:] for row in self.env.cr.fetchall()}
+        if not anchors:
+            return
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT log.vehicle_id, log.id, log.date_time, log.liter,
+                       log.distance, log.avg_consumption_rate
+                  FROM unnest(%s::int[], %s::timestamp[], %s::int[])
+                       AS anchor(vehicle_id, date_time, log_id)
+                  JOIN fleet_vehicle_log_fuel log
+                    ON log.vehicle_id = anchor.vehicle_id
+                   AND log.active
+                   AND log.state IS DISTINCT FROM 'cancelled'
+                   AND log.date_time IS NOT NULL
+                   AND (anchor.date_time IS NULL
+                        OR (log.date_time, log.id)
+                           > (anchor.date_time, anchor.log_id))
+              ORDER BY log.vehicle_id, log.date_time, log.id
+                """,
+                list(anchors),
+                [anchor[2] for anchor in anchors.values()],
+                [anchor[3] or 0 for anchor in anchors.values()],
+            )
+        )
+        vals_list = []
+        running = {}
+        for vehicle_id, log_id, date_time, liter, distance, rate in (
+            self.env.cr.fetchall()
+        ):
+            if vehicle_id not in running:
+                capacity, sequence, _dt, _log, cum_liter, cum_distance, level = (
+                    anchors[vehicle_id]
+                )
+                running[vehicle_id] = {
+                    "capacity": capacity,
+                    "sequence": sequence or 0,
+                    "cumulative_liter": cum_liter or 0.0,
+                    "cumulative_distance": cum_distance or 0.0,
+                    "tank_level": level or 0.0,
+                }
+            current = running[vehicle_id]
+            liter = liter or 0.0
+            distance = distance or 0.0
+            level = max(current["tank_level"] - distance * (rate or 0.0), 0.0)
+            level += liter
+            if current["capacity"] > 0:
+                level = min(level, current["capacity"])
+            current["sequence"] += 1
+            current["cumulative_liter"] += liter
+            current["cumulative_distance"] += distance
+            current["tank_level"] = level
+            vals_list.append(
+                {
+                    "vehicle_id": vehicle_id,
+                    "log_id": log_id,
+                    "sequence": current["sequence"],
+                    "date_time": date_time,
+                    "liter": liter,
+                    "distance": distance,
+                    "cumulative_liter": current["cumulative_liter"],
+                    "cumulative_distance": current["cumulative_distance"],
+                    "tank_level": level,
+                }
+            )
+        if vals_list:
+            self.sudo().create(vals_list)
+
+    @api.model
+    def _get_current_state(self, vehicle_ids):
+        """Return ``{vehicle_id: ledger_row}`` with the latest row of each
+        vehicle, one index probe per vehicle."""
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT last.id
+                  FROM unnest(%s::int[]) AS vehicle(id)
+                  JOIN LATERAL (
+                        SELECT id
+                          FROM fleet_vehicle_fuel_ledger
+                         WHERE vehicle_id = vehicle.id
+                      ORDER BY sequence DESC
+                         LIMIT 1
+                  ) last ON TRUE
+                """,
+                list(vehicle_ids),
+            )
+        )
+        rows = self.browse(row[0] for row in self.env.cr.fetchall())
+        return {row.vehicle_id.id: row for row in rows}
@@ -0,0 +1,453 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from collections import defaultdict
+from datetime import datetime
+from typing import NamedTuple
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+# Number of recent fills kept per vehicle. One more than the history window
+# used by the litres validation so the current log can be excluded from it.
+RECENT_FILLS_LIMIT = 21
+
+
+class FuelLogState(NamedTuple):
+    """What the vehicle statistics depend on of a live fuel log."""
+
+    vehicle_id: int
+    date_time: datetime | None
+    liter: float
+    odometer: float
+    distance: float
+    consumption_rate: float
+
+
+class FleetVehicleFuelStats(models.Model):
+    """Per-vehicle fuel statistics kept up to date by the fuel log write hooks
+    so the litres validation only needs a single indexed lookup.
+
+    The lifetime sums are adjusted by the delta of each change. The recent
+    fills and the last log are extended in place when a newer fill is
+    created; any other change touching them marks the row dirty, and dirty
+    rows are recomputed by a cron.
+    """
+
+    _name = "fleet.vehicle.fuel.stats"
+    _description = "Fuel statistics per vehicle"
+    _rec_name = "vehicle_id"
+
+    vehicle_id = fields.Many2one(
+        "fleet.vehicle", required=True, index=True, ondelete="cascade", readonly=True
+    )
+    recent_fills = fields.Json(
+        readonly=True,
+        help="Most recent ``[log_id, litres]`` pairs, newest first.",
+    )
+    recent_date_time = fields.Datetime(
+        readonly=True,
+        help="Date of the oldest of the recent fills, when they are as many as "
+        "kept; older fills do not affect them.",
+    )
+    fill_avg = fields.Float(string="Rolling Fill Average (L)", readonly=True)
+    fill_max = fields.Float(string="Max Fill (L)", readonly=True)
+    lifetime_liter = fields.Float(
+        string="Lifetime Litres",
+        readonly=True,
+        help="Litres of the logs with a measured distance.",
+    )
+    lifetime_distance = fields.Float(readonly=True)
+    rate_count = fields.Integer(
+        readonly=True, help="Number of fills with a measured consumption rate."
+    )
+    rate_sum = fields.Float(readonly=True)
+    rate_sq_sum = fields.Float(readonly=True)
+    rate_mean = fields.Float(string="Mean Consumption Rate", readonly=True)
+    rate_std = fields.Float(string="Consumption Rate Std. Dev.", readonly=True)
+    last_log_id = fields.Many2one(
+        "fleet.vehicle.log.fuel", readonly=True, ondelete="set null"
+    )
+    last_odometer = fields.Float(readonly=True)
+    last_date_time = fields.Datetime(readonly=True)
+    dirty = fields.Boolean(
+        readonly=True,
+        help="Set when a change of the fuel logs of the vehicle could not be "
+        "applied to the recent fills or the last log; the row is then "
+        "recomputed by a cron.",
+    )
+
+    _vehicle_uniq = models.Constraint(
+        "UNIQUE(vehicle_id)",
+        "Only one fuel statistics row per vehicle is allowed.",
+    )
+
+    @api.model
+    def _mark_dirty(self, vehicle_ids):
+        vehicle_ids = [vid for vid in vehicle_ids if vid]
+        if not vehicle_ids:
+            return
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                "UPDATE fleet_vehicle_fuel_stats SET dirty = TRUE "
+                "WHERE vehicle_id = ANY(%s) AND NOT dirty",
+                vehicle_ids,
+            )
+        )
+        if self.env.cr.rowcount:
+            self.invalidate_model(["dirty"])
+
+    @api.model
+    def _stats_query(self, vehicle_ids):
+        """Return the query computing the statistics of ``vehicle_ids`` from
+        their fuel logs and archive, one row per vehicle with a column per
+        field."""
+        return SQL(
+            """
+            WITH vehicle AS (
+                SELECT unnest(%(vehicle_ids)s::int[]) AS id
+            ),
+            live AS (
+                SELECT id, vehicle_id, liter, distance, odometer, date_time,
+                       consumption_rate
+                  FROM fleet_vehicle_log_fuel
+                 WHERE vehicle_id = ANY(%(vehicle_ids)s)
+                   AND active
+                   AND state IS DISTINCT FROM 'cancelled'
+            ),
+            ranked AS (
+                SELECT id, vehicle_id, liter, date_time,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY vehicle_id
+                           ORDER BY date_time DESC, id DESC
+                       ) AS rank
+                  FROM live
+                 WHERE liter > 0
+            ),
+            recent AS (
+                SELECT vehicle_id,
+                       jsonb_agg(jsonb_build_array(id, liter) ORDER BY rank)
+                           AS fills,
+                       CASE WHEN COUNT(*) = %(limit)s THEN MIN(date_time) END
+                           AS since,
+                       AVG(liter) FILTER (WHERE rank < %(limit)s) AS fill_avg,
+                       MAX(liter) FILTER (WHERE rank < %(limit)s) AS fill_max
+                  FROM ranked
+                 WHERE rank <= %(limit)s
+              GROUP BY vehicle_id
+            ),
+            sums AS (
+                SELECT vehicle_id,
+                       SUM(liter) AS liter,
+                       SUM(distance) AS distance,
+                       SUM(rate_count) AS rate_count,
+                       SUM(rate_sum) AS rate_sum,
+                       SUM(rate_sq_sum) AS rate_sq_sum
+                  FROM (
+                        SELECT vehicle_id, liter, distance, 1 AS rate_count,
+                               consumption_rate AS rate_sum,
+                               consumption_rate * consumption_rate
+                                   AS rate_sq_sum
+                          FROM live
+                         WHERE distance > 0
+                     UNION ALL
+                        SELECT vehicle_id, measured_liter, distance,
+                               rate_count, rate_sum, rate_sq_sum
+                          FROM fleet_vehicle_fuel_archive
+                         WHERE vehicle_id = ANY(%(vehicle_ids)s)
+                  ) fills
+              GROUP BY vehicle_id
+            ),
+            last AS (
+                SELECT DISTINCT ON (vehicle_id)
+                       vehicle_id, id, odometer, date_time
+                  FROM live
+              ORDER BY vehicle_id, date_time DESC NULLS LAST, id DESC
+            )
+            SELECT vehicle.id AS vehicle_id,
+                   COALESCE(recent.fills, '[]'::jsonb) AS recent_fills,
+                   recent.since AS recent_date_time,
+                   COALESCE(recent.fill_avg, 0.0) AS fill_avg,
+                   COALESCE(recent.fill_max, 0.0) AS fill_max,
+                   COALESCE(sums.liter, 0.0) AS lifetime_liter,
+                   COALESCE(sums.distance, 0.0) AS lifetime_distance,
+                   COALESCE(sums.rate_count, 0) AS rate_count,
+                   COALESCE(sums.rate_sum, 0.0) AS rate_sum,
+                   COALESCE(sums.rate_sq_sum, 0.0) AS rate_sq_sum,
+                   COALESCE(sums.rate_sum / NULLIF(sums.rate_count, 0), 0.0)
+                       AS rate_mean,
+                   COALESCE(SQRT(GREATEST(
+                       sums.rate_sq_sum / NULLIF(sums.rate_count, 0)
+                       - POWER(sums.rate_sum / NULLIF(sums.rate_count, 0), 2),
+                       0
+                   )), 0.0) AS rate_std,
+                   last.id AS last_log_id,
+                   COALESCE(last.odometer, 0.0) AS last_odometer,
+                   last.date_time AS last_date_time
+              FROM vehicle
+              JOIN fleet_vehicle fv ON fv.id = vehicle.id
+         LEFT JOIN recent ON recent.vehicle_id = vehicle.id
+         LEFT JOIN sums ON sums.vehicle_id = vehicle.id
+         LEFT JOIN last ON last.vehicle_id = vehicle.id
+            """,
+            vehicle_ids=vehicle_ids,
+            limit=RECENT_FILLS_LIMIT,
+        )
+
+    @api.model
+    def _refresh(self, vehicle_ids):
+        """Recompute the statistics of ``vehicle_ids`` with a single upsert."""
+        vehicle_ids = list({vid for vid in vehicle_ids if vid})
+        if not vehicle_ids:
+            return
+        self.env["fleet.vehicle.log.fuel"].flush_model()
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                """
+                INSERT INTO fleet_vehicle_fuel_stats (
+                    vehicle_id, recent_fills, recent_date_time, fill_avg, fill_max,
+                    lifetime_liter, lifetime_distance,
+                    rate_count, rate_sum, rate_sq_sum, rate_mean, rate_std,
+                    last_log_id, last_odometer, last_date_time, dirty,
+                    create_uid, create_date, write_uid, write_date
+                )
+                SELECT stats.*, FALSE,
+                       %(uid)s, NOW() AT TIME ZONE 'UTC',
+                       %(uid)s, NOW() AT TIME ZONE 'UTC'
+                  FROM (%(query)s) stats
+                    ON CONFLICT (vehicle_id) DO UPDATE
+                   SET recent_fills = EXCLUDED.recent_fills,
+                       recent_date_time = EXCLUDED.recent_date_time,
+                       fill_avg = EXCLUDED.fill_avg,
+                       fill_max = EXCLUDED.fill_max,
+                       lifetime_liter = EXCLUDED.lifetime_liter,
+                       lifetime_distance = EXCLUDED.lifetime_distance,
+                       rate_count = EXCLUDED.rate_count,
+                       rate_sum = EXCLUDED.rate_sum,
+                       rate_sq_sum = EXCLUDED.rate_sq_sum,
+                       rate_mean = EXCLUDED.rate_mean,
+                       rate_std = EXCLUDED.rate_std,
+                       last_log_id = EXCLUDED.last_log_id,
+                       last_odometer = EXCLUDED.last_odometer,
+                       last_date_time = EXCLUDED.last_date_time,
+                       dirty = FALSE,
+                       write_uid = EXCLUDED.write_uid,
+                       write_date = EXCLUDED.write_date
+                """,
+                query=self._stats_query(vehicle_ids),
+                uid=self.env.uid,
+            )
+        )
+        self.invalidate_model()
+        self.env["fleet.vehicle"].invalidate_model(["fuel_stats_ids"])
+
+    @api.model
+    def _cron_refresh(self):
+        """Recompute the dirty rows.
+
+        Rows locked by a concurrent transaction are skipped rather than waited
+        for; they are picked up by the next run.
+        """
+        self.flush_model(["dirty"])
+        self.env.cr.execute(
+            "SELECT vehicle_id FROM fleet_vehicle_fuel_stats "
+            "WHERE dirty FOR UPDATE SKIP LOCKED"
+        )
+        self._refresh([vehicle_id for (vehicle_id,) in self.env.cr.fetchall()])
+
+    @api.model
+    def _apply_log_changes(self, before, after):
+        """Bring the statistics up to date with a change of fuel logs.
+
+        ``before`` and ``after`` map the ids of the live logs involved in the
+        change, before and after it, to their :class:`FuelLogState`. Logs
+        missing from one side were created, deleted, archived or cancelled.
+        """
+        states = defaultdict(lambda: ({}, {}))
+        for side, snapshot in enumerate((before, after)):
+            for log_id, state in snapshot.items():
+                states[state.vehicle_id][side][log_id] = state
+        if not states:
+            return
+        rows = self.sudo().search([("vehicle_id", "in", list(states))])
+        missing = set(states) - set(rows.vehicle_id.ids)
+        self._apply_sum_deltas(
+            {vid: sides for vid, sides in states.items() if vid not in missing}
+        )
+        to_mark = []
+        for row in rows.filtered(lambda row: not row.dirty):
+            if not row._apply_recent_changes(*states[row.vehicle_id.id]):
+                to_mark.append(row.vehicle_id.id)
+        self._mark_dirty(to_mark)
+        # First logs of a vehicle: no row to apply the change to yet
+        self._refresh(missing)
+
+    @api.model
+    def _apply_sum_deltas(self, states):
+        """Add to the lifetime sums the contribution of the logs after the
+        change and subtract the one they had before.
+
+        Every row involved gets a new ``write_date``, which the fuel dashboard
+        relies on to notice deletions.
+        """
+        deltas = defaultdict(lambda: [0.0, 0.0, 0, 0.0, 0.0])
+        for vehicle_id, (before, after) in states.items():
+            delta = deltas[vehicle_id]
+            for sign, snapshot in ((-1, before), (1, after)):
+                for state in snapshot.values():
+                    if state.distance > 0:
+                        rate = state.consumption_rate
+                        delta[0] += sign * state.liter
+                        delta[1] += sign * state.distance
+                        delta[2] += sign
+                        delta[3] += sign * rate
+                        delta[4] += sign * rate * rate
+        if not deltas:
+            return
+        columns = list(zip(*deltas.values(), strict=True))
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                """
+                WITH delta AS (
+                    SELECT *
+                      FROM unnest(
+                           %s::int[], %s::float[], %s::float[],
+                           %s::int[], %s::float[], %s::float[]
+                      ) AS delta(
+                           vehicle_id, liter, distance,
+                           rate_count, rate_sum, rate_sq_sum
+                      )
+                ),
+                summed AS (
+                    SELECT stats.id,
+                           stats.lifetime_liter + delta.liter AS liter,
+                           stats.lifetime_distance + delta.distance AS distance,
+                           stats.rate_count + delta.rate_count AS rate_count,
+                           stats.rate_sum + delta.rate_sum AS rate_sum,
+                           stats.rate_sq_sum + delta.rate_sq_sum AS rate_sq_sum
+                      FROM fleet_vehicle_fuel_stats stats
+                      JOIN delta ON delta.vehicle_id = stats.vehicle_id
+                )
+                UPDATE fleet_vehicle_fuel_stats stats
+                   SET lifetime_liter = summed.liter,
+                       lifetime_distance = summed.distance,
+                       rate_count = summed.rate_count,
+                       rate_sum = summed.rate_sum,
+                       rate_sq_sum = summed.rate_sq_sum,
+                       rate_mean = COALESCE(
+                           summed.rate_sum / NULLIF(summed.rate_count, 0), 0.0
+                       ),
+                       rate_std = COALESCE(SQRT(GREATEST(
+                           summed.rate_sq_sum / NULLIF(summed.rate_count, 0)
+                           - POWER(summed.rate_sum / NULLIF(summed.rate_count, 0), 2),
+                           0
+                       )), 0.0),
+                       write_uid = %s,
+                       write_date = NOW() AT TIME ZONE 'UTC'
+                  FROM summed
+                 WHERE stats.id = summed.id
+                """,
+                list(deltas),
+                *(list(column) for column in columns),
+                self.env.uid,
+            )
+        )
+        self.invalidate_model()
+
+    def _precedes(self, log_id, state):
+        """Whether the log ``log_id`` in ``state`` comes after the last log of
+        ``self``."""
+        self.ensure_one()
+        if not self.last_log_id:
+            return True
+        return bool(
+            state.date_time
+            and self.last_date_time
+            and (state.date_time, log_id) > (self.last_date_time, self.last_log_id.id)
+        )
+
+    def _affects_recent(self, log_id, state):
+        """Whether ``state`` of the log ``log_id`` is, or would be, among the
+        recent fills or the last log of ``self``."""
+        self.ensure_one()
+        return (
+            log_id == self.last_log_id.id
+            or any(fill_id == log_id for fill_id, _liter in self.recent_fills or ())
+            or not self.recent_date_time
+            or not state.date_time
+            or state.date_time >= self.recent_date_time
+        )
+
+    def _apply_recent_changes(self, before, after):
+        """Apply a change of the logs of the vehicle of ``self`` to its recent
+        fills and last log.
+
+        Only fills created after the current last log are applied; return
+        ``False`` when the change affects the recent fills otherwise.
+        """
+        self.ensure_one()
+
+        def recent_key(state):
+            return state and (state.date_time, state.liter)
+
+        changed = {
+            log_id
+            for log_id in before.keys() | after.keys()
+            if recent_key(before.get(log_id)) != recent_key(after.get(log_id))
+        }
+        if not changed:
+            return True
+        appended = [
+            (log_id, after[log_id])
+            for log_id in changed
+            if log_id not in before
+            and log_id in after
+            and self._precedes(log_id, after[log_id])
+        ]
+        if len(appended) < len(changed):
+            return not any(
+                self._affects_recent(log_id, state)
+                for snapshot in (before, after)
+                for log_id, state in snapshot.items()
+                if log_id in changed
+            )
+        appended.sort(key=lambda item: (item[1].date_time, item[0]), reverse=True)
+        fills = [[log_id, state.liter] for log_id, state in appended if state.liter > 0]
+        fills = (fills + list(self.recent_fills or ()))[:RECENT_FILLS_LIMIT]
+        window = [liter for _log_id, liter in fills[: RECENT_FILLS_LIMIT - 1]]
+        last_id, last = appended[0]
+        self.sudo().write(
+            {
+                "recent_fills": fills,
+                "fill_avg": sum(window) / len(window) if window else 0.0,
+                "fill_max": max(window, default=0.0),
+                "last_log_id": last_id,
+                "last_odometer": last.odometer,
+                "last_date_time": last.date_time,
+            }
+        )
+        return True
+
+    @api.model
+    def _get_for_vehicle(self, vehicle):
+        """Return the statistics of ``vehicle``.
+
+        A row that is dirty or not created yet is not written here: current
+        statistics are computed into a new record instead.
+        """
+        if not vehicle:
+            return self.browse()
+        stats = vehicle.sudo().fuel_stats_ids[:1]
+        if stats and not stats.dirty:
+            return stats
+        self.env["fleet.vehicle.log.fuel"].flush_model()
+        self.env.cr.execute(self._stats_query(vehicle.ids))
+        values = self.env.cr.dictfetchone()
+        if not values:
+            return self.browse()
+        # Leave the vehicle out so the new record does not show up among its
+        # stored statistics
+        values.pop("vehicle_id")
+        return self.sudo().new(values)
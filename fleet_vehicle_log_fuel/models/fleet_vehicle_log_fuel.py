@@ -2,8 +2,37 @@
 # Copyright 2024 Tecnativa - Víctor Martínez
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import _, api, fields, models
-from odoo.exceptions import UserError
+from collections import defaultdict
+from datetime import datetime
+from typing import NamedTuple
+
+import psycopg2
+
+from odoo import _, api, fields, models, tools
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import SQL, split_every, str2bool
+
+from .fleet_vehicle_fuel_stats import FuelLogState
+
+SETTINGS_PREFIX = "fleet_vehicle_log_fuel."
+
+
+class FuelSettings(NamedTuple):
+    """Typed snapshot of the ``fleet_vehicle_log_fuel.*`` system parameters.
+
+    Each field is read from the parameter of the same name (with the module
+    prefix) and falls back to its default when the parameter is not set.
+    """
+
+    liter_history_min_count: int = 3
+    liter_history_max_factor: float = 2.0
+    liter_past_max_factor: float = 1.25
+    liter_consumption_max_factor: float = 1.5
+    liter_absolute_max_fallback: float = 500.0
+    anomaly_pump_tolerance: float = 1.0
+    anomaly_zscore: float = 3.0
+    archive_keep_years: int = 0
+    archive_cold_storage: bool = True
 
 
 class FleetVehicleLogFuel(models.Model):
@@ -17,6 +46,7 @@ class FleetVehicleLogFuel(models.Model):
         "fleet.vehicle",
         "Vehicle",
         required=True,
+        index=True,
         help="Vehicle concerned by this log",
     )
     product_id = fields.Many2one("product.product", string="Fuel Product")
@@ -152,77 +182,135 @@ class FleetVehicleLogFuel(models.Model):
         compute="_compute_liter_fill_hints",
     )
 
+    # Fill sequence of a vehicle / pump as walked by the prev-log, neighbour,
+    # statistics and cost queries. The predicate must stay identical to the
+    # one used by those queries for the planner to pick the partial indexes.
+    _vehicle_fill_sequence_idx = models.Index(
+        "(vehicle_id, date_time, id) "
+        "WHERE active AND state IS DISTINCT FROM 'cancelled'"
+    )
+    _location_fill_sequence_idx = models.Index(
+        "(location_id, date_time, id) "
+        "WHERE active AND state IS DISTINCT FROM 'cancelled' "
+        "AND location_id IS NOT NULL"
+    )
+    _vehicle_date_idx = models.Index(
+        "(vehicle_id, date) WHERE active AND state IS DISTINCT FROM 'cancelled'"
+    )
+    # Version of the dashboard data, see ``_get_fuel_dashboard_version``.
+    _write_date_idx = models.Index("(write_date)")
+
     # -------------------------------------------------------------------------
     # Litres filled validation (tank capacity + historical + consumption)
     # -------------------------------------------------------------------------
 
     @api.model
-    def _liter_validation_params(self):
-        icp = self.env["ir.config_parameter"].sudo()
-        return {
-            "history_min_count": int(
-                icp.get_param("fleet_vehicle_log_fuel.liter_history_min_count", "3")
-            ),
-            "history_max_factor": float(
-                icp.get_param("fleet_vehicle_log_fuel.liter_history_max_factor", "2.0")
-            ),
-            "past_max_factor": float(
-                icp.get_param("fleet_vehicle_log_fuel.liter_past_max_factor", "1.25")
-            ),
-            "consumption_max_factor": float(
-                icp.get_param(
-                    "fleet_vehicle_log_fuel.liter_consumption_max_factor", "1.5"
+    @tools.ormcache()
+    def _get_fuel_settings(self):
+        """Return the module settings, read with a single query.
+
+        The result is cached per registry; writing any system parameter
+        clears the registry cache, in every worker, so changes are picked up
+        without a restart.
+        """
+        self.env.cr.execute(
+            SQL(
+                "SELECT key, value FROM ir_config_parameter WHERE key LIKE %s",
+                f"{SETTINGS_PREFIX}%",
+            )
+        )
+        values = dict(self.env.cr.fetchall())
+        settings = {}
+        for name, field_type in FuelSettings.__annotations__.items():
+            value = values.get(SETTINGS_PREFIX + name)
+            if value:
+                settings[name] = (
+                    str2bool(value) if field_type is bool else field_type(value)
                 )
-            ),
-            "absolute_max_fallback": float(
-                icp.get_param("fleet_vehicle_log_fuel.liter_absolute_max_fallback", "500")
-            ),
-        }
+        return FuelSettings(**settings)
+
+    def _get_fuel_stats(self):
+        self.ensure_one()
+        return self.env["fleet.vehicle.fuel.stats"]._get_for_vehicle(
+            self.vehicle_id._origin
+        )
+
+    def _counted_in_fuel_stats(self):
+        """Whether the stored version of this log is part of its vehicle's
+        lifetime statistics, so it can be taken out again."""
+        origin = self._origin
+        return bool(
+            origin
+            and origin.active
+            and origin.state != "cancelled"
+            and origin.distance > 0
+            and origin.vehicle_id == self.vehicle_id._origin
+        )
 
     def _get_historical_fill_liters(self):
         """Return recent fill volumes for this vehicle (excluding current log)."""
         self.ensure_one()
-        domain = [
-            ("vehicle_id", "=", self.vehicle_id.id),
-            ("state", "!=", "cancelled"),
-            ("liter", ">", 0),
-        ]
-        if self.id:
-            domain.append(("id", "!=", self.id))
-        logs = self.search(domain, order="date_time desc", limit=20)
-        return logs.mapped("liter")
+        own_id = self._origin.id
+        fills = self._get_fuel_stats().recent_fills or []
+        return [liter for log_id, liter in fills if log_id != own_id][:20]
 
     def _get_vehicle_avg_consumption_rate(self):
         """Average L per distance unit for the vehicle (excluding this log)."""
         self.ensure_one()
-        domain = [
-            ("vehicle_id", "=", self.vehicle_id.id),
-            ("state", "!=", "cancelled"),
-            ("distance", ">", 0),
-        ]
-        if self.id:
-            domain.append(("id", "!=", self.id))
-        data = self.env["fleet.vehicle.log.fuel"]._read_group(
-            domain,
-            groupby=["vehicle_id"],
-            aggregates=["liter:sum", "distance:sum"],
-        )
-        if not data:
-            return 0.0
-        _vehicle, total_liter, total_distance = data[0]
+        stats = self._get_fuel_stats()
+        total_liter = stats.lifetime_liter
+        total_distance = stats.lifetime_distance
+        if self._counted_in_fuel_stats():
+            total_liter -= self._origin.liter
+            total_distance -= self._origin.distance
         return (total_liter / total_distance) if total_distance > 0 else 0.0
 
-    def _get_expected_liters_from_distance(self):
-        """Estimate litres needed from odometer delta and past consumption."""
+    def _get_prev_log_odometer(self):
+        """Odometer of the previous log, or ``None`` when there is none.
+
+        Saved logs already carry their predecessor in ``prev_odometer``. For a
+        fill being entered, the vehicle's last log is the previous one unless
+        the fill is back-dated, in which case :meth:`_prev_log_domain` is used.
+        """
         self.ensure_one()
+        if isinstance(self.id, int):
+            return self.prev_odometer if self.has_prev_log else None
+        stats = self._get_fuel_stats()
+        own_id = self._origin.id
+        date_time = self.date_time or fields.Datetime.now()
+        last_date_time = stats.last_date_time
+        if (
+            stats.last_log_id
+            and stats.last_log_id.id != own_id
+            and last_date_time
+            and (
+                date_time > last_date_time
+                or (
+                    date_time == last_date_time
+                    and (not own_id or stats.last_log_id.id < own_id)
+                )
+            )
+        ):
+            return stats.last_odometer
         prev_log = self.search(
             self._prev_log_domain(),
             limit=1,
             order="date_time desc, id desc",
         )
-        if not prev_log or not self.odometer:
+        if prev_log:
+            return prev_log.odometer
+        archive = self.env["fleet.vehicle.fuel.archive"]._get_for_vehicle(
+            self.vehicle_id._origin
+        )
+        return archive.last_odometer if archive.last_log_id else None
+
+    def _get_expected_liters_from_distance(self):
+        """Estimate litres needed from odometer delta and past consumption."""
+        self.ensure_one()
+        prev_odometer = self._get_prev_log_odometer()
+        if prev_odometer is None or not self.odometer:
             return 0.0
-        distance = self.odometer - prev_log.odometer
+        distance = self.odometer - prev_odometer
         if distance <= 0:
             return 0.0
         avg_rate = self._get_vehicle_avg_consumption_rate()
@@ -231,7 +319,7 @@ class FleetVehicleLogFuel(models.Model):
     def _get_liter_fill_limits(self):
         """Return ``(max_liter, detail_lines)`` for the current fill."""
         self.ensure_one()
-        params = self._liter_validation_params()
+        settings = self._get_fuel_settings()
         vehicle = self.vehicle_id
         max_candidates = []
         details = []
@@ -243,10 +331,10 @@ class FleetVehicleLogFuel(models.Model):
             )
 
         past_liters = self._get_historical_fill_liters()
-        if len(past_liters) >= params["history_min_count"]:
+        if len(past_liters) >= settings.liter_history_min_count:
             avg_liter = sum(past_liters) / len(past_liters)
-            max_candidates.append(avg_liter * params["history_max_factor"])
-            max_candidates.append(max(past_liters) * params["past_max_factor"])
+            max_candidates.append(avg_liter * settings.liter_history_max_factor)
+            max_candidates.append(max(past_liters) * settings.liter_past_max_factor)
             details.append(
                 _("average past fill: %(avg)s L (%(count)s logs)")
                 % {"avg": round(avg_liter, 1), "count": len(past_liters)}
@@ -254,7 +342,7 @@ class FleetVehicleLogFuel(models.Model):
 
         expected = self._get_expected_liters_from_distance()
         if expected > 0:
-            max_candidates.append(expected * params["consumption_max_factor"])
+            max_candidates.append(expected * settings.liter_consumption_max_factor)
             details.append(
                 _("expected from usage since last fill: %(exp)s L")
                 % {"exp": round(expected, 1)}
@@ -263,7 +351,7 @@ class FleetVehicleLogFuel(models.Model):
         if max_candidates:
             max_liter = min(max_candidates)
         else:
-            max_liter = params["absolute_max_fallback"]
+            max_liter = settings.liter_absolute_max_fallback
             if not details:
                 details.append(_("default limit (set tank capacity on the vehicle)"))
 
@@ -275,22 +363,27 @@ class FleetVehicleLogFuel(models.Model):
         for record in self.filtered(
             lambda r: r.liter > 0 and r.state != "cancelled" and r.vehicle_id
         ):
-            max_liter, details = record._get_liter_fill_limits()
-            if record.liter > max_liter + 1e-9:
-                detail_text = "\n".join(f"• {line}" for line in details)
-                raise UserError(
-                    _(
-                        "Litres filled (%(liter)s L) exceeds the allowed maximum "
-                        "of %(max)s L for vehicle %(vehicle)s.\n\n"
-                        "This limit is based on:\n%(details)s"
-                    )
-                    % {
-                        "liter": record.liter,
-                        "max": round(max_liter, 1),
-                        "vehicle": record.vehicle_id.display_name,
-                        "details": detail_text,
-                    }
-                )
+            error = record._get_liter_fill_error()
+            if error:
+                raise UserError(error)
+
+    def _get_liter_fill_error(self):
+        """Return the error message when the litres filled exceed the limit."""
+        self.ensure_one()
+        max_liter, details = self._get_liter_fill_limits()
+        if self.liter <= max_liter + 1e-9:
+            return False
+        detail_text = "\n".join(f"• {line}" for line in details)
+        return _(
+            "Litres filled (%(liter)s L) exceeds the allowed maximum "
+            "of %(max)s L for vehicle %(vehicle)s.\n\n"
+            "This limit is based on:\n%(details)s"
+        ) % {
+            "liter": self.liter,
+            "max": round(max_liter, 1),
+            "vehicle": self.vehicle_id.display_name,
+            "details": detail_text,
+        }
 
     @api.depends(
         "liter",
@@ -309,10 +402,52 @@ class FleetVehicleLogFuel(models.Model):
             record.liter_max_allowed = max_liter
             record.liter_fill_hint = "; ".join(details) if details else False
 
+    @api.model
+    def _get_fill_limit_preview(self, vehicle, odometer=0.0):
+        """Fill limit of a new fill of ``vehicle`` at ``odometer``, as shown
+        to the attendant before the litres are entered."""
+        log = self.new(
+            {
+                "vehicle_id": vehicle.id,
+                "odometer": odometer,
+                "date_time": fields.Datetime.now(),
+            }
+        )
+        max_liter, details = log._get_liter_fill_limits()
+        return {
+            "vehicle_id": vehicle.id,
+            "odometer": odometer,
+            "max_liter": max_liter,
+            "details": details,
+            "expected_liter": log._get_expected_liters_from_distance(),
+        }
+
     @api.constrains("liter", "vehicle_id", "odometer", "state")
     def _constrains_liter_fill(self):
         self._check_liter_fill_amount()
 
+    @api.constrains("vehicle_id", "date_time")
+    def _check_archived_period(self):
+        archived_until = {
+            archive.vehicle_id: archive.archived_until
+            for archive in self.env["fleet.vehicle.fuel.archive"]
+            .sudo()
+            .search([("vehicle_id", "in", self.vehicle_id.ids)])
+        }
+        for record in self:
+            until = archived_until.get(record.vehicle_id)
+            if until and record.date_time and record.date_time < until:
+                raise ValidationError(
+                    _(
+                        "Fuel logs of %(vehicle)s before %(date)s are archived, "
+                        "the period is closed."
+                    )
+                    % {
+                        "vehicle": record.vehicle_id.display_name,
+                        "date": fields.Datetime.to_string(until),
+                    }
+                )
+
     @api.onchange("liter", "vehicle_id", "odometer")
     def _onchange_liter_fill_warning(self):
         if self.liter <= 0 or not self.vehicle_id:
@@ -350,26 +485,109 @@ class FleetVehicleLogFuel(models.Model):
 
         We deliberately exclude cancelled records (they are not real fills) and
         compare on ``date_time`` so that multiple fills on the same day order
-        correctly.
+        correctly. Fills sharing the same ``date_time`` are ordered by id, the
+        same tie-break used by :meth:`_fetch_prev_logs`.
         """
         self.ensure_one()
-        return [
+        record_id = self.id or self._origin.id
+        date_time = self.date_time or fields.Datetime.now()
+        domain = [
             ("vehicle_id", "=", self.vehicle_id.id),
             ("state", "!=", "cancelled"),
-            ("id", "!=", self.id or self._origin.id or 0),
-            ("date_time", "<=", self.date_time or fields.Datetime.now()),
+            ("id", "!=", record_id or 0),
         ]
+        if record_id:
+            domain += [
+                "|",
+                ("date_time", "<", date_time),
+                "&",
+                ("date_time", "=", date_time),
+                ("id", "<", record_id),
+            ]
+        else:
+            domain.append(("date_time", "<=", date_time))
+        return domain
+
+    def _fetch_prev_logs(self):
+        """Resolve the previous fuel log of every record in ``self`` at once.
+
+        Same semantics as :meth:`_prev_log_domain` (cancelled, archived and
+        self rows excluded), but evaluated for the whole recordset with a
+        single lateral join. The current values of ``self`` are taken from the
+        cache so that pending (unsaved) changes are honoured.
+
+        :return: dict mapping each record to a ``(odometer, date)`` tuple of its
+            previous log, records without a previous log are left out.
+        """
+        records = self.filtered("vehicle_id")
+        if not records:
+            return {}
+        self.flush_model(
+            ["vehicle_id", "date_time", "state", "active", "odometer", "date"]
+        )
+        now = fields.Datetime.now()
+        keys, vehicle_ids, date_times, self_ids = [], [], [], []
+        for key, record in enumerate(records):
+            keys.append(key)
+            vehicle_ids.append(record.vehicle_id.id)
+            date_times.append(record.date_time or now)
+            self_ids.append(record.id or record._origin.id or 0)
+        self.env.cr.execute(
+            self._prev_logs_sql(keys, vehicle_ids, date_times, self_ids)
+        )
+        return {
+            records[key]: (odometer, date)
+            for key, odometer, date in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def _prev_logs_sql(self, keys, vehicle_ids, date_times, self_ids):
+        """Previous log of each ``(key, vehicle_id, date_time, self_id)`` row,
+        one index probe per row on the vehicle fill sequence.
+
+        The first live fill of a vehicle falls back on the last archived one.
+        """
+        return SQL(
+            """
+            SELECT cur.key,
+                   CASE WHEN prev.found THEN prev.odometer
+                        ELSE boundary.last_odometer END,
+                   CASE WHEN prev.found THEN prev.date
+                        ELSE boundary.last_date END
+              FROM unnest(
+                    %s::int[], %s::int[], %s::timestamp[], %s::int[]
+                   ) AS cur(key, vehicle_id, date_time, self_id)
+         LEFT JOIN LATERAL (
+                    SELECT TRUE AS found, log.odometer, log.date
+                      FROM fleet_vehicle_log_fuel log
+                     WHERE log.vehicle_id = cur.vehicle_id
+                       AND log.active
+                       AND log.state IS DISTINCT FROM 'cancelled'
+                       AND log.id <> cur.self_id
+                       AND (log.date_time < cur.date_time
+                            OR (log.date_time = cur.date_time
+                                AND (cur.self_id = 0 OR log.id < cur.self_id)))
+                  ORDER BY log.date_time DESC, log.id DESC
+                     LIMIT 1
+              ) prev ON TRUE
+         LEFT JOIN fleet_vehicle_fuel_archive boundary
+                ON boundary.vehicle_id = cur.vehicle_id
+               AND boundary.last_log_id IS NOT NULL
+             WHERE prev.found OR boundary.id IS NOT NULL
+            """,
+            keys,
+            vehicle_ids,
+            date_times,
+            self_ids,
+        )
 
     @api.depends("vehicle_id", "date_time", "state")
     def _compute_prev_log_stats(self):
+        prev_logs = self._fetch_prev_logs()
         for record in self:
-            prev_log = self.search(
-                record._prev_log_domain(),
-                limit=1,
-                order="date_time desc, id desc",
-            )
-            record.prev_odometer = prev_log.odometer if prev_log else 0.0
-            record.prev_date = prev_log.date if prev_log else False
+            prev_log = prev_logs.get(record)
+            record.prev_odometer = (prev_log[0] or 0.0) if prev_log else 0.0
+            record.prev_date = prev_log[1] if prev_log else False
             record.has_prev_log = bool(prev_log)
 
     @api.depends("odometer", "prev_odometer", "liter", "has_prev_log")
@@ -413,80 +631,787 @@ class FleetVehicleLogFuel(models.Model):
                 groupby=["vehicle_id"],
                 aggregates=["liter:sum", "distance:sum"],
             )
-            for vehicle, total_liter, total_distance in data:
-                averages[vehicle.id] = (
+            totals = {
+                vehicle.id: (total_liter, total_distance)
+                for vehicle, total_liter, total_distance in data
+            }
+            for archive in (
+                self.env["fleet.vehicle.fuel.archive"]
+                .sudo()
+                .search([("vehicle_id", "in", vehicle_ids)])
+            ):
+                total_liter, total_distance = totals.get(
+                    archive.vehicle_id.id, (0.0, 0.0)
+                )
+                totals[archive.vehicle_id.id] = (
+                    total_liter + archive.measured_liter,
+                    total_distance + archive.distance,
+                )
+            for vehicle_id, (total_liter, total_distance) in totals.items():
+                averages[vehicle_id] = (
                     (total_liter / total_distance) if total_distance > 0 else 0.0
                 )
         for record in self:
             record.avg_consumption_rate = averages.get(record.vehicle_id.id, 0.0)
 
 
-    def _affected_neighbor_logs(self):
-        """Return the fuel logs whose prev/avg stats may be invalidated by
-        creating, updating or removing the records in ``self``.
+    def _neighbor_sequence_sql(self, where_ids_sql):
+        """Ordered fill sequence of the vehicles owning ``where_ids_sql``.
 
-        For each affected (vehicle, date_time) we recompute the *next* log so
-        its ``prev_odometer`` / ``consumption_rate`` reflects the change.
+        Cancelled and archived logs are not real fills and are left out of the
+        sequence, mirroring :meth:`_prev_log_domain`. Logs are ordered by
+        ``date_time, id`` so fills on the same instant still have a strict
+        predecessor; the first live fill follows the last archived one.
         """
-        Log = self.env["fleet.vehicle.log.fuel"]
-        neighbors = Log.browse()
-        for record in self:
-            if not record.vehicle_id:
-                continue
-            next_log = Log.search(
-                [
-                    ("vehicle_id", "=", record.vehicle_id.id),
-                    ("state", "!=", "cancelled"),
-                    ("id", "!=", record.id),
-                    ("date_time", ">=", record.date_time or fields.Datetime.now()),
-                ],
-                limit=1,
-                order="date_time asc, id asc",
+        return SQL(
+            """
+            SELECT log.id,
+                   log.prev_odometer AS stored_prev_odometer,
+                   log.prev_date AS stored_prev_date,
+                   log.has_prev_log AS stored_has_prev_log,
+                   COALESCE(LAG(log.id) OVER w, boundary.last_log_id) AS prev_id,
+                   CASE WHEN LAG(log.id) OVER w IS NULL
+                        THEN boundary.last_odometer
+                        ELSE LAG(log.odometer) OVER w END AS prev_odometer,
+                   CASE WHEN LAG(log.id) OVER w IS NULL
+                        THEN boundary.last_date
+                        ELSE LAG(log.date) OVER w END AS prev_date,
+                   LEAD(log.id) OVER w AS next_id
+              FROM fleet_vehicle_log_fuel log
+         LEFT JOIN fleet_vehicle_fuel_archive boundary
+                ON boundary.vehicle_id = log.vehicle_id
+             WHERE log.active
+               AND log.state IS DISTINCT FROM 'cancelled'
+               AND log.vehicle_id IN (
+                    SELECT vehicle_id
+                      FROM fleet_vehicle_log_fuel
+                     WHERE id IN %s
+               )
+            WINDOW w AS (PARTITION BY log.vehicle_id ORDER BY log.date_time, log.id)
+            """,
+            where_ids_sql,
+        )
+
+    def _successor_log_ids(self):
+        """Return the ids of the logs directly following ``self`` in their
+        vehicle's fill sequence, resolved with a single window query."""
+        ids = tuple(self.filtered("vehicle_id").ids)
+        if not ids:
+            return set()
+        self.flush_model(["vehicle_id", "date_time", "state", "active"])
+        self.env.cr.execute(
+            SQL(
+                "SELECT seq.next_id FROM (%s) seq "
+                "WHERE seq.id IN %s AND seq.next_id IS NOT NULL",
+                self._neighbor_sequence_sql(ids),
+                ids,
             )
-            neighbors |= next_log
-            neighbors |= Log.search(
-                [
-                    ("vehicle_id", "=", record.vehicle_id.id),
-                    ("state", "!=", "cancelled"),
-                ]
+        )
+        return {next_id for (next_id,) in self.env.cr.fetchall()}
+
+    @api.model
+    def _stale_prev_log_stats(self, log_ids):
+        """Return the logs among ``log_ids`` whose stored predecessor stats no
+        longer match their actual predecessor."""
+        ids = tuple(log_ids)
+        if not ids:
+            return self.browse()
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT seq.id FROM (%s) seq
+                 WHERE seq.id IN %s
+                   AND (COALESCE(seq.stored_has_prev_log, FALSE)
+                           <> (seq.prev_id IS NOT NULL)
+                        OR COALESCE(seq.stored_prev_odometer, 0)
+                           <> COALESCE(seq.prev_odometer, 0)
+                        OR seq.stored_prev_date IS DISTINCT FROM seq.prev_date)
+                """,
+                self._neighbor_sequence_sql(ids),
+                ids,
             )
-        return neighbors
+        )
+        return self.browse(row[0] for row in self.env.cr.fetchall())
 
-    @api.model_create_multi
-    def create(self, vals_list):
-        records = super().create(vals_list)
-        neighbors = records._affected_neighbor_logs() - records
+    def _affected_neighbor_logs(self, extra_ids=()):
+        """Return the fuel logs whose prev stats are invalidated by creating,
+        updating or removing the records in ``self``.
+
+        Only the direct successors of ``self`` (plus ``extra_ids``, typically
+        the successors captured before a write) can see their predecessor
+        change, and among those only the ones whose stored stats actually
+        differ are returned.
+        """
+        candidate_ids = (self._successor_log_ids() | set(extra_ids)) - set(self.ids)
+        return self._stale_prev_log_stats(candidate_ids)
+
+    @api.model
+    def _refresh_avg_consumption(self, vehicle_ids):
+        """Update ``avg_consumption_rate`` of every log of ``vehicle_ids`` with
+        one set-based statement, touching only rows whose value changes."""
+        vehicle_ids = [vid for vid in vehicle_ids if vid]
+        if not vehicle_ids:
+            return
+        self.flush_model()
+        self.env.cr.execute(self._avg_consumption_update_sql(vehicle_ids))
+        if self.env.cr.rowcount:
+            self.invalidate_model(["avg_consumption_rate"])
+
+    @api.model
+    def _avg_consumption_update_sql(self, vehicle_ids):
+        return SQL(
+            """
+            WITH vehicle AS (
+                SELECT unnest(%(vehicle_ids)s::int[]) AS id
+            ),
+            totals AS (
+                SELECT vehicle_id,
+                       SUM(liter) / NULLIF(SUM(distance), 0) AS rate
+                  FROM (
+                        SELECT vehicle_id, liter, distance
+                          FROM fleet_vehicle_log_fuel
+                         WHERE vehicle_id = ANY(%(vehicle_ids)s)
+                           AND active
+                           AND state IS DISTINCT FROM 'cancelled'
+                           AND distance > 0
+                     UNION ALL
+                        SELECT vehicle_id, measured_liter, distance
+                          FROM fleet_vehicle_fuel_archive
+                         WHERE vehicle_id = ANY(%(vehicle_ids)s)
+                  ) fills
+              GROUP BY vehicle_id
+            ),
+            rates AS (
+                SELECT vehicle.id AS vehicle_id,
+                       COALESCE(totals.rate, 0.0) AS rate
+                  FROM vehicle
+             LEFT JOIN totals ON totals.vehicle_id = vehicle.id
+            )
+            UPDATE fleet_vehicle_log_fuel log
+               SET avg_consumption_rate = rates.rate
+              FROM rates
+             WHERE log.vehicle_id = rates.vehicle_id
+               AND log.avg_consumption_rate IS DISTINCT FROM rates.rate
+            """,
+            vehicle_ids=vehicle_ids,
+        )
+
+    def _fuel_stats_snapshot(self):
+        """Return the state of the live logs of ``self`` the vehicle fuel
+        statistics depend on, by log id."""
+        return {
+            log.id: FuelLogState(
+                log.vehicle_id.id,
+                log.date_time,
+                log.liter,
+                log.odometer,
+                log.distance,
+                log.consumption_rate,
+            )
+            for log in self
+            if log.vehicle_id and log.active and log.state != "cancelled"
+        }
+
+    def _recompute_neighbor_logs(self, neighbors, vehicle_ids, before):
+        """Recompute the logs following the changed logs ``self`` and apply
+        the change to the vehicle statistics, ``before`` being the
+        :meth:`_fuel_stats_snapshot` of ``self`` prior to the change."""
+        before = {**neighbors._fuel_stats_snapshot(), **before}
         if neighbors:
             neighbors._compute_prev_log_stats()
             neighbors._compute_consumption()
-            neighbors._compute_avg_consumption()
+        self._refresh_avg_consumption(vehicle_ids)
+        self.env["fleet.vehicle.fuel.stats"]._apply_log_changes(
+            before, (self | neighbors)._fuel_stats_snapshot()
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._recompute_neighbor_logs(
+            records._affected_neighbor_logs(), records.vehicle_id.ids, {}
+        )
+        self.env["fleet.vehicle.fuel.ledger"]._rewind(
+            records._fuel_ledger_positions()
+        )
+        records._mark_fuel_cost_months_dirty()
         return records
 
-    def write(self, vals):
-        trigger_fields = {"vehicle_id", "date_time", "odometer", "liter", "state"}
-        affected_before = (
-            self._affected_neighbor_logs()
-            if trigger_fields.intersection(vals)
-            else self.browse()
+    def _fuel_ledger_positions(self):
+        return [(record.vehicle_id.id, record.date_time, record.id) for record in self]
+
+    def _mark_fuel_cost_months_dirty(self):
+        self.env["fleet.vehicle.fuel.cost.month"]._mark_dirty(
+            {(record.vehicle_id.id, record.date) for record in self}
         )
+
+    def write(self, vals):
+        neighbor_fields = {
+            "vehicle_id",
+            "date_time",
+            "odometer",
+            "liter",
+            "state",
+            "active",
+        }
+        cost_fields = {"vehicle_id", "date", "date_time", "amount", "state", "active"}
+        update_neighbors = bool(neighbor_fields.intersection(vals))
+        update_costs = bool(cost_fields.intersection(vals))
+        if update_neighbors:
+            successors_before = self._successor_log_ids()
+            vehicles_before = self.vehicle_id
+            ledger_positions = self._fuel_ledger_positions()
+            stats_before = self._fuel_stats_snapshot()
+        if update_costs:
+            self._mark_fuel_cost_months_dirty()
         res = super().write(vals)
-        if trigger_fields.intersection(vals):
-            neighbors = (affected_before | self._affected_neighbor_logs()) - self
-            if neighbors:
-                neighbors._compute_prev_log_stats()
-                neighbors._compute_consumption()
-                neighbors._compute_avg_consumption()
+        if update_neighbors:
+            self._recompute_neighbor_logs(
+                self._affected_neighbor_logs(successors_before),
+                (vehicles_before | self.vehicle_id).ids,
+                stats_before,
+            )
+            self.env["fleet.vehicle.fuel.ledger"]._rewind(
+                ledger_positions + self._fuel_ledger_positions()
+            )
+        if update_costs:
+            self._mark_fuel_cost_months_dirty()
         return res
 
     def unlink(self):
-        neighbors = self._affected_neighbor_logs() - self
+        if self.env.context.get("fuel_log_archive"):
+            # Archived logs are already accounted for, see _archive_fuel_logs.
+            return super().unlink()
+        successor_ids = self._successor_log_ids() - set(self.ids)
+        vehicle_ids = self.vehicle_id.ids
+        ledger_positions = self._fuel_ledger_positions()
+        stats_before = self._fuel_stats_snapshot()
+        self._mark_fuel_cost_months_dirty()
         res = super().unlink()
-        if neighbors.exists():
-            neighbors._compute_prev_log_stats()
-            neighbors._compute_consumption()
-            neighbors._compute_avg_consumption()
+        Log = self.env["fleet.vehicle.log.fuel"]
+        Log._recompute_neighbor_logs(
+            Log._stale_prev_log_stats(successor_ids), vehicle_ids, stats_before
+        )
+        self.env["fleet.vehicle.fuel.ledger"]._rewind(ledger_positions)
         return res
 
+    @api.model
+    def import_fuel_logs(self, vals_list):
+        """Create a batch of fuel logs (e.g. a pump CSV export) at once.
+
+        Odometer readings and logs are each created with a single ``create``
+        call and the litres validation runs afterwards, per vehicle in
+        chronological order, instead of aborting on the first invalid row.
+        Rows that fail are not kept.
+
+        :param vals_list: list of value dicts, as for :meth:`create`
+        :return: one ``{"row": index, "id": log_id, "error": message}`` dict
+            per input row, in input order
+        """
+        report = [
+            {"row": index, "id": False, "error": False}
+            for index in range(len(vals_list))
+        ]
+        vehicle_ids = set(
+            self.env["fleet.vehicle"]
+            .browse({vals.get("vehicle_id") for vals in vals_list} - {None, False})
+            .exists()
+            .ids
+        )
+        now = fields.Datetime.now()
+        rows = []
+        for index, vals in enumerate(vals_list):
+            if vals.get("vehicle_id") not in vehicle_ids:
+                report[index]["error"] = _("Unknown or missing vehicle.")
+                continue
+            vals = dict(vals)
+            date_time = fields.Datetime.to_datetime(vals.get("date_time"))
+            vals["date_time"] = date_time or now
+            rows.append((index, vals))
+        rows.sort(key=lambda row: (row[1]["vehicle_id"], row[1]["date_time"], row[0]))
+
+        Log = self.with_context(skip_fuel_liter_validation=True)
+        try:
+            with self.env.cr.savepoint():
+                logs = Log._import_fuel_log_rows([dict(vals) for _index, vals in rows])
+            created = list(zip([index for index, _vals in rows], logs))
+        except (psycopg2.Error, UserError, ValidationError, ValueError):
+            # Isolate the offending rows, at the cost of one create per row.
+            created = []
+            for index, vals in rows:
+                try:
+                    with self.env.cr.savepoint():
+                        log = Log.create(vals)
+                except (psycopg2.Error, UserError, ValidationError, ValueError) as e:
+                    report[index]["error"] = str(e)
+                else:
+                    created.append((index, log))
+
+        row_by_log = {log: index for index, log in created}
+        rejected = self.browse()
+        logs = self.browse([log.id for _index, log in created])
+        for vehicle_logs in logs.grouped("vehicle_id").values():
+            for log in vehicle_logs.sorted(lambda r: (r.date_time, r.id)):
+                if log.liter <= 0 or log.state == "cancelled":
+                    continue
+                error = log._get_liter_fill_error()
+                if error:
+                    report[row_by_log[log]]["error"] = error
+                    rejected |= log
+        if rejected:
+            odometers = rejected.odometer_id
+            rejected.unlink()
+            odometers.unlink()
+        for log, index in row_by_log.items():
+            if log not in rejected:
+                report[index]["id"] = log.id
+        return report
+
+    def _import_fuel_log_rows(self, vals_list):
+        """Create the odometer readings of ``vals_list`` in one batch, then the
+        logs themselves, and return the logs in ``vals_list`` order."""
+        odometer_rows = [
+            vals
+            for vals in vals_list
+            if vals.get("odometer") and not vals.get("odometer_id")
+        ]
+        odometers = self.env["fleet.vehicle.odometer"].create(
+            [
+                {
+                    "value": vals["odometer"],
+                    "date": vals.get("date") or fields.Date.to_date(vals["date_time"]),
+                    "vehicle_id": vals["vehicle_id"],
+                }
+                for vals in odometer_rows
+            ]
+        )
+        for vals, odometer in zip(odometer_rows, odometers):
+            vals["odometer_id"] = odometer.id
+            del vals["odometer"]
+        return self.create(vals_list)
+
+    # -------------------------------------------------------------------------
+    # Anomaly detection (scheduled)
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _anomaly_detection_params(self):
+        settings = self._get_fuel_settings()
+        return {
+            "watermark": self.env["fleet.vehicle.fuel.job.cursor"]._get_position(
+                "anomaly_detection"
+            ),
+            "pump_tolerance": settings.anomaly_pump_tolerance,
+            "zscore": settings.anomaly_zscore,
+        }
+
+    def _fetch_prev_pump_readings(self):
+        """Return ``{log_id: (pump_meter, physical_pump_reading)}`` of the
+        previous fill taken from the same source location (pump)."""
+        ids = self.filtered("location_id").ids
+        if not ids:
+            return {}
+        self.flush_model(
+            [
+                "location_id",
+                "date_time",
+                "state",
+                "active",
+                "pump_meter",
+                "physical_pump_reading",
+            ]
+        )
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT cur.id, prev.pump_meter, prev.physical_pump_reading
+                  FROM fleet_vehicle_log_fuel cur
+                  JOIN LATERAL (
+                        SELECT log.pump_meter, log.physical_pump_reading
+                          FROM fleet_vehicle_log_fuel log
+                         WHERE log.location_id = cur.location_id
+                           AND log.active
+                           AND log.state IS DISTINCT FROM 'cancelled'
+                           AND (log.date_time, log.id) < (cur.date_time, cur.id)
+                      ORDER BY log.date_time DESC, log.id DESC
+                         LIMIT 1
+                  ) prev ON TRUE
+                 WHERE cur.id = ANY(%s)
+                """,
+                ids,
+            )
+        )
+        return {row[0]: row[1:] for row in self.env.cr.fetchall()}
+
+    def _get_fuel_anomalies(self, params):
+        """Return ``{log: [reason, ...]}`` for the suspicious fills of ``self``."""
+        prev_readings = self._fetch_prev_pump_readings()
+        stats_by_vehicle = {
+            stats.vehicle_id: stats
+            for stats in self.env["fleet.vehicle.fuel.stats"]
+            .sudo()
+            .search([("vehicle_id", "in", self.vehicle_id.ids)])
+        }
+        min_count = self._get_fuel_settings().liter_history_min_count
+        tolerance = params["pump_tolerance"]
+        anomalies = {}
+        for log in self:
+            reasons = []
+            prev_pump_meter, prev_physical = prev_readings.get(log.id, (0.0, 0.0))
+            for label, current, previous in (
+                (_("pump meter"), log.pump_meter, prev_pump_meter),
+                (_("physical pump reading"), log.physical_pump_reading, prev_physical),
+            ):
+                if not current or not previous:
+                    continue
+                delta = current - previous
+                if abs(delta - log.liter) > tolerance:
+                    reasons.append(
+                        _(
+                            "%(label)s moved by %(delta)s L but %(liter)s L were "
+                            "logged"
+                        )
+                        % {"label": label, "delta": round(delta, 2), "liter": log.liter}
+                    )
+            stats = stats_by_vehicle.get(log.vehicle_id)
+            if (
+                stats
+                and log.distance > 0
+                and stats.rate_count >= min_count
+                and stats.rate_std > 0
+            ):
+                zscore = (log.consumption_rate - stats.rate_mean) / stats.rate_std
+                if abs(zscore) > params["zscore"]:
+                    reasons.append(
+                        _(
+                            "consumption rate %(rate)s is %(z)s standard deviations "
+                            "from the vehicle mean of %(mean)s"
+                        )
+                        % {
+                            "rate": round(log.consumption_rate, 3),
+                            "z": round(zscore, 1),
+                            "mean": round(stats.rate_mean, 3),
+                        }
+                    )
+            if reasons:
+                anomalies[log] = reasons
+        return anomalies
+
+    @api.model
+    def _cron_detect_fuel_anomalies(self, batch_size=1000):
+        """Check the fuel logs created since the last run for pump meter
+        mismatches and unusual consumption, and schedule an activity on them.
+
+        Only logs above the stored id watermark are read, so each run costs
+        the same whatever the size of the history.
+        """
+        params = self._anomaly_detection_params()
+        logs = self.search(
+            [
+                ("id", ">", params["watermark"]),
+                ("state", "!=", "cancelled"),
+                ("liter", ">", 0),
+            ],
+            order="id",
+            limit=batch_size,
+        )
+        if not logs:
+            return
+        for log, reasons in logs._get_fuel_anomalies(params).items():
+            log.activity_schedule(
+                "mail.mail_activity_data_warning",
+                summary=_("Fuel anomaly"),
+                note="<br/>".join(reasons),
+                user_id=log.vehicle_id.manager_id.id or self.env.user.id,
+            )
+        self.env["fleet.vehicle.fuel.job.cursor"]._set_position(
+            "anomaly_detection", logs[-1].id
+        )
+        if len(logs) == batch_size:
+            remaining = self.search_count([("id", ">", logs[-1].id)])
+            self.env["ir.cron"]._commit_progress(len(logs), remaining=remaining)
+
+    # -------------------------------------------------------------------------
+    # Dashboard
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _get_fuel_dashboard_version(self):
+        """Return a value that changes whenever the dashboard data may change.
+
+        Edits bump the latest fuel log ``write_date`` and insertions the
+        latest id; deletions do neither, but they update the fuel statistics
+        of the vehicle. Every maximum is read from an index.
+        """
+        self.env.flush_all()
+        self.env.cr.execute(
+            """
+            SELECT (SELECT MAX(write_date) FROM fleet_vehicle_log_fuel),
+                   (SELECT MAX(id) FROM fleet_vehicle_log_fuel),
+                   (SELECT MAX(write_date) FROM fleet_vehicle_fuel_stats)
+            """
+        )
+        return self.env.cr.fetchone()
+
+    @api.model
+    def _get_fuel_dashboard_data(self, domain=()):
+        """Fuel totals of the logs matching ``domain`` per fleet category,
+        per vehicle model and per month, aggregated by a single query.
+
+        Record rules apply to the selected logs.
+        """
+        query = self._search(list(domain) + [("state", "!=", "cancelled")])
+        month = SQL("date_trunc('month', log.date)::date")
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT GROUPING(log.category_id, log.model_id, %(month)s),
+                       log.category_id, log.model_id, %(month)s,
+                       COUNT(*),
+                       COALESCE(SUM(log.liter), 0.0),
+                       COALESCE(SUM(log.amount), 0.0),
+                       COALESCE(SUM(log.liter) FILTER (WHERE log.distance > 0), 0),
+                       COALESCE(SUM(log.distance), 0.0)
+                  FROM fleet_vehicle_log_fuel log
+                 WHERE log.id IN (%(ids)s)
+              GROUP BY GROUPING SETS (
+                        (log.category_id), (log.model_id), (%(month)s)
+                       )
+                """,
+                month=month,
+                ids=query.select(),
+            )
+        )
+        # GROUPING() sets one bit per column left out of the grouping set.
+        series_by_grouping = {
+            0b011: ("categories", 0),
+            0b101: ("models", 1),
+            0b110: ("months", 2),
+        }
+        result = {"categories": [], "models": [], "months": []}
+        for grouping, *keys, count, liter, amount, measured_liter, distance in (
+            self.env.cr.fetchall()
+        ):
+            series, position = series_by_grouping[grouping]
+            key = keys[position]
+            if series == "months" and key:
+                key = key.isoformat()
+            result[series].append(
+                {
+                    "id": key,
+                    "fill_count": count,
+                    "liter": liter,
+                    "amount": amount,
+                    "consumption_rate": (
+                        measured_liter / distance if distance > 0 else 0.0
+                    ),
+                }
+            )
+        for series, model_name in (
+            ("categories", "fleet.vehicle.model.category"),
+            ("models", "fleet.vehicle.model"),
+        ):
+            records = self.env[model_name].browse(
+                [item["id"] for item in result[series] if item["id"]]
+            )
+            names = {record.id: record.display_name for record in records}
+            for item in result[series]:
+                item["name"] = names.get(item["id"], _("Undefined"))
+        result["months"].sort(key=lambda item: item["id"] or "")
+        return result
+
+    # -------------------------------------------------------------------------
+    # Archiving of closed years
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _archive_fuel_logs(self, cutoff, cold_storage=True, batch_size=1000):
+        """Roll the fuel logs dated before ``cutoff`` into the archive tables.
+
+        Per vehicle and month sums feed the cost report, per vehicle totals
+        keep the lifetime statistics and the last archived fill, and with
+        ``cold_storage`` the detail rows are copied to
+        ``fleet.vehicle.log.fuel.cold``. The logs are then unlinked by chunks
+        of ``batch_size`` with the ``fuel_log_archive`` context key, which
+        skips the per-log bookkeeping of :meth:`unlink`:
+
+        * the stored predecessor stats of the remaining logs are still valid;
+        * the ledger keeps the rows of the archived fills;
+        * the cost months already include the archived amounts;
+        * the vehicle stats are refreshed once from the archive instead.
+
+        :return: number of archived logs
+        """
+        self.env.flush_all()
+        self.env.cr.execute(
+            SQL(
+                "SELECT id FROM fleet_vehicle_log_fuel WHERE date_time < %s",
+                cutoff,
+            )
+        )
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        if not ids:
+            return 0
+        params = {"ids": ids, "cutoff": cutoff, "uid": self.env.uid}
+        self.env.cr.execute(
+            SQL(
+                """
+                INSERT INTO fleet_vehicle_fuel_archive_month AS am (
+                    vehicle_id, date_start, fill_count, liter, measured_liter,
+                    distance, amount,
+                    create_uid, create_date, write_uid, write_date
+                )
+                SELECT vehicle_id,
+                       date_trunc('month', date)::date,
+                       COUNT(*),
+                       COALESCE(SUM(liter), 0.0),
+                       COALESCE(SUM(liter) FILTER (WHERE distance > 0), 0.0),
+                       COALESCE(SUM(distance) FILTER (WHERE distance > 0), 0.0),
+                       COALESCE(SUM(amount), 0.0),
+                       %(uid)s, NOW() AT TIME ZONE 'UTC',
+                       %(uid)s, NOW() AT TIME ZONE 'UTC'
+                  FROM fleet_vehicle_log_fuel
+                 WHERE id = ANY(%(ids)s)
+                   AND active
+                   AND state IS DISTINCT FROM 'cancelled'
+                   AND date IS NOT NULL
+              GROUP BY vehicle_id, date_trunc('month', date)
+                    ON CONFLICT (vehicle_id, date_start) DO UPDATE
+                   SET fill_count = am.fill_count + EXCLUDED.fill_count,
+                       liter = am.liter + EXCLUDED.liter,
+                       measured_liter = am.measured_liter + EXCLUDED.measured_liter,
+                       distance = am.distance + EXCLUDED.distance,
+                       amount = am.amount + EXCLUDED.amount,
+                       write_uid = EXCLUDED.write_uid,
+                       write_date = EXCLUDED.write_date
+                """,
+                **params,
+            )
+        )
+        self.env.cr.execute(
+            SQL(
+                """
+                WITH archived AS (
+                    SELECT id, vehicle_id, date, date_time, odometer, liter,
+                           distance, amount, consumption_rate,
+                           active AND state IS DISTINCT FROM 'cancelled' AS fill
+                      FROM fleet_vehicle_log_fuel
+                     WHERE id = ANY(%(ids)s)
+                ),
+                totals AS (
+                    SELECT vehicle_id,
+                           COUNT(*) FILTER (WHERE fill) AS fill_count,
+                           COALESCE(SUM(liter) FILTER (WHERE fill), 0.0) AS liter,
+                           COALESCE(SUM(liter) FILTER (
+                               WHERE fill AND distance > 0), 0.0) AS measured_liter,
+                           COALESCE(SUM(distance) FILTER (
+                               WHERE fill AND distance > 0), 0.0) AS distance,
+                           COALESCE(SUM(amount) FILTER (WHERE fill), 0.0) AS amount,
+                           COUNT(*) FILTER (WHERE fill AND distance > 0)
+                               AS rate_count,
+                           COALESCE(SUM(consumption_rate) FILTER (
+                               WHERE fill AND distance > 0), 0.0) AS rate_sum,
+                           COALESCE(SUM(consumption_rate * consumption_rate)
+                               FILTER (WHERE fill AND distance > 0), 0.0)
+                               AS rate_sq_sum
+                      FROM archived
+                  GROUP BY vehicle_id
+                ),
+                last AS (
+                    SELECT DISTINCT ON (vehicle_id)
+                           vehicle_id, id, odometer, date, date_time
+                      FROM archived
+                     WHERE fill
+                  ORDER BY vehicle_id, date_time DESC, id DESC
+                )
+                INSERT INTO fleet_vehicle_fuel_archive AS fa (
+                    vehicle_id, archived_until, fill_count, liter,
+                    measured_liter, distance, amount,
+                    rate_count, rate_sum, rate_sq_sum,
+                    last_log_id, last_odometer, last_date, last_date_time,
+                    create_uid, create_date, write_uid, write_date
+                )
+                SELECT totals.vehicle_id, %(cutoff)s, totals.fill_count,
+                       totals.liter, totals.measured_liter, totals.distance,
+                       totals.amount, totals.rate_count, totals.rate_sum,
+                       totals.rate_sq_sum,
+                       last.id, last.odometer, last.date, last.date_time,
+                       %(uid)s, NOW() AT TIME ZONE 'UTC',
+                       %(uid)s, NOW() AT TIME ZONE 'UTC'
+                  FROM totals
+             LEFT JOIN last ON last.vehicle_id = totals.vehicle_id
+                    ON CONFLICT (vehicle_id) DO UPDATE
+                   SET archived_until = GREATEST(
+                           fa.archived_until, EXCLUDED.archived_until
+                       ),
+                       fill_count = fa.fill_count + EXCLUDED.fill_count,
+                       liter = fa.liter + EXCLUDED.liter,
+                       measured_liter = fa.measured_liter + EXCLUDED.measured_liter,
+                       distance = fa.distance + EXCLUDED.distance,
+                       amount = fa.amount + EXCLUDED.amount,
+                       rate_count = fa.rate_count + EXCLUDED.rate_count,
+                       rate_sum = fa.rate_sum + EXCLUDED.rate_sum,
+                       rate_sq_sum = fa.rate_sq_sum + EXCLUDED.rate_sq_sum,
+                       last_log_id = COALESCE(EXCLUDED.last_log_id, fa.last_log_id),
+                       last_odometer = CASE WHEN EXCLUDED.last_log_id IS NULL
+                           THEN fa.last_odometer ELSE EXCLUDED.last_odometer END,
+                       last_date = COALESCE(EXCLUDED.last_date, fa.last_date),
+                       last_date_time = COALESCE(
+                           EXCLUDED.last_date_time, fa.last_date_time
+                       ),
+                       write_uid = EXCLUDED.write_uid,
+                       write_date = EXCLUDED.write_date
+             RETURNING vehicle_id
+                """,
+                **params,
+            )
+        )
+        vehicle_ids = [row[0] for row in self.env.cr.fetchall()]
+        if cold_storage:
+            self.env.cr.execute(
+                SQL(
+                    """
+                    INSERT INTO fleet_vehicle_log_fuel_cold (
+                        log_id, vehicle_id, category_id, company_id, product_id,
+                        location_id, date, date_time, state, active, odometer,
+                        liter, price_per_liter, amount, distance,
+                        consumption_rate, pump_meter, physical_pump_reading,
+                        create_uid, create_date, write_uid, write_date
+                    )
+                    SELECT log.id, log.vehicle_id, fv.category_id, log.company_id,
+                           log.product_id, log.location_id, log.date,
+                           log.date_time, log.state, log.active, log.odometer,
+                           log.liter, log.price_per_liter, log.amount,
+                           log.distance, log.consumption_rate, log.pump_meter,
+                           log.physical_pump_reading,
+                           %(uid)s, NOW() AT TIME ZONE 'UTC',
+                           %(uid)s, NOW() AT TIME ZONE 'UTC'
+                      FROM fleet_vehicle_log_fuel log
+                      JOIN fleet_vehicle fv ON fv.id = log.vehicle_id
+                     WHERE log.id = ANY(%(ids)s)
+                    """,
+                    **params,
+                )
+            )
+        Log = self.sudo().with_context(fuel_log_archive=True)
+        for logs in split_every(batch_size, ids, Log.browse):
+            logs.unlink()
+        self.env["fleet.vehicle.fuel.stats"]._refresh(vehicle_ids)
+        return len(ids)
+
+    @api.model
+    def _cron_archive_fuel_logs(self):
+        """Archive the fuel logs of the years older than the configured
+        number of years to keep (``fleet_vehicle_log_fuel.archive_keep_years``,
+        0 disables archiving)."""
+        settings = self._get_fuel_settings()
+        if settings.archive_keep_years <= 0:
+            return
+        year = fields.Date.context_today(self).year
+        cutoff = datetime(year - settings.archive_keep_years + 1, 1, 1)
+        self._archive_fuel_logs(cutoff, cold_storage=settings.archive_cold_storage)
+
     @api.onchange("product_id")
     def _onchange_product_id(self):
         if self.product_id:
@@ -520,6 +1445,9 @@ class FleetVehicleLogFuel(models.Model):
             record.odometer = record.odometer_id.value
 
     def _inverse_odometer(self):
+        Odometer = self.env["fleet.vehicle.odometer"]
+        to_update = defaultdict(lambda: Odometer)
+        to_create = self.browse()
         for record in self:
             if not record.odometer:
                 # Clearing an existing reading is not allowed, but a new record
@@ -530,11 +1458,17 @@ class FleetVehicleLogFuel(models.Model):
                     )
                 continue
             if record.odometer_id:
-                record.odometer_id.value = record.odometer
+                to_update[record.odometer] |= record.odometer_id
             else:
-                record.odometer_id = self.env["fleet.vehicle.odometer"].create(
-                    record._prepare_fleet_vehicle_odometer_vals()
-                )
+                to_create |= record
+        for value, odometers in to_update.items():
+            odometers.value = value
+        if to_create:
+            odometers = Odometer.create(
+                [record._prepare_fleet_vehicle_odometer_vals() for record in to_create]
+            )
+            for record, odometer in zip(to_create, odometers):
+                record.odometer_id = odometer
 
     @api.depends("vehicle_id")
     def _compute_purchaser_id(self):
@@ -570,32 +1504,52 @@ class FleetVehicleLogFuel(models.Model):
         records.state = "todo"
         return True
 
+    def _prepare_stock_move_vals(self, default_location_dest):
+        self.ensure_one()
+        return {
+            "product_id": self.product_id.id,
+            "product_uom_qty": self.liter,
+            "product_uom": self.product_id.uom_id.id,
+            "location_id": self.location_id.id,
+            "location_dest_id": self.location_dest_id.id or default_location_dest.id,
+            "origin": self.vehicle_id.name,
+        }
+
+    def _create_done_stock_moves(self):
+        """Create and validate the fuel stock moves of ``self`` as one batch.
+
+        Logs are grouped by product and locations so related moves are
+        reserved together; each log still gets its own move.
+        """
+        to_move = self.filtered(
+            lambda x: x.product_id and x.location_id and x.liter > 0
+        ).sorted(
+            lambda x: (x.product_id.id, x.location_id.id, x.location_dest_id.id)
+        )
+        if not to_move:
+            return
+        customers = self.env.ref("stock.stock_location_customers")
+        moves = self.env["stock.move"].create(
+            [item._prepare_stock_move_vals(customers) for item in to_move]
+        )
+        moves._action_confirm(merge=False)
+        moves._action_assign()
+        for line in moves.move_line_ids:
+            line.quantity = line.quantity_product_uom
+        moves._action_done()
+        for item, move in zip(to_move, moves):
+            item.stock_move_id = move
+
     def button_done(self):
         running = self.filtered(lambda x: x.state == "running")
         running._check_liter_fill_amount()
-        for item in running:
-            if item.product_id and item.location_id and item.liter > 0:
-                move_vals = {
-                    "product_id": item.product_id.id,
-                    "product_uom_qty": item.liter,
-                    "product_uom": item.product_id.uom_id.id,
-                    "location_id": item.location_id.id,
-                    "location_dest_id": item.location_dest_id.id
-                    or self.env.ref("stock.stock_location_customers").id,
-                    "origin": item.vehicle_id.name,
-                }
-                move = self.env["stock.move"].create(move_vals)
-                move._action_confirm()
-                move._action_assign()
-                for line in move.move_line_ids:
-                    line.quantity = line.quantity_product_uom
-                move._action_done()
-                item.stock_move_id = move.id
-
-            item.service_id = self.env["fleet.vehicle.log.services"].create(
-                self._prepare_fleet_vehicle_log_services_vals()
-            )
-            item.state = "done"
+        running._create_done_stock_moves()
+        services = self.env["fleet.vehicle.log.services"].create(
+            [item._prepare_fleet_vehicle_log_services_vals() for item in running]
+        )
+        for item, service in zip(running, services):
+            item.service_id = service
+        running.state = "done"
         return True
 
     def button_cancel(self):
@@ -1 +1,3 @@
+from . import fleet_vehicle_fuel_cost_month
 from . import fleet_report
+from . import fleet_vehicle_fuel_analysis
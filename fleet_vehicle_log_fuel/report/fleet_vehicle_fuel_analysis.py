@@ -0,0 +1,127 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import _, fields, models
+
+
+class FleetVehicleFuelAnalysis(models.TransientModel):
+    _name = "fleet.vehicle.fuel.analysis"
+    _description = "Fuel consumption analysis"
+
+    date_from = fields.Date()
+    date_to = fields.Date()
+    vehicle_ids = fields.Many2many(
+        "fleet.vehicle", string="Vehicles", help="Leave empty to analyse all vehicles."
+    )
+    category_ids = fields.Many2many(
+        "fleet.vehicle.model.category", string="Fleet Categories"
+    )
+    window = fields.Integer(
+        string="Rolling Window (fills)",
+        default=5,
+        help="Number of fills averaged by the rolling consumption rate.",
+    )
+    z_threshold = fields.Float(
+        string="Anomaly Z-Score",
+        default=3.0,
+        help="Fills whose consumption rate deviates from the vehicle's mean by "
+        "more than this many standard deviations are flagged as anomalies.",
+    )
+    include_archived = fields.Boolean(
+        string="Include Archived Logs",
+        help="Also analyse the detail rows of the archived fuel logs.",
+    )
+    line_ids = fields.One2many("fleet.vehicle.fuel.analysis.line", "analysis_id")
+    anomaly_log_ids = fields.Many2many(
+        "fleet.vehicle.log.fuel", string="Anomalous Fills", readonly=True
+    )
+
+    def _get_log_domain(self):
+        self.ensure_one()
+        domain = []
+        if self.date_from:
+            domain.append(("date", ">=", self.date_from))
+        if self.date_to:
+            domain.append(("date", "<=", self.date_to))
+        if self.vehicle_ids:
+            domain.append(("vehicle_id", "in", self.vehicle_ids.ids))
+        if self.category_ids:
+            domain.append(("category_id", "in", self.category_ids.ids))
+        return domain
+
+    def action_compute(self):
+        self.ensure_one()
+        result = self.env["fleet.vehicle.fuel.analytics"].analyse(
+            self._get_log_domain(),
+            window=self.window,
+            z_threshold=self.z_threshold,
+            include_archived=self.include_archived,
+        )
+        vehicles = result["vehicles"]
+        self.line_ids.unlink()
+        self.env["fleet.vehicle.fuel.analysis.line"].create(
+            [
+                dict(
+                    month,
+                    analysis_id=self.id,
+                    vehicle_avg_rate=vehicles[month["vehicle_id"]]["avg_rate"],
+                    vehicle_p50_rate=vehicles[month["vehicle_id"]]["p50_rate"],
+                    vehicle_p90_rate=vehicles[month["vehicle_id"]]["p90_rate"],
+                )
+                for month in result["months"]
+            ]
+        )
+        logs = result["logs"]
+        # Anomalies among archived logs are only counted, they have no record.
+        self.anomaly_log_ids = (
+            self.env["fleet.vehicle.log.fuel"]
+            .browse(logs["id"][logs["anomaly"]].tolist())
+            .exists()
+            if logs
+            else False
+        )
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Fuel Consumption Analysis"),
+            "res_model": "fleet.vehicle.fuel.analysis.line",
+            "view_mode": "pivot,graph,list",
+            "domain": [("analysis_id", "=", self.id)],
+            "target": "current",
+        }
+
+    def action_view_anomalies(self):
+        self.ensure_one()
+        action = self.env["ir.actions.act_window"]._for_xml_id(
+            "fleet_vehicle_log_fuel.fleet_vehicle_log_fuel_action"
+        )
+        action.update(
+            name=_("Anomalous Fills"),
+            domain=[("id", "in", self.anomaly_log_ids.ids)],
+        )
+        return action
+
+
+class FleetVehicleFuelAnalysisLine(models.TransientModel):
+    _name = "fleet.vehicle.fuel.analysis.line"
+    _description = "Fuel consumption analysis per vehicle and month"
+    _order = "vehicle_id, month"
+
+    analysis_id = fields.Many2one(
+        "fleet.vehicle.fuel.analysis", required=True, ondelete="cascade"
+    )
+    vehicle_id = fields.Many2one("fleet.vehicle", "Vehicle", readonly=True)
+    category_id = fields.Many2one(
+        related="vehicle_id.category_id", string="Fleet Category", store=True
+    )
+    month = fields.Date(readonly=True)
+    fill_count = fields.Integer(string="Fills", readonly=True)
+    liter = fields.Float(string="Litres", readonly=True)
+    distance = fields.Float(readonly=True)
+    consumption_rate = fields.Float(
+        readonly=True, aggregator="avg", help="Litres per distance unit this month."
+    )
+    anomaly_count = fields.Integer(string="Anomalies", readonly=True)
+    vehicle_avg_rate = fields.Float(
+        string="Lifetime CR", readonly=True, aggregator="avg"
+    )
+    vehicle_p50_rate = fields.Float(string="Median CR", readonly=True, aggregator="avg")
+    vehicle_p90_rate = fields.Float(string="P90 CR", readonly=True, aggregator="avg")
@@ -0,0 +1,178 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class FleetVehicleFuelCostMonth(models.Model):
+    """Fuel cost per vehicle and month, feeding the fleet cost report.
+
+    Fuel log changes only flag the (vehicle, month) rows they touch as dirty;
+    those rows are recomputed by a cron, so reading the cost report never
+    writes.
+    """
+
+    _name = "fleet.vehicle.fuel.cost.month"
+    _description = "Monthly fuel cost per vehicle"
+    _order = "date_start desc, vehicle_id"
+
+    vehicle_id = fields.Many2one(
+        "fleet.vehicle", required=True, ondelete="cascade", readonly=True
+    )
+    date_start = fields.Date(required=True, readonly=True)
+    cost = fields.Float(readonly=True)
+    log_count = fields.Integer(readonly=True)
+    dirty = fields.Boolean(readonly=True)
+
+    _vehicle_month_uniq = models.Constraint(
+        "UNIQUE(vehicle_id, date_start)",
+        "Only one fuel cost row per vehicle and month is allowed.",
+    )
+    _dirty_idx = models.Index("(id) WHERE dirty")
+
+    def init(self):
+        # Build the table from the existing fuel logs on installation; later
+        # changes go through the dirty flags.
+        self.env.cr.execute("SELECT 1 FROM fleet_vehicle_fuel_cost_month LIMIT 1")
+        if not self.env.cr.rowcount:
+            self._rebuild()
+
+    @api.model
+    def _rebuild(self):
+        """Rebuild the whole table from the fuel logs and the archived
+        months."""
+        self.env.cr.execute(
+            SQL(
+                """
+                DELETE FROM fleet_vehicle_fuel_cost_month;
+                INSERT INTO fleet_vehicle_fuel_cost_month (
+                    vehicle_id, date_start, cost, log_count, dirty,
+                    create_uid, create_date, write_uid, write_date
+                )
+                SELECT vehicle_id, date_start, SUM(cost), SUM(log_count), FALSE,
+                       %(uid)s, NOW() AT TIME ZONE 'UTC',
+                       %(uid)s, NOW() AT TIME ZONE 'UTC'
+                  FROM (
+                        SELECT vehicle_id,
+                               date_trunc('month', date)::date AS date_start,
+                               COALESCE(amount, 0.0) AS cost,
+                               1 AS log_count
+                          FROM fleet_vehicle_log_fuel
+                         WHERE active
+                           AND state IS DISTINCT FROM 'cancelled'
+                           AND date IS NOT NULL
+                     UNION ALL
+                        SELECT vehicle_id, date_start, amount, fill_count
+                          FROM fleet_vehicle_fuel_archive_month
+                  ) fills
+              GROUP BY vehicle_id, date_start
+                """,
+                uid=self.env.uid,
+            )
+        )
+
+    @api.model
+    def _mark_dirty(self, vehicle_months):
+        """Flag the given ``(vehicle_id, date)`` months for recomputation."""
+        vehicle_months = {
+            (vehicle_id, date.replace(day=1))
+            for vehicle_id, date in vehicle_months
+            if vehicle_id and date
+        }
+        if not vehicle_months:
+            return
+        vehicle_ids, dates = zip(*vehicle_months)
+        self.env.cr.execute(
+            SQL(
+                """
+                INSERT INTO fleet_vehicle_fuel_cost_month (
+                    vehicle_id, date_start, cost, log_count, dirty,
+                    create_uid, create_date, write_uid, write_date
+                )
+                SELECT touched.vehicle_id, touched.date_start, 0.0, 0, TRUE,
+                       %(uid)s, NOW() AT TIME ZONE 'UTC',
+                       %(uid)s, NOW() AT TIME ZONE 'UTC'
+                  FROM unnest(%(vehicle_ids)s::int[], %(dates)s::date[])
+                       AS touched(vehicle_id, date_start)
+                    ON CONFLICT (vehicle_id, date_start) DO UPDATE
+                   SET dirty = TRUE
+                """,
+                vehicle_ids=list(vehicle_ids),
+                dates=list(dates),
+                uid=self.env.uid,
+            )
+        )
+        self.invalidate_model(["dirty"])
+
+    @api.model
+    def _refresh_dirty(self):
+        """Recompute the dirty months, dropping the ones left without logs,
+        live or archived.
+
+        Dirty rows locked by a concurrent refresh are skipped rather than
+        waited for; that refresh recomputes them.
+        """
+        self.env.cr.execute(
+            "SELECT 1 FROM fleet_vehicle_fuel_cost_month WHERE dirty LIMIT 1"
+        )
+        if not self.env.cr.rowcount:
+            return
+        self.env["fleet.vehicle.log.fuel"].flush_model(
+            ["vehicle_id", "date", "amount", "state", "active"]
+        )
+        self.env.cr.execute(
+            SQL(
+                """
+                WITH dirty AS (
+                    SELECT id
+                      FROM fleet_vehicle_fuel_cost_month
+                     WHERE dirty
+                       FOR UPDATE SKIP LOCKED
+                ),
+                live AS (
+                    SELECT cm.id,
+                           COALESCE(SUM(log.amount), 0.0) AS cost,
+                           COUNT(log.id) AS log_count
+                      FROM dirty
+                      JOIN fleet_vehicle_fuel_cost_month cm ON cm.id = dirty.id
+                 LEFT JOIN fleet_vehicle_log_fuel log
+                        ON log.vehicle_id = cm.vehicle_id
+                       AND log.date >= cm.date_start
+                       AND log.date < cm.date_start + INTERVAL '1 month'
+                       AND log.active
+                       AND log.state IS DISTINCT FROM 'cancelled'
+                  GROUP BY cm.id
+                ),
+                totals AS (
+                    SELECT live.id,
+                           live.cost + COALESCE(am.amount, 0.0) AS cost,
+                           live.log_count + COALESCE(am.fill_count, 0) AS log_count
+                      FROM live
+                      JOIN fleet_vehicle_fuel_cost_month cm ON cm.id = live.id
+                 LEFT JOIN fleet_vehicle_fuel_archive_month am
+                        ON am.vehicle_id = cm.vehicle_id
+                       AND am.date_start = cm.date_start
+                )
+                UPDATE fleet_vehicle_fuel_cost_month cm
+                   SET cost = totals.cost,
+                       log_count = totals.log_count,
+                       dirty = FALSE,
+                       write_uid = %(uid)s,
+                       write_date = NOW() AT TIME ZONE 'UTC'
+                  FROM totals
+                 WHERE cm.id = totals.id
+                """,
+                uid=self.env.uid,
+            )
+        )
+        self.env.cr.execute(
+            """
+            DELETE FROM fleet_vehicle_fuel_cost_month
+             WHERE log_count = 0 AND NOT dirty
+            """
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _cron_refresh(self):
+        self._refresh_dirty()
@@ -1 +1,2 @@
 from . import test_fleet_vehicle_log_fuel
+from . import test_fleet_vehicle_log_fuel_benchmark
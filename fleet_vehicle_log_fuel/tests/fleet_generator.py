@@ -0,0 +1,81 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import random
+from datetime import datetime, timedelta
+
+# Litres per distance unit, i.e. 6 to 14 L/100km.
+CONSUMPTION_RANGE = (0.06, 0.14)
+TRIP_RANGE = (150, 700)
+FILL_INTERVAL_HOURS = (24, 120)
+TANK_CAPACITIES = (60.0, 80.0, 120.0, 200.0, 400.0)
+
+
+def generate_fleet_values(vehicles, fills, seed=0, start=None):
+    """Return deterministic values for a synthetic fleet.
+
+    Every vehicle gets its own base consumption rate and tank; fills follow
+    each other with realistic odometer growth and the litres burnt since the
+    previous fill (with some noise), capped by the tank capacity.
+
+    :param vehicles: number of vehicles to generate
+    :param fills: number of fuel logs per vehicle
+    :param seed: seed of the random generator, same seed, same fleet
+    :return: list of ``(vehicle_vals, [fuel_log_vals, ...])`` tuples, fuel log
+        values lack the ``vehicle_id`` key
+    """
+    rng = random.Random(seed)
+    start = start or datetime(2024, 1, 1, 6, 0)
+    fleet = []
+    for index in range(vehicles):
+        capacity = rng.choice(TANK_CAPACITIES)
+        rate = rng.uniform(*CONSUMPTION_RANGE)
+        odometer = float(rng.randint(0, 50000))
+        date_time = start + timedelta(minutes=rng.randint(0, 24 * 60))
+        logs = []
+        for _fill in range(fills):
+            trip = rng.uniform(*TRIP_RANGE)
+            odometer += trip
+            date_time += timedelta(hours=rng.uniform(*FILL_INTERVAL_HOURS))
+            liter = min(trip * rate * rng.uniform(0.9, 1.1), capacity)
+            logs.append(
+                {
+                    "date_time": date_time.replace(microsecond=0),
+                    "odometer": round(odometer, 1),
+                    "liter": round(liter, 2),
+                    "price_per_liter": 1.5,
+                    "amount": round(liter * 1.5, 2),
+                }
+            )
+        fleet.append(
+            (
+                {
+                    "license_plate": f"BENCH-{seed}-{index:05d}",
+                    "fuel_tank_capacity": capacity,
+                },
+                logs,
+            )
+        )
+    return fleet
+
+
+def generate_fleet(env, model, vehicles, fills, seed=0):
+    """Create a synthetic fleet of ``model`` vehicles and their fuel logs.
+
+    :return: ``(vehicles, fuel_logs)`` recordsets
+    """
+    fleet = generate_fleet_values(vehicles, fills, seed=seed)
+    records = env["fleet.vehicle"].create(
+        [dict(vehicle_vals, model_id=model.id) for vehicle_vals, _logs in fleet]
+    )
+    logs = (
+        env["fleet.vehicle.log.fuel"]
+        .with_context(skip_fuel_liter_validation=True)
+        .create(
+            [
+                dict(log_vals, vehicle_id=vehicle.id)
+                for vehicle, (_vehicle_vals, log_vals_list) in zip(records, fleet)
+                for log_vals in log_vals_list
+            ]
+        )
+    )
+    return records, logs
@@ -1,9 +1,12 @@
 # Copyright 2024 Tecnativa - Víctor Martínez
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl
-from odoo.exceptions import UserError
+from datetime import datetime
+
+from odoo.exceptions import UserError, ValidationError
 from odoo.tests import Form
-from odoo.tools import mute_logger
+from odoo.tools import SQL, mute_logger
 
+from ..controllers.main import get_fill_limit_preview, get_fuel_dashboard
 from .common import TestFleetVehicleLogFuelBase
 
 
@@ -39,6 +42,38 @@ class TestFleetVehicleLogFuelMisc(TestFleetVehicleLogFuelBase):
         fuel.button_todo()
         self.assertEqual(fuel.state, "todo")
 
+    def test_button_done_batch(self):
+        product = self.env["product.product"].create(
+            {"name": "Diesel", "is_storable": True, "is_fuel": True}
+        )
+        location = self.env.ref("stock.stock_location_stock")
+        self.env["stock.quant"]._update_available_quantity(product, location, 100)
+        vehicle_2 = self.env["fleet.vehicle"].create(
+            {"model_id": self.model.id, "license_plate": "TEST456"}
+        )
+        fuels = self.env["fleet.vehicle.log.fuel"].create(
+            [
+                {
+                    "vehicle_id": vehicle.id,
+                    "product_id": product.id,
+                    "location_id": location.id,
+                    "liter": liter,
+                    "amount": liter * 1.5,
+                    "odometer": 1000,
+                }
+                for vehicle, liter in ((self.vehicle, 20), (vehicle_2, 30))
+            ]
+        )
+        fuels.button_running()
+        fuels.button_done()
+        self.assertEqual(set(fuels.mapped("state")), {"done"})
+        self.assertEqual(len(fuels.stock_move_id), 2)
+        self.assertEqual(set(fuels.stock_move_id.mapped("state")), {"done"})
+        self.assertEqual(fuels.mapped("stock_move_id.product_uom_qty"), [20, 30])
+        self.assertEqual(len(fuels.service_id), 2)
+        self.assertEqual(fuels.service_id.vehicle_id, self.vehicle | vehicle_2)
+        self.assertEqual(fuels.mapped("service_id.amount"), [30, 45])
+
     def test_fleet_vehicle_log_fuel_onchange(self):
         # Check amount
         fuel_form_1 = Form(
@@ -85,6 +120,7 @@ class TestFleetVehicleLogFuelReport(TestFleetVehicleLogFuelBase):
         )
         fuel.button_running()
         fuel.button_done()
+        cls.env["fleet.vehicle.fuel.cost.month"]._cron_refresh()
 
     def test_fleet_vehicle_cost_report(self):
         items = self.env["fleet.vehicle.cost.report"].search(
@@ -95,6 +131,39 @@ class TestFleetVehicleLogFuelReport(TestFleetVehicleLogFuelBase):
             sum(items.filtered(lambda x: x.cost_type == "fuel").mapped("cost")), 75
         )
 
+    def test_fleet_vehicle_cost_report_zero_months(self):
+        items = self.env["fleet.vehicle.cost.report"].search(
+            [
+                ("vehicle_id", "=", self.vehicle.id),
+                ("date_start", "=", "2024-02-01"),
+                ("cost_type", "=", "fuel"),
+            ]
+        )
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items.cost, 0)
+
+    def test_fleet_vehicle_cost_report_follows_changes(self):
+        fuel = self.env["fleet.vehicle.log.fuel"].search(
+            [("vehicle_id", "=", self.vehicle.id)]
+        )
+        fuel.amount = 90
+        month = self.env["fleet.vehicle.fuel.cost.month"].search(
+            [("vehicle_id", "=", self.vehicle.id)]
+        )
+        self.assertTrue(month.dirty)
+        self.env["fleet.vehicle.fuel.cost.month"]._cron_refresh()
+        items = self.env["fleet.vehicle.cost.report"].search(
+            [
+                ("vehicle_id", "=", self.vehicle.id),
+                ("date_start", "=", "2024-01-01"),
+                ("cost_type", "=", "fuel"),
+            ]
+        )
+        self.assertEqual(sum(items.mapped("cost")), 90)
+        fuel.button_cancel()
+        self.env["fleet.vehicle.fuel.cost.month"]._cron_refresh()
+        self.assertFalse(month.exists())
+
 
 class TestFleetVehicleLogFuelUtilization(TestFleetVehicleLogFuelBase):
     """Cover the utilization stats used by the fuel reporting graph/pivot."""
@@ -142,6 +211,79 @@ class TestFleetVehicleLogFuelUtilization(TestFleetVehicleLogFuelBase):
         self.assertEqual(first.distance, 100.0)
         self.assertAlmostEqual(first.consumption_rate, 0.25)
 
+    def test_batch_create_chains_prev_logs(self):
+        logs = self.env["fleet.vehicle.log.fuel"].create(
+            [
+                {
+                    "vehicle_id": self.vehicle.id,
+                    "date_time": f"2024-01-{day:02d} 08:00:00",
+                    "odometer": odometer,
+                    "liter": 20,
+                }
+                for day, odometer in ((1, 1000), (10, 1100), (20, 1250))
+            ]
+        )
+        self.assertEqual(logs.mapped("prev_odometer"), [0.0, 1000.0, 1100.0])
+        self.assertEqual(logs.mapped("distance"), [0.0, 100.0, 150.0])
+        self.assertAlmostEqual(logs[0].avg_consumption_rate, 40 / 250)
+
+    def test_batch_create_odometers(self):
+        logs = self.env["fleet.vehicle.log.fuel"].create(
+            [
+                {
+                    "vehicle_id": self.vehicle.id,
+                    "date_time": f"2024-01-{day:02d} 08:00:00",
+                    "odometer": 1000 + day * 100,
+                    "liter": 10,
+                }
+                for day in range(1, 4)
+            ]
+        )
+        self.assertEqual(len(logs.odometer_id), 3)
+        self.assertEqual(logs.odometer_id.mapped("value"), [1100, 1200, 1300])
+        self.assertEqual(logs.odometer_id.vehicle_id, self.vehicle)
+        logs[1:].write({"odometer": 1250})
+        self.assertEqual(logs.odometer_id.mapped("value"), [1100, 1250, 1250])
+
+    def test_prev_log_stats_query_count_is_constant(self):
+        # Larger batches (10 / 1k / 50k logs) are covered by the fuel_benchmark
+        # test_prev_log_stats_scaling case.
+        logs = self.env["fleet.vehicle.log.fuel"].create(
+            [
+                {
+                    "vehicle_id": self.vehicle.id,
+                    "date_time": f"2024-01-{day:02d} 08:00:00",
+                    "odometer": 1000 + day * 10,
+                    "liter": 5,
+                }
+                for day in range(1, 29)
+            ]
+        )
+        counts = []
+        for batch in (logs[:2], logs):
+            batch.invalidate_recordset(["prev_odometer", "prev_date", "has_prev_log"])
+            start = self.env.cr.sql_log_count
+            batch._compute_prev_log_stats()
+            counts.append(self.env.cr.sql_log_count - start)
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(logs[-1].prev_odometer, logs[-2].odometer)
+
+    def test_same_instant_fills_are_ordered_by_id(self):
+        first = self._create_log("2024-01-01 08:00:00", 1000, 50)
+        second = self._create_log("2024-01-01 08:00:00", 1010, 5)
+        self.assertFalse(first.has_prev_log)
+        self.assertEqual(second.prev_odometer, 1000)
+
+    def test_unlink_relinks_successor(self):
+        self._create_log("2024-01-01 08:00:00", 1000, 50)
+        middle = self._create_log("2024-01-10 08:00:00", 1050, 30, state="todo")
+        last = self._create_log("2024-01-20 08:00:00", 1100, 20)
+        self.assertEqual(last.prev_odometer, 1050)
+        middle.unlink()
+        last.invalidate_recordset()
+        self.assertEqual(last.prev_odometer, 1000)
+        self.assertEqual(last.distance, 100.0)
+
     def test_cancelled_log_is_ignored_for_prev(self):
         self._create_log("2024-01-01 08:00:00", 1000, 50)
         self._create_log("2024-01-10 08:00:00", 1050, 30, state="cancelled")
@@ -239,3 +381,513 @@ class TestFleetVehicleLogFuelLiterRestriction(TestFleetVehicleLogFuelBase):
         # avg ~12 L × 2 = 24; past max 14 × 1.25 = 17.5 → effective cap 17.5
         self.assertLessEqual(log.liter_max_allowed, 17.5)
         self.assertGreater(log.liter_max_allowed, 0)
+
+    def test_fuel_stats_follow_fuel_logs(self):
+        self.vehicle.fuel_tank_capacity = 100.0
+        self._seed_typical_fills()
+        stats = self.env["fleet.vehicle.fuel.stats"]._get_for_vehicle(self.vehicle)
+        self.assertEqual(len(stats), 1)
+        self.assertEqual([liter for _id, liter in stats.recent_fills], [14, 12, 10])
+        self.assertEqual(stats.fill_max, 14)
+        self.assertAlmostEqual(stats.fill_avg, 12)
+        self.assertEqual(stats.lifetime_liter, 26)
+        self.assertEqual(stats.lifetime_distance, 200)
+        self.assertEqual(stats.last_odometer, 1200)
+        last = stats.last_log_id
+        last.unlink()
+        # The lifetime sums follow the change, the recent fills wait for the
+        # cron; reading the statistics meanwhile writes nothing.
+        self.assertTrue(stats.dirty)
+        self.assertEqual(stats.lifetime_liter, 12)
+        stats = self.env["fleet.vehicle.fuel.stats"]._get_for_vehicle(self.vehicle)
+        self.assertEqual(stats.last_odometer, 1100)
+        self.assertEqual(stats.fill_max, 12)
+        self.assertTrue(self.vehicle.fuel_stats_ids.dirty)
+        self.env["fleet.vehicle.fuel.stats"]._cron_refresh()
+        stats = self.vehicle.fuel_stats_ids
+        self.assertFalse(stats.dirty)
+        self.assertEqual([liter for _id, liter in stats.recent_fills], [12, 10])
+        self.assertEqual(stats.last_odometer, 1100)
+
+    def test_fuel_stats_extend_with_newer_fills(self):
+        self.vehicle.fuel_tank_capacity = 100.0
+        self._seed_typical_fills()
+        log = self._create_fuel(13, odometer=1300, date_time="2024-01-25 08:00:00")
+        stats = self.vehicle.fuel_stats_ids
+        self.assertFalse(stats.dirty)
+        self.assertEqual(stats.last_log_id, log)
+        self.assertEqual([liter for _id, liter in stats.recent_fills], [13, 14, 12, 10])
+        self.assertEqual(stats.fill_max, 14)
+        self.assertAlmostEqual(stats.lifetime_liter, 39)
+        self.assertAlmostEqual(stats.lifetime_distance, 300)
+
+    def test_fill_limits_exclude_current_log(self):
+        self.vehicle.fuel_tank_capacity = 100.0
+        self._seed_typical_fills()
+        log = self._create_fuel(13, odometer=1300, date_time="2024-01-25 08:00:00")
+        self.assertEqual(log._get_historical_fill_liters(), [14, 12, 10])
+        self.assertAlmostEqual(log._get_vehicle_avg_consumption_rate(), 26 / 200)
+
+    def test_import_fuel_logs_reports_rejected_rows(self):
+        self.vehicle.fuel_tank_capacity = 100.0
+        rows = [
+            {
+                "vehicle_id": self.vehicle.id,
+                "date_time": f"2024-01-{day:02d} 08:00:00",
+                "odometer": odometer,
+                "liter": liter,
+            }
+            for day, liter, odometer in (
+                (20, 14, 1200),
+                (1, 10, 1000),
+                (15, 12, 1100),
+                (25, 99, 1300),
+            )
+        ]
+        rows.append({"liter": 10})
+        report = self.env["fleet.vehicle.log.fuel"].import_fuel_logs(rows)
+        self.assertEqual([line["row"] for line in report], [0, 1, 2, 3, 4])
+        self.assertTrue(all(line["id"] for line in report[:3]))
+        self.assertFalse(report[3]["id"])
+        self.assertIn("exceeds", report[3]["error"])
+        self.assertTrue(report[4]["error"])
+        logs = self.env["fleet.vehicle.log.fuel"].browse(
+            [line["id"] for line in report[:3]]
+        )
+        self.assertTrue(all(logs.mapped("odometer_id")))
+        self.assertEqual(
+            logs.sorted("date_time").mapped("prev_odometer"), [0, 1000, 1100]
+        )
+        self.assertEqual(self.vehicle.fuel_count, 3)
+
+    def test_fill_limit_preview(self):
+        self.vehicle.fuel_tank_capacity = 100.0
+        self._seed_typical_fills()
+        preview = get_fill_limit_preview(self.env, self.vehicle.id, 1300)
+        # Largest past fill (14 L) * 1.25, 100 km at 26 L / 200 km expected.
+        self.assertAlmostEqual(preview["max_liter"], 17.5)
+        self.assertAlmostEqual(preview["expected_liter"], 13)
+        self.assertEqual(len(preview["details"]), 3)
+        self.assertIs(get_fill_limit_preview(self.env, self.vehicle.id, 1300), preview)
+        # A new fill changes the statistics, hence the cache key.
+        self._create_fuel(13, odometer=1300, date_time="2024-01-25 08:00:00")
+        self.assertIsNot(
+            get_fill_limit_preview(self.env, self.vehicle.id, 1300), preview
+        )
+
+    def test_settings_snapshot(self):
+        Log = self.env["fleet.vehicle.log.fuel"]
+        self.vehicle.fuel_tank_capacity = 0.0
+        log = self._create_fuel(10)
+        settings = Log._get_fuel_settings()
+        self.assertEqual(settings.liter_absolute_max_fallback, 500.0)
+        with self.assertQueryCount(0):
+            for _i in range(1000):
+                Log._get_fuel_settings()
+        self.env["ir.config_parameter"].set_param(
+            "fleet_vehicle_log_fuel.liter_absolute_max_fallback", "8"
+        )
+        self.assertEqual(Log._get_fuel_settings().liter_absolute_max_fallback, 8.0)
+        self.assertEqual(log._get_liter_fill_limits()[0], 8.0)
+
+
+class TestFleetVehicleFuelAnalytics(TestFleetVehicleLogFuelBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        readings = [
+            ("2024-01-01 08:00:00", 1000, 20),
+            ("2024-01-10 08:00:00", 1100, 10),
+            ("2024-01-20 08:00:00", 1200, 10),
+            ("2024-02-01 08:00:00", 1300, 10),
+            ("2024-02-10 08:00:00", 1400, 40),
+        ]
+        cls.logs = (
+            cls.env["fleet.vehicle.log.fuel"]
+            .with_context(skip_fuel_liter_validation=True)
+            .create(
+                [
+                    {
+                        "vehicle_id": cls.vehicle.id,
+                        "date_time": date_time,
+                        "odometer": odometer,
+                        "liter": liter,
+                    }
+                    for date_time, odometer, liter in readings
+                ]
+            )
+        )
+
+    def test_analyse_matches_stored_consumption(self):
+        result = self.env["fleet.vehicle.fuel.analytics"].analyse(
+            [("vehicle_id", "=", self.vehicle.id)], window=2, z_threshold=1.5
+        )
+        logs = result["logs"]
+        self.assertEqual(logs["id"].tolist(), self.logs.ids)
+        self.assertEqual(logs["distance"].tolist(), self.logs.mapped("distance"))
+        self.assertEqual(
+            logs["consumption_rate"].tolist(), self.logs.mapped("consumption_rate")
+        )
+        # Rolling window of two fills: (10 + 40) / (100 + 100)
+        self.assertAlmostEqual(logs["rolling_rate"][-1], 0.25)
+        self.assertEqual(logs["anomaly"].tolist(), [False] * 4 + [True])
+        stats = result["vehicles"][self.vehicle.id]
+        self.assertAlmostEqual(stats["avg_rate"], self.logs[0].avg_consumption_rate)
+        self.assertAlmostEqual(stats["p50_rate"], 0.1)
+        self.assertEqual(stats["anomaly_count"], 1)
+        months = {str(line["month"]): line for line in result["months"]}
+        self.assertEqual(sorted(months), ["2024-01-01", "2024-02-01"])
+        self.assertEqual(months["2024-01-01"]["fill_count"], 3)
+        self.assertAlmostEqual(months["2024-02-01"]["consumption_rate"], 0.25)
+
+    def test_analysis_report_lines(self):
+        analysis = self.env["fleet.vehicle.fuel.analysis"].create(
+            {"vehicle_ids": [(6, 0, self.vehicle.ids)], "z_threshold": 1.5}
+        )
+        analysis.action_compute()
+        self.assertEqual(len(analysis.line_ids), 2)
+        self.assertEqual(sum(analysis.line_ids.mapped("liter")), 90)
+        self.assertEqual(analysis.anomaly_log_ids, self.logs[-1])
+
+
+class TestFleetVehicleLogFuelAnomalies(TestFleetVehicleLogFuelBase):
+    def _create_fill(self, date_time, odometer, liter, pump_meter):
+        return self.env["fleet.vehicle.log.fuel"].create(
+            {
+                "vehicle_id": self.vehicle.id,
+                "location_id": self.env.ref("stock.stock_location_stock").id,
+                "date_time": date_time,
+                "odometer": odometer,
+                "liter": liter,
+                "pump_meter": pump_meter,
+            }
+        )
+
+    def test_cron_flags_pump_meter_mismatch_once(self):
+        Log = self.env["fleet.vehicle.log.fuel"]
+        Log._cron_detect_fuel_anomalies()
+        first = self._create_fill("2024-01-01 08:00:00", 1000, 20, 5000)
+        consistent = self._create_fill("2024-01-10 08:00:00", 1100, 20, 5020)
+        mismatch = self._create_fill("2024-01-20 08:00:00", 1200, 20, 5100)
+        Log._cron_detect_fuel_anomalies()
+        self.assertFalse(first.activity_ids)
+        self.assertFalse(consistent.activity_ids)
+        self.assertEqual(len(mismatch.activity_ids), 1)
+        watermark = self.env["fleet.vehicle.fuel.job.cursor"]._get_position(
+            "anomaly_detection"
+        )
+        self.assertEqual(watermark, mismatch.id)
+        # Already processed logs are not flagged again.
+        Log._cron_detect_fuel_anomalies()
+        self.assertEqual(len(mismatch.activity_ids), 1)
+
+
+class TestFleetVehicleLogFuelQueryPlans(TestFleetVehicleLogFuelBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.logs = (
+            cls.env["fleet.vehicle.log.fuel"]
+            .with_context(skip_fuel_liter_validation=True)
+            .create(
+                [
+                    {
+                        "vehicle_id": cls.vehicle.id,
+                        "date_time": f"2024-01-{day:02d} 08:00:00",
+                        "odometer": 1000 + day * 100,
+                        "liter": 10,
+                    }
+                    for day in range(1, 11)
+                ]
+            )
+        )
+
+    def setUp(self):
+        super().setUp()
+        # The test tables are tiny, a sequential scan would always win.
+        self.env.cr.execute("SET enable_seqscan = off")
+        self.addCleanup(self.env.cr.execute, "RESET enable_seqscan")
+
+    def _get_index_name(self, columns):
+        self.env.cr.execute(
+            SQL(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE tablename = 'fleet_vehicle_log_fuel' "
+                "AND indexdef LIKE %s AND indexdef LIKE %s",
+                f"%({columns})%",
+                "%WHERE%",
+            )
+        )
+        row = self.env.cr.fetchone()
+        self.assertTrue(row, f"Missing partial index on ({columns})")
+        return row[0]
+
+    def _explain(self, query):
+        self.env.cr.execute(SQL("EXPLAIN %s", query))
+        return "\n".join(row[0] for row in self.env.cr.fetchall())
+
+    def assertPlanUsesIndex(self, query, columns):
+        index_name = self._get_index_name(columns)
+        plan = self._explain(query)
+        self.assertIn(index_name, plan)
+
+    def test_prev_log_query_plan(self):
+        self.assertPlanUsesIndex(
+            self.logs._prev_logs_sql(
+                [0], [self.vehicle.id], ["2024-01-05 12:00:00"], [0]
+            ),
+            "vehicle_id, date_time, id",
+        )
+
+    def test_history_query_plan(self):
+        self.assertPlanUsesIndex(
+            self.logs._neighbor_sequence_sql(tuple(self.logs[:1].ids)),
+            "vehicle_id, date_time, id",
+        )
+
+    def test_aggregate_query_plan(self):
+        self.assertPlanUsesIndex(
+            self.logs._avg_consumption_update_sql([self.vehicle.id]),
+            "vehicle_id, date_time, id",
+        )
+
+    def test_pump_query_plan(self):
+        self.assertPlanUsesIndex(
+            SQL(
+                "SELECT id FROM fleet_vehicle_log_fuel log "
+                "WHERE log.location_id = %s AND log.active "
+                "AND log.state IS DISTINCT FROM 'cancelled' "
+                "ORDER BY log.date_time DESC, log.id DESC LIMIT 1",
+                self.env.ref("stock.stock_location_stock").id,
+            ),
+            "location_id, date_time, id",
+        )
+
+
+class TestFleetVehicleFuelLedger(TestFleetVehicleLogFuelBase):
+    def _create_fill(self, date_time, odometer, liter):
+        return (
+            self.env["fleet.vehicle.log.fuel"]
+            .with_context(skip_fuel_liter_validation=True)
+            .create(
+                {
+                    "vehicle_id": self.vehicle.id,
+                    "date_time": date_time,
+                    "odometer": odometer,
+                    "liter": liter,
+                }
+            )
+        )
+
+    def _current_state(self):
+        Ledger = self.env["fleet.vehicle.fuel.ledger"]
+        return Ledger._get_current_state(self.vehicle.ids)[self.vehicle.id]
+
+    def test_ledger_running_totals(self):
+        self._create_fill("2024-01-01 08:00:00", 1000, 50)
+        self._create_fill("2024-01-10 08:00:00", 1500, 40)
+        last = self._create_fill("2024-01-20 08:00:00", 2000, 60)
+        state = self._current_state()
+        self.assertEqual(state.log_id, last)
+        self.assertEqual(state.sequence, 3)
+        self.assertAlmostEqual(state.cumulative_liter, 150)
+        self.assertAlmostEqual(state.cumulative_distance, 1000)
+        # 50 L, then -500 km * 0.08 + 40 L, then -500 km * 0.1 + 60 L.
+        self.assertAlmostEqual(state.tank_level, 60)
+        # A back-dated fill rebuilds the following rows only.
+        backdated = self._create_fill("2024-01-15 08:00:00", 1700, 10)
+        state = self._current_state()
+        self.assertEqual(state.log_id, last)
+        self.assertEqual(state.sequence, 4)
+        self.assertAlmostEqual(state.cumulative_liter, 160)
+        self.assertAlmostEqual(state.cumulative_distance, 1000)
+        # 50 L - 200 km * 0.11 + 10 L = 38 L, - 300 km * 0.11 + 60 L.
+        self.assertAlmostEqual(state.tank_level, 65)
+        backdated.unlink()
+        state = self._current_state()
+        self.assertEqual(state.sequence, 3)
+        self.assertAlmostEqual(state.tank_level, 60)
+
+
+class TestFleetVehicleLogFuelArchive(TestFleetVehicleLogFuelBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        readings = [
+            ("2023-11-01 08:00:00", 1000, 20),
+            ("2023-12-01 08:00:00", 1200, 20),
+            ("2023-12-15 08:00:00", 1400, 30),
+            ("2024-01-10 08:00:00", 1600, 20),
+            ("2024-02-10 08:00:00", 1800, 20),
+        ]
+        cls.logs = (
+            cls.env["fleet.vehicle.log.fuel"]
+            .with_context(skip_fuel_liter_validation=True)
+            .create(
+                [
+                    {
+                        "vehicle_id": cls.vehicle.id,
+                        "date_time": date_time,
+                        "odometer": odometer,
+                        "liter": liter,
+                        "amount": liter * 1.5,
+                    }
+                    for date_time, odometer, liter in readings
+                ]
+            )
+        )
+        cls.live_logs = cls.logs[3:]
+        cls.archived_ids = cls.logs[:3].ids
+        cls.env["fleet.vehicle.log.fuel"]._archive_fuel_logs(
+            datetime(2024, 1, 1), batch_size=2
+        )
+
+    def test_archive_moves_closed_year(self):
+        Log = self.env["fleet.vehicle.log.fuel"]
+        self.assertFalse(Log.browse(self.archived_ids).exists())
+        cold = self.env["fleet.vehicle.log.fuel.cold"].search(
+            [("vehicle_id", "=", self.vehicle.id)]
+        )
+        self.assertEqual(sorted(cold.mapped("log_id")), self.archived_ids)
+        archive = self.env["fleet.vehicle.fuel.archive"]._get_for_vehicle(
+            self.vehicle
+        )
+        self.assertEqual(archive.fill_count, 3)
+        self.assertEqual(archive.last_odometer, 1400)
+        stats = self.env["fleet.vehicle.fuel.stats"]._get_for_vehicle(self.vehicle)
+        self.assertAlmostEqual(stats.lifetime_liter, 90)
+        self.assertAlmostEqual(stats.lifetime_distance, 800)
+        self.assertEqual(stats.rate_count, 4)
+        self.assertFalse(stats.dirty)
+        state = self.env["fleet.vehicle.fuel.ledger"]._get_current_state(
+            self.vehicle.ids
+        )[self.vehicle.id]
+        self.assertEqual(state.log_id, self.live_logs[-1])
+        self.assertEqual(state.sequence, 5)
+        self.assertAlmostEqual(state.cumulative_liter, 110)
+        self.assertFalse(
+            self.env["mail.message"].search_count(
+                [("model", "=", Log._name), ("res_id", "in", self.archived_ids)]
+            )
+        )
+
+    def test_live_logs_follow_archive(self):
+        first = self.live_logs[0]
+        first.date_time = "2024-01-11 08:00:00"
+        self.assertTrue(first.has_prev_log)
+        self.assertEqual(first.prev_odometer, 1400)
+        self.assertEqual(first.distance, 200)
+        log = self.env["fleet.vehicle.log.fuel"].create(
+            {
+                "vehicle_id": self.vehicle.id,
+                "date_time": "2024-03-10 08:00:00",
+                "odometer": 2000,
+                "liter": 25,
+            }
+        )
+        self.assertAlmostEqual(log.avg_consumption_rate, 115 / 1000)
+        with self.assertRaises(ValidationError):
+            self.env["fleet.vehicle.log.fuel"].create(
+                {
+                    "vehicle_id": self.vehicle.id,
+                    "date_time": "2023-12-20 08:00:00",
+                    "odometer": 1500,
+                    "liter": 10,
+                }
+            )
+
+    def test_cost_report_keeps_archived_months(self):
+        CostMonth = self.env["fleet.vehicle.fuel.cost.month"]
+        CostMonth._rebuild()
+        CostMonth.invalidate_model()
+        december = CostMonth.search(
+            [
+                ("vehicle_id", "=", self.vehicle.id),
+                ("date_start", "=", "2023-12-01"),
+            ]
+        )
+        self.assertAlmostEqual(december.cost, 75)
+        self.assertEqual(december.log_count, 2)
+
+    def test_ledger_keeps_archived_rows(self):
+        Ledger = self.env["fleet.vehicle.fuel.ledger"]
+        # A rewind reaching into the archived period stops at its boundary.
+        Ledger._rewind([(self.vehicle.id, datetime(2023, 1, 1), 0)])
+        rows = Ledger.search([("vehicle_id", "=", self.vehicle.id)])
+        self.assertEqual(len(rows), 5)
+        self.assertFalse(rows.filtered(lambda row: row.sequence <= 3).log_id)
+        state = Ledger._get_current_state(self.vehicle.ids)[self.vehicle.id]
+        self.assertEqual(state.log_id, self.live_logs[-1])
+        self.assertEqual(state.sequence, 5)
+        self.assertAlmostEqual(state.cumulative_liter, 110)
+        self.assertAlmostEqual(state.cumulative_distance, 800)
+
+    def test_analysis_includes_archived_logs(self):
+        Analytics = self.env["fleet.vehicle.fuel.analytics"]
+        domain = [("vehicle_id", "=", self.vehicle.id)]
+        live = Analytics.analyse(domain)["vehicles"][self.vehicle.id]
+        self.assertEqual(live["fill_count"], 2)
+        full = Analytics.analyse(domain, include_archived=True)["vehicles"]
+        self.assertEqual(full[self.vehicle.id]["fill_count"], 5)
+        self.assertAlmostEqual(full[self.vehicle.id]["avg_rate"], 90 / 800)
+
+
+class TestFleetVehicleLogFuelDashboard(TestFleetVehicleLogFuelBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.category = cls.env["fleet.vehicle.model.category"].create(
+            {"name": "Trucks"}
+        )
+        cls.model.category_id = cls.category
+        cls.logs = (
+            cls.env["fleet.vehicle.log.fuel"]
+            .with_context(skip_fuel_liter_validation=True)
+            .create(
+                [
+                    {
+                        "vehicle_id": cls.vehicle.id,
+                        "date_time": date_time,
+                        "odometer": odometer,
+                        "liter": liter,
+                        "amount": liter * 2,
+                    }
+                    for date_time, odometer, liter in (
+                        ("2024-01-01 08:00:00", 1000, 20),
+                        ("2024-01-15 08:00:00", 1200, 20),
+                        ("2024-02-01 08:00:00", 1400, 30),
+                    )
+                ]
+            )
+        )
+
+    def test_dashboard_series(self):
+        data = self.env["fleet.vehicle.log.fuel"]._get_fuel_dashboard_data(
+            [("vehicle_id", "=", self.vehicle.id)]
+        )
+        (category,) = data["categories"]
+        self.assertEqual(category["id"], self.vehicle.category_id.id)
+        self.assertEqual(category["fill_count"], 3)
+        self.assertAlmostEqual(category["amount"], 140)
+        self.assertAlmostEqual(category["consumption_rate"], 50 / 400)
+        (model,) = data["models"]
+        self.assertEqual(model["name"], self.model.display_name)
+        self.assertEqual(
+            [(month["id"], month["liter"]) for month in data["months"]],
+            [("2024-01-01", 40), ("2024-02-01", 30)],
+        )
+
+    def test_dashboard_etag(self):
+        etag, data = get_fuel_dashboard(self.env)
+        self.assertEqual(get_fuel_dashboard(self.env), (etag, data))
+        self.env["fleet.vehicle.log.fuel"].create(
+            {
+                "vehicle_id": self.vehicle.id,
+                "date_time": "2024-03-01 08:00:00",
+                "odometer": 1600,
+                "liter": 20,
+            }
+        )
+        new_etag, new_data = get_fuel_dashboard(self.env)
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual(new_data["months"][-1]["id"], "2024-03-01")
@@ -0,0 +1,200 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+"""Fuel log benchmarks, excluded from the standard test run.
+
+Run them with ``--test-tags fuel_benchmark``. The fleet size is read from the
+``FUEL_BENCHMARK_VEHICLES`` / ``FUEL_BENCHMARK_FILLS`` environment variables
+and the JSON results are logged and, if ``FUEL_BENCHMARK_OUTPUT`` is set,
+written to that file so they can be compared between releases.
+"""
+
+import json
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from odoo import release
+from odoo.tests import tagged
+
+from .common import TestFleetVehicleLogFuelBase
+from .fleet_generator import generate_fleet
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged("post_install", "-at_install", "-standard", "fuel_benchmark")
+class TestFleetVehicleLogFuelBenchmark(TestFleetVehicleLogFuelBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.vehicle_count = int(os.environ.get("FUEL_BENCHMARK_VEHICLES", 50))
+        cls.fill_count = int(os.environ.get("FUEL_BENCHMARK_FILLS", 40))
+        cls.seed = int(os.environ.get("FUEL_BENCHMARK_SEED", 0))
+        cls.results = {}
+        started = time.perf_counter()
+        cls.vehicles, cls.logs = generate_fleet(
+            cls.env, cls.model, cls.vehicle_count, cls.fill_count, seed=cls.seed
+        )
+        cls.env.flush_all()
+        cls.generation_time = time.perf_counter() - started
+        cls.product = cls.env["product.product"].create(
+            {"name": "Benchmark Diesel", "is_storable": True, "is_fuel": True}
+        )
+        cls.location = cls.env.ref("stock.stock_location_stock")
+        cls.env["stock.quant"]._update_available_quantity(
+            cls.product, cls.location, 1e9
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        report = {
+            "version": release.version,
+            "seed": cls.seed,
+            "vehicles": cls.vehicle_count,
+            "fills_per_vehicle": cls.fill_count,
+            "generation_time": round(cls.generation_time, 4),
+            "operations": dict(sorted(cls.results.items())),
+        }
+        output = json.dumps(report, indent=2)
+        _logger.info("Fuel log benchmark results:\n%s", output)
+        path = os.environ.get("FUEL_BENCHMARK_OUTPUT")
+        if path:
+            with open(path, "w", encoding="utf-8") as result_file:
+                result_file.write(output)
+        super().tearDownClass()
+
+    @contextmanager
+    def measure(self, operation, records=0):
+        """Record query count, wall time and peak Python memory of the block.
+
+        Pending ORM writes are flushed inside the measured block so deferred
+        queries are accounted to the operation that caused them.
+        """
+        self.env.flush_all()
+        self.env.invalidate_all()
+        cr = self.env.cr
+        queries = cr.sql_log_count
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            yield
+            self.env.flush_all()
+        finally:
+            elapsed = time.perf_counter() - started
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.results[operation] = {
+            "records": records,
+            "queries": cr.sql_log_count - queries,
+            "wall_time": round(elapsed, 4),
+            "peak_memory_kib": round(peak / 1024, 1),
+        }
+
+    def _last_logs(self):
+        """Most recent log of every vehicle."""
+        return self.logs[self.fill_count - 1 :: self.fill_count]
+
+    def _new_fill_vals(self):
+        return [
+            {
+                "vehicle_id": log.vehicle_id.id,
+                "product_id": self.product.id,
+                "location_id": self.location.id,
+                "date_time": "2030-01-01 08:00:00",
+                "odometer": log.odometer + 400,
+                "liter": 40,
+                "amount": 60,
+            }
+            for log in self._last_logs()
+        ]
+
+    def test_create(self):
+        vals_list = self._new_fill_vals()
+        with self.measure("create", len(vals_list)):
+            self.env["fleet.vehicle.log.fuel"].create(vals_list)
+
+    def test_create_backdated(self):
+        # Inserting in the middle of the history relinks the successors.
+        middle = self.logs[self.fill_count // 2 :: self.fill_count]
+        vals_list = [
+            {
+                "vehicle_id": log.vehicle_id.id,
+                "date_time": log.date_time,
+                "odometer": log.odometer,
+                "liter": 1,
+            }
+            for log in middle
+        ]
+        with self.measure("create_backdated", len(vals_list)):
+            self.env["fleet.vehicle.log.fuel"].with_context(
+                skip_fuel_liter_validation=True
+            ).create(vals_list)
+
+    def test_write(self):
+        logs = self.logs[self.fill_count // 2 :: self.fill_count]
+        with self.measure("write", len(logs)):
+            for log in logs:
+                log.liter += 1
+
+    def test_unlink(self):
+        logs = self.logs[self.fill_count // 2 :: self.fill_count]
+        with self.measure("unlink", len(logs)):
+            logs.unlink()
+
+    def test_prev_log_stats_scaling(self):
+        # The predecessor lookup runs a constant number of queries whatever
+        # the batch size. Fleets smaller than the largest batch are topped up
+        # with extra vehicles so every batch gets exactly the logs it names.
+        sizes = (10, 1000, 50000)
+        Log = self.env["fleet.vehicle.log.fuel"]
+        all_logs = self.logs
+        missing = sizes[-1] - len(all_logs)
+        if missing > 0:
+            _extra_vehicles, extra_logs = generate_fleet(
+                self.env,
+                self.model,
+                -(-missing // self.fill_count),
+                self.fill_count,
+                seed=self.seed + 1,
+            )
+            all_logs |= extra_logs
+        prev_fields = [
+            Log._fields[name] for name in ("prev_odometer", "prev_date", "has_prev_log")
+        ]
+        query_counts = {}
+        for size in sizes:
+            logs = all_logs[:size]
+            self.assertEqual(len(logs), size)
+            operation = f"prev_log_stats_{size}"
+            # Keep the computed values in cache: only the lookup is measured
+            with self.measure(operation, len(logs)), self.env.protecting(
+                prev_fields, logs
+            ):
+                logs._compute_prev_log_stats()
+            query_counts[size] = self.results[operation]["queries"]
+        self.assertEqual(len(set(query_counts.values())), 1, query_counts)
+
+    def test_liter_validation(self):
+        logs = self._last_logs()
+        with self.measure("liter_validation", len(logs)):
+            for log in logs:
+                log._get_liter_fill_error()
+
+    def test_button_done(self):
+        logs = self.env["fleet.vehicle.log.fuel"].create(self._new_fill_vals())
+        logs.button_running()
+        with self.measure("button_done", len(logs)):
+            logs.button_done()
+        self.assertEqual(set(logs.mapped("state")), {"done"})
+
+    def test_cost_report(self):
+        # Touch every vehicle so the cron has dirty months to refresh.
+        self.env["fleet.vehicle.log.fuel"].create(self._new_fill_vals())
+        with self.measure("cost_month_refresh", len(self.vehicles)):
+            self.env["fleet.vehicle.fuel.cost.month"]._cron_refresh()
+        Report = self.env["fleet.vehicle.cost.report"]
+        with self.measure("cost_report", len(self.vehicles)):
+            Report._read_group(
+                [("cost_type", "=", "fuel")], ["vehicle_id"], ["cost:sum"]
+            )
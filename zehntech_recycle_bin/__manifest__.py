@@ -1,6 +1,6 @@
 {
     'name': 'Recycle Bin',
-    "version": '19.0.1.0.0',
+    "version": '19.0.1.1.0',
     'category': 'Tools',
     'summary': 'The Recycle Bin app for Odoo allows you to safely recover accidentally deleted records. It features customizable retention periods, role-based access control, and audit logs for enhanced data security and management.',
     'description': """The Recycle Bin module temporarily stores deleted records for recovery, with customizable retention periods. It includes role-based access control, allowing Super Admins to assign permissions. A centralized interface helps manage deleted items, while audit logs ensure transparency. Users can restore or permanently delete records, providing a secure, efficient, and accountable way to handle data deletions.""",
@@ -21,6 +21,7 @@
         'views/setting_view.xml',
         'views/audit_log_view.xml',
         'views/audit_log_menu.xml',
+        'views/recycle_bin_metric_view.xml',
     ],
 
     'assets': {
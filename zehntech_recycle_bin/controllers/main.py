@@ -0,0 +1,19 @@
+from odoo import http
+from odoo.http import request
+
+
+class RecycleBinMetricsController(http.Controller):
+
+    @http.route('/recycle_bin/metrics', type='http', auth='bearer', methods=['GET'])
+    def metrics(self):
+        """Expose the recycle bin metrics in the Prometheus text format.
+
+        Scrapers authenticate with the API key of a user of the Settings group.
+        """
+        if not request.env.user.has_group('base.group_system'):
+            return request.not_found()
+        body = request.env['recycle.bin.metric'].sudo()._get_prometheus_metrics()
+        return request.make_response(body, headers=[
+            ('Content-Type', 'text/plain; version=0.0.4; charset=utf-8'),
+            ('Cache-Control', 'no-store'),
+        ])
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
 from . import recycle_bin
+from . import recycle_bin_blob
+from . import recycle_bin_queue
+from . import recycle_bin_metric
 from . import setting
 from . import audit_log
 from . import base_model
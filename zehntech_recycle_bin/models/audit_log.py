@@ -27,6 +27,7 @@ class RecycleBinAuditLog(models.Model):
     recycle_bin_id = fields.Many2one(
         'recycle.bin', 
         string='Recycle Bin Record', 
+        index='btree_not_null',
         help="The related record in the recycle bin that this action refers to.")
 
     details = fields.Text(
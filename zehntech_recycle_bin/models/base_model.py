@@ -1,16 +1,95 @@
 import json
 import logging
-from odoo import models, fields, api
+import time
+from odoo import models, fields, api, tools
 
 _logger = logging.getLogger(__name__)
 MODULE_UNINSTALL_FLAG = '_force_unlink'
 
+# Models that bypass recycle bin logic
+BYPASS_MODELS = frozenset({
+    'recycle.bin', 'bus.bus', 'mail.message', 'mail.followers',
+    'ir.attachment', 'ir.model.data', 'recycle.bin.audit.log', 'recycle.bin.blob',
+    'recycle.bin.queue', 'recycle.bin.metric',
+
+    # Core System Models
+    'ir.model', 'ir.model.fields', 'ir.ui.menu', 'ir.actions.act_window',
+    'ir.config_parameter', 'res.currency',
+
+    # Technical Models
+    'ir.module.module', 'ir.translation', 'ir.rule', 'ir.cron', 'ir.sequence',
+    'ir.ui.view', 'ir.actions.server',
+
+    # Accounting Models
+    'account.move', 'account.move.line', 'account.payment', 'account.tax',
+
+    # Sales and Purchases Models
+    'sale.order.line', 'purchase.order', 'purchase.order.line',
+
+    # Inventory Models
+    'stock.picking', 'stock.quant', 'stock.location', 'stock.inventory',
+
+    # Human Resources Models
+    'hr.employee', 'hr.payslip', 'hr.contract',
+
+    # Manufacturing Models
+    'mrp.production', 'mrp.bom',
+
+    # Other Critical Models
+    'mail.activity', 'base.language.install', 'res.company'
+})
+
 class BaseModelExtended(models.AbstractModel):
     _inherit = 'base'
 
     @api.model
+    @tools.ormcache('model_name')
     def _get_model_id(self, model_name):
-        return self.env['ir.model'].search([('model', '=', model_name)], limit=1).id
+        return self.env['ir.model'].sudo().search([('model', '=', model_name)], limit=1).id
+
+    def _prepare_recycle_bin_values(self, **extra):
+        """Serialize the records with one read and return the captured records
+        along with the values of their recycle bin entries.
+
+        Records whose ``res_id`` cannot be parsed are skipped.
+        """
+        recycle_bin_env = self.env['recycle.bin']
+        model_id = self._get_model_id(self._name)
+        deleted_datetime = fields.Datetime.now()
+        binary_fields = [name for name, field in self._fields.items() if field.type == 'binary']
+        record_ids = []
+        values_list = []
+        blob_data_list = []
+        for record, record_data in zip(self, self.read()):
+            name = record_data.get('display_name') or record.display_name or ''
+            payload_values, blob_data = recycle_bin_env._prepare_payload(record_data, binary_fields)
+            recycle_data = {
+                'name': name,
+                'model_id': model_id,
+                'record_id': record.id,
+                'deleted_datetime': deleted_datetime,
+                'user_id': self.env.uid,
+                **payload_values,
+                **extra,
+            }
+            if record_data.get("res_id"):
+                res_id_value = record_data.get('res_id', '')
+                if ',' in str(res_id_value):
+                    try:
+                        _, res_id = res_id_value.split(',')
+                        recycle_data['parent_record_id'] = int(
+                            res_id)  # Convert ID to integer
+                    except ValueError:
+                        _logger.error(
+                            f"Invalid res_id format for ir.property: {res_id_value}")
+                        continue
+                else:
+                    recycle_data['parent_record_id'] = res_id_value
+            record_ids.append(record.id)
+            values_list.append(recycle_data)
+            blob_data_list.append(blob_data)
+        recycle_bin_env._link_blobs(values_list, blob_data_list)
+        return self.browse(record_ids), values_list
 
     def unlink(self):
         uninstalling = self._context.get(MODULE_UNINSTALL_FLAG)
@@ -18,108 +97,44 @@ class BaseModelExtended(models.AbstractModel):
             return super(BaseModelExtended, self).unlink()
 
         if not self._name == 'ir.model':
+            # Models that bypass recycle bin logic, either built in or excluded
+            # from the configuration
+            if self._name in self.env['recycle.bin']._get_bypass_models():
+                _logger.debug(
+                    f"Model {self._name} is excluded or in the bypass list. Permanently deleting records: {self.ids}")
+                return super(BaseModelExtended, self).unlink()
+
             _logger.info(
                 f"Unlink in BaseModelExtended class for {self._name} --- user id: {self.env.uid}")
 
-            # Models that bypass recycle bin logic
-            bypass_models = [
-                        'recycle.bin', 'bus.bus', 'mail.message', 'mail.followers',
-                        'ir.attachment', 'ir.model.data', 'recycle.bin.audit.log',
-
-                        # Core System Models
-                        'ir.model', 'ir.model.fields', 'ir.ui.menu', 'ir.actions.act_window',
-                        'ir.config_parameter', 'res.currency',
-
-                        # Technical Models
-                        'ir.module.module', 'ir.translation', 'ir.rule', 'ir.cron', 'ir.sequence',
-                        'ir.ui.view', 'ir.actions.server',
-
-                        # Accounting Models
-                        'account.move', 'account.move.line', 'account.payment', 'account.tax',
-
-                        # Sales and Purchases Models
-                        'sale.order.line', 'purchase.order', 'purchase.order.line',
-
-                        # Inventory Models
-                        'stock.picking', 'stock.quant', 'stock.location', 'stock.inventory',
-
-                        # Human Resources Models
-                        'hr.employee', 'hr.payslip', 'hr.contract',
-
-                        # Manufacturing Models
-                        'mrp.production', 'mrp.bom',
-
-                        # Other Critical Models
-                        'mail.activity', 'base.language.install', 'res.company'
-                    ]
-
-
-            # Fetch excluded models from configuration  
-            excluded_models_param = self.env['ir.config_parameter'].sudo(
-            ).get_param('recycle_bin.exclude_models', '')
-            excluded_models = excluded_models_param.split(',')
+            if self._name == 'ir.attachment':
+                # Custom handling for attachments before they are unlinked
+                self._handle_attachments_before_unlink(self)
+                return super(BaseModelExtended, self).unlink()
 
-            # If model is in the bypass list or excluded models, perform permanent deletion
-            if self._name in bypass_models or self._name in excluded_models:
-                _logger.info(
-                    f"Model {self._name} is excluded or in the bypass list. Permanently deleting records: {self.ids}")
+            # In asynchronous mode, only stage a snapshot of the raw values, the
+            # queue worker creates the recycle bin records
+            start = time.perf_counter()
+            if self.env['recycle.bin.queue']._is_enabled():
+                payload_bytes = self.env['recycle.bin.queue']._enqueue(self)
+                self.env['recycle.bin.metric']._record('capture', self._name, len(self), payload_bytes, start)
                 return super(BaseModelExtended, self).unlink()
 
+            # Step 1: Capture the main records with a single read and create
             recycle_bin_env = self.env['recycle.bin']
-            all_recycle_data = []
-            for record in self:
-                _logger.warning(f"--------record: {record}")
-                _logger.warning(f"record.read(): {record.read()}")
-                if self._name == 'ir.attachment':
-                    # Custom handling for attachments before they are unlinked
-                    self._handle_attachments_before_unlink(record)
-                    continue
-                record_data = record.read()[0]
-                deleted_data = json.dumps(record_data, default=str)
-                recycle_data_main = {
-                    'name': record.display_name or '',
-                    'model_id': self._get_model_id(self._name),
-                    'record_id': record.id,
-                    'deleted_datetime': fields.Datetime.now(),
-                    'user_id': self.env.uid,
-                    'deleted_data': deleted_data,
-                    # Initially, do not set parent_id for the main record
-                }
-                _logger.warning(f"recycle_data_main: {recycle_data_main}")
-                if record_data.get("res_id"):
-                    res_id_value = record_data.get('res_id', '')
-                    if ',' in str(res_id_value):
-                        try:
-                            _, res_id = res_id_value.split(',')
-                            recycle_data_main['parent_record_id'] = int(
-                                res_id)  # Convert ID to integer
-                        except ValueError:
-                            _logger.error(
-                                f"Invalid res_id format for ir.property: {res_id_value}")
-                            continue
-                    else:
-                        recycle_data_main['parent_record_id'] = res_id_value
-
-                main_recycle_record = recycle_bin_env.create(recycle_data_main)
-                all_recycle_data.append((record, main_recycle_record.id))
-
-            # Step 2: Now handle related records and link them to the main record
-            for record, parent_id in all_recycle_data:
-                related_records = self._get_related_records_before_unlink()
-                for related_record in related_records:
-                    related_record_data = related_record.read()[0]
-                    related_deleted_data = json.dumps(
-                        related_record_data, default=str)
-                    recycle_data_related = {
-                        'name': related_record.display_name or '',
-                        'model_id': self._get_model_id(related_record._name),
-                        'record_id': related_record.id,
-                        'deleted_datetime': fields.Datetime.now(),
-                        'user_id': self.env.uid,
-                        'deleted_data': related_deleted_data,
-                        'parent_id': parent_id,
-                    }
-                    recycle_bin_env.create(recycle_data_related)
+            records, recycle_vals_list = self._prepare_recycle_bin_values()
+            main_recycle_records = recycle_bin_env.create(recycle_vals_list)
+            self.env['recycle.bin.metric']._record(
+                'capture', self._name, len(main_recycle_records),
+                sum(recycle_bin_env._get_payload_size(vals.get('payload')) for vals in recycle_vals_list), start)
+            _logger.info(
+                f"Moved {len(main_recycle_records)} {self._name} record(s) to the recycle bin")
+
+            # Step 2: Now capture the related records and link them to the main records
+            cascade_depth = recycle_bin_env._get_cascade_depth()
+            if cascade_depth > 0:
+                records.sudo()._capture_related_records(
+                    dict(zip(records.ids, main_recycle_records.ids)), cascade_depth)
         else:
             recycle_bin_env = self.env['recycle.bin']
             recycle_bin_env.create({
@@ -132,39 +147,74 @@ class BaseModelExtended(models.AbstractModel):
         
         return super(BaseModelExtended, self).unlink()
 
-    def _handle_attachments_before_unlink(self, attachment):
-        _logger.info(f"Handling attachment {attachment.id} before unlinking.")
+    def _handle_attachments_before_unlink(self, attachments):
+        _logger.info(f"Handling attachments {attachments.ids} before unlinking.")
 
         recycle_bin_env = self.env['recycle.bin']
-        attachment_data = attachment.read(
-            fields=['name', 'res_model', 'res_id', 'type', 'url', 'mimetype'])[0]
+        model_id = self._get_model_id('ir.attachment')
+        deleted_datetime = fields.Datetime.now()
+        attachments_data = attachments.read(
+            fields=['name', 'res_model', 'res_id', 'type', 'url', 'mimetype'])
 
-        deleted_data = json.dumps(attachment_data, default=str)
-        recycle_data = {
+        recycle_bin_records = recycle_bin_env.create([{
             'name': attachment_data.get('name', ''),
-            'model_id': self._get_model_id('ir.attachment'),
-            'record_id': attachment.id,  # Original attachment ID
-            'deleted_datetime': fields.Datetime.now(),
+            'model_id': model_id,
+            'record_id': attachment_data['id'],  # Original attachment ID
+            'deleted_datetime': deleted_datetime,
             'user_id': self.env.uid,
-            'deleted_data': deleted_data,
-            'parent_record_id': attachment.res_id,
-        }
-
-        recycle_bin_record = recycle_bin_env.create(recycle_data)
+            'payload': recycle_bin_env._encode_payload(json.dumps(attachment_data, default=str)),
+            'parent_record_id': attachment_data.get('res_id'),
+        } for attachment_data in attachments_data])
         _logger.info(
-            f"Created recycle bin record for attachment {attachment.id} with recycle bin ID {recycle_bin_record.id}")
-
-    def _get_related_records_before_unlink(self):
-        related_records = []
-        for record in self:
-            for field in record._fields.values():
-                if field.type == 'one2many':
-                    comodel_name = field.comodel_name
-                    comodel = self.env[comodel_name]
-                    inverse_field_name = field.inverse_name
-                    inverse_field = comodel._fields.get(inverse_field_name)
-
-                    if isinstance(inverse_field, fields.Many2one) and inverse_field.ondelete == 'cascade':
-                        related_records.extend(
-                            getattr(record, field.name).sudo())
-        return related_records
+            f"Created recycle bin records {recycle_bin_records.ids} for attachments {attachments.ids}")
+
+    @api.model
+    @tools.ormcache()
+    def _get_cascade_relations(self):
+        """Return the ``(comodel_name, inverse_name)`` pairs of the one2many
+        fields whose records are deleted along with the records of this model."""
+        relations = set()
+        for field in self._fields.values():
+            if field.type == 'one2many' and field.comodel_name in self.env:
+                inverse_field = self.env[field.comodel_name]._fields.get(field.inverse_name)
+                if isinstance(inverse_field, fields.Many2one) and inverse_field.ondelete == 'cascade':
+                    relations.add((field.comodel_name, field.inverse_name))
+        return tuple(sorted(relations))
+
+    def _capture_related_records(self, recycle_bin_ids, depth, visited=None):
+        """Capture the records deleted in cascade with ``self`` in the recycle bin.
+
+        Children are fetched with one search per relation for the whole
+        recordset, serialized with one read per relation and created with one
+        create, then walked in turn until ``depth`` levels were captured.
+
+        :param recycle_bin_ids: dict mapping the ids of ``self`` to the ids of
+            their recycle bin records, which become the parents of the entries
+            of their children
+        :param depth: number of levels of children to capture
+        :param visited: set of ``(model, id)`` already captured, so records
+            reachable through several relations are only captured once
+        """
+        if visited is None:
+            visited = {(self._name, record_id) for record_id in self.ids}
+        recycle_bin_env = self.env['recycle.bin']
+        for comodel_name, inverse_name in self._get_cascade_relations():
+            children = self.env[comodel_name].sudo().with_context(active_test=False).search(
+                [(inverse_name, 'in', self.ids)])
+            children = children.filtered(lambda child: (comodel_name, child.id) not in visited)
+            if not children:
+                continue
+            visited.update((comodel_name, child_id) for child_id in children.ids)
+            start = time.perf_counter()
+            children, values_list = children._prepare_recycle_bin_values()
+            for child, values in zip(children, values_list):
+                values['parent_id'] = recycle_bin_ids[child[inverse_name].id]
+            child_recycle_records = recycle_bin_env.create(values_list)
+            self.env['recycle.bin.metric']._record(
+                'capture', comodel_name, len(child_recycle_records),
+                sum(recycle_bin_env._get_payload_size(vals.get('payload')) for vals in values_list), start)
+            _logger.info(
+                f"Moved {len(child_recycle_records)} related {comodel_name} record(s) to the recycle bin")
+            if depth > 1:
+                children._capture_related_records(
+                    dict(zip(children.ids, child_recycle_records.ids)), depth - 1, visited)
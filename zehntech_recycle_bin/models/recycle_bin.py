@@ -1,9 +1,18 @@
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 import json
 import logging
 import base64
+import zlib
+import psycopg2
+import time
 from datetime import datetime, timedelta
 from odoo.exceptions import AccessError
+from odoo.fields import Command
+from .base_model import BYPASS_MODELS
+
+PAYLOAD_BLOB_KEY = '__recycle_bin_blob__'
+PAYLOAD_COMPRESSION_LEVEL = 6
+PURGE_CHUNK_SIZE = 1000
 
 _logger = logging.getLogger(__name__)
 
@@ -14,11 +23,13 @@ class RecycleBin(models.Model):
     name = fields.Char(
         string='Name of Record',
         readonly=True,
+        index='trigram',
         help="The name of the deleted record as it appeared before deletion."
     )
     model_id = fields.Many2one(
         'ir.model',
         readonly=True,
+        index=True,
         help="The model (database table) to which the deleted record belonged."
     )
     record_id = fields.Integer(
@@ -29,28 +40,56 @@ class RecycleBin(models.Model):
     parent_record_id = fields.Integer(
         string='Deleted Parent Record ID',
         readonly=True,
+        index='btree_not_null',
         help="The unique identifier (ID) of the parent record, if applicable."
     )
     deleted_datetime = fields.Datetime(
         string='Record Deleted at',
         readonly=True,
+        index=True,
         help="The date and time when the record was deleted."
     )
     user_id = fields.Many2one(
         'res.users',
         string="Deleted by",
         readonly=True,
+        index=True,
         help="The user who deleted the record."
     )
     deleted_data = fields.Char(
         string='Record Data',
+        compute='_compute_deleted_data',
+        inverse='_inverse_deleted_data',
         readonly=False,
         help="The serialized data (JSON format) of the deleted record."
     )
+    # Holds the raw zlib output rather than base64: the bytea column stores
+    # the bytes as given, only read through deleted_data
+    payload = fields.Binary(
+        string='Compressed Record Data',
+        attachment=False,
+        readonly=True,
+        prefetch=False,
+        exportable=False,
+        help="The serialized data of the deleted record, compressed. Binary values are stored separately."
+    )
+    payload_size = fields.Integer(
+        string='Payload Size (bytes)',
+        compute='_compute_payload_size',
+        store=True,
+        help="The size of the compressed data of the deleted record."
+    )
+    blob_ids = fields.Many2many(
+        'recycle.bin.blob', 'recycle_bin_blob_rel', 'recycle_bin_id', 'blob_id',
+        string='Binary Data',
+        readonly=True,
+        help="The binary values of the deleted record, shared between records with the same content."
+    )
     parent_id = fields.Many2one(
         'recycle.bin',
         string='Parent Record',
         readonly=True,
+        index='btree_not_null',
         help="A reference to the parent record, if this record is related to another deleted record."
     )
     child_ids = fields.One2many(
@@ -70,6 +109,117 @@ class RecycleBin(models.Model):
 
 
 
+    def init(self):
+        # Compress the data of the records stored before the payload existed,
+        # then drop the legacy column
+        self.env.cr.execute("""
+            SELECT 1 FROM information_schema.columns
+             WHERE table_name = 'recycle_bin' AND column_name = 'deleted_data'
+        """)
+        if not self.env.cr.rowcount:
+            return
+        # Page through the records by id so only one page is held in memory
+        last_id = 0
+        while True:
+            self.env.cr.execute("""
+                SELECT id, deleted_data
+                  FROM recycle_bin
+                 WHERE deleted_data IS NOT NULL AND id > %s
+              ORDER BY id
+                 LIMIT 1000
+            """, (last_id,))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            payloads = [self._encode_payload(deleted_data) for _id, deleted_data in rows]
+            self.env.cr.execute("""
+                UPDATE recycle_bin
+                   SET payload = data.payload, payload_size = data.payload_size
+                  FROM unnest(%s::int[], %s::bytea[], %s::int[]) AS data(id, payload, payload_size)
+                 WHERE recycle_bin.id = data.id
+            """, (
+                [row[0] for row in rows],
+                [psycopg2.Binary(payload) for payload in payloads],
+                [self._get_payload_size(payload) for payload in payloads],
+            ))
+        self.env.cr.execute("ALTER TABLE recycle_bin DROP COLUMN deleted_data")
+        _logger.info("Compressed the legacy data of the recycle bin records")
+
+    @api.model
+    def _encode_payload(self, deleted_data):
+        """Compress serialized record data into the raw bytes of ``payload``."""
+        return zlib.compress((deleted_data or '').encode(), PAYLOAD_COMPRESSION_LEVEL)
+
+    @api.model
+    def _get_payload_size(self, payload):
+        return len(payload) if payload else 0
+
+    @api.depends('payload')
+    def _compute_payload_size(self):
+        for record in self:
+            record.payload_size = self._get_payload_size(record.payload)
+
+    def _compute_deleted_data(self):
+        # Only decompressed when read, e.g. when displaying or restoring a record
+        for record in self:
+            record.deleted_data = record.payload and zlib.decompress(record.payload).decode()
+
+    def _inverse_deleted_data(self):
+        for record in self:
+            record.payload = record.deleted_data and self._encode_payload(record.deleted_data)
+
+    def _get_deleted_values(self):
+        """Return the field values of the deleted record, binary values included."""
+        self.ensure_one()
+        data = json.loads(self.deleted_data)
+        blob_refs = {
+            field_name: field_value[PAYLOAD_BLOB_KEY]
+            for field_name, field_value in data.items()
+            if isinstance(field_value, dict) and PAYLOAD_BLOB_KEY in field_value
+        }
+        if blob_refs:
+            blob_data = {blob.checksum: blob.data for blob in self.sudo().blob_ids}
+            for field_name, checksum in blob_refs.items():
+                data[field_name] = blob_data.get(checksum, False)
+        return data
+
+    @api.model
+    def _prepare_payload(self, record_data, binary_fields):
+        """Return the values storing ``record_data`` compressed, its values of
+        ``binary_fields`` being replaced by references to deduplicated blobs.
+
+        :return: a tuple ``(values, blob_data)`` where ``blob_data`` maps the
+            checksums referenced by ``values`` to their binary content
+        """
+        blob_data = {}
+        for field_name in binary_fields:
+            field_value = record_data.get(field_name)
+            if field_value:
+                checksum = self.env['recycle.bin.blob']._compute_checksum(field_value)
+                blob_data[checksum] = field_value
+                record_data[field_name] = {PAYLOAD_BLOB_KEY: checksum}
+        payload = self._encode_payload(json.dumps(record_data, default=str))
+        return {'payload': payload}, blob_data
+
+    @api.model
+    def _link_blobs(self, values_list, blob_data_list):
+        """Store the binary values of ``blob_data_list`` with one upsert, and
+        link them to the matching values of ``values_list``."""
+        all_blob_data = {}
+        for blob_data in blob_data_list:
+            all_blob_data.update(blob_data)
+        if not all_blob_data:
+            return values_list
+        blob_ids = {
+            blob.checksum: blob.id
+            for blob in self.env['recycle.bin.blob']._get_blobs(all_blob_data)
+        }
+        for values, blob_data in zip(values_list, blob_data_list):
+            if blob_data:
+                values['blob_ids'] = [Command.set([blob_ids[checksum] for checksum in blob_data])]
+        return values_list
+
     @api.model_create_multi
     def create(self, values_list):
         """Override the create method to log creation of records.
@@ -83,26 +233,32 @@ class RecycleBin(models.Model):
 
         records = super(RecycleBin, self).create(values_list)
 
-        # Log creation for each new record individually
-        for rec in records:
-            try:
-                self.log_create_action(self.env, self.env.user, rec)
-            except Exception as e:
-                _logger.error(f"Failed to log creation of recycle bin record {rec.id}: {e}", exc_info=True)
+        # Log the creation of all the new records at once
+        try:
+            self.log_create_actions(self.env, self.env.user, records)
+        except Exception as e:
+            _logger.error(f"Failed to log creation of recycle bin records {records.ids}: {e}", exc_info=True)
 
         return records
 
+    def _get_date_filter_domain(self):
+        """Return the domain of the records deleted between the start and end dates."""
+        domain = []
+        if self.start_date:
+            domain.append(('deleted_datetime', '>=', self.start_date))
+        if self.end_date:
+            domain.append(('deleted_datetime', '<=', self.end_date))
+        return domain
+
     def apply_date_filter(self):
-        filtered_records = self.search([
-            ('deleted_datetime', '>=', self.start_date),
-            ('deleted_datetime', '<=', self.end_date)
-        ])
+        # The domain is evaluated by the view on the indexed deleted_datetime
+        # rather than turned into a list of ids here
         return {
             'type': 'ir.actions.act_window',
             'name': 'Filtered Records',
-            'view_mode': 'tree,form',
+            'view_mode': 'list,form',
             'res_model': 'recycle.bin',
-            'domain': [('id', 'in', filtered_records.ids)],
+            'domain': self._get_date_filter_domain(),
             'target': 'current',
         }
 
@@ -123,6 +279,17 @@ class RecycleBin(models.Model):
                 'error': e,
             }, exc_info=True)
 
+    def log_create_actions(self, env, user, records):
+        """Log create actions of several recycle bin records with a single create."""
+        timestamp = fields.Datetime.now()
+        env['recycle.bin.audit.log'].create([{
+            'action': 'create',
+            'user_id': user.id,
+            'recycle_bin_id': record.id,
+            'timestamp': timestamp,
+            'details': _("Record ID: %s, Model: %s was created in the recycle bin") % (record.record_id, record.model_id.name),
+        } for record in records])
+
     def log_restore_action(self, env, user, record):
         """Log restore actions performed on recycle bin records."""
         try:
@@ -141,6 +308,17 @@ class RecycleBin(models.Model):
             }, exc_info=True)
 
 
+    def log_restore_actions(self, env, user, records):
+        """Log restore actions of several recycle bin records with a single create."""
+        timestamp = fields.Datetime.now()
+        env['recycle.bin.audit.log'].create([{
+            'action': 'restore',
+            'user_id': user.id,
+            'recycle_bin_id': record.id,
+            'timestamp': timestamp,
+            'details': _("Record ID: %s, Model: %s was restored from the recycle bin") % (record.record_id, record.model_id.name),
+        } for record in records])
+
     def log_delete_action(self, env, user, record):
         """Log delete actions performed on recycle bin records."""
         try:
@@ -164,110 +342,58 @@ class RecycleBin(models.Model):
         excluded_models_param = self.env['ir.config_parameter'].sudo().get_param('recycle_bin.exclude_models', default='')
         return excluded_models_param.split(',') if excluded_models_param else []
 
-    def restore_record(self):
-        restored_record_count = 0
+    @api.model
+    def _get_cascade_depth(self):
+        """Return how many levels of records deleted in cascade are captured."""
+        return int(self.env['ir.config_parameter'].sudo().get_param('recycle_bin.cascade_depth', default=1))
 
-        for record in self:
-            model_name = self.env['ir.model'].browse(record.model_id.id).model
-
-            # ----- AccessError check for protected model -----
-            if model_name == 'ir.model' and not self.env.user.has_group('base.group_system'):
-                msg = _("You are not allowed to restore 'Models' (ir.model) records.\n\n"
-                        "This operation is allowed for the following groups:\n"
-                        "        - Administration/Access Rights\n\n"
-                        "Contact your administrator to request access if necessary.")
-                raise AccessError(msg)
-            # ----- Security check END -----
-            try:
-                model_name = self.env['ir.model'].browse(record.model_id.id).model
-                # Validate deleted_data
-                if not record.deleted_data:
-                    _logger.error(f"Missing deleted_data for record ID {record.id}")
-                    continue
-
-                data = json.loads(record.deleted_data)
-
-                fields_info = self.env[model_name].fields_get()
-
-                # Define fields to exclude from restoration
-                non_restorable_fields = [
-                    'id', 'create_date', 'write_date', '__last_update',
-                     'commercial_partner_id'
-                ]
-                child_relationship_fields = [
-                    field for field, info in fields_info.items() if info.get('type') in ('one2many', 'many2many')
-                ]
-
-                # Combine excluded fields
-                excluded_fields = set(non_restorable_fields + child_relationship_fields)
-
-                # Remove excluded fields from the data
-                for field in excluded_fields:
-                    data.pop(field, None)
-
-                # Adjust Many2one fields and other data transformations
-                for field_name, field_value in data.items():
-                    field_info = fields_info.get(field_name, {})
-                    if field_info.get('type') == 'datetime' and isinstance(field_value, str):
-                        try:
-                            parsed_datetime = datetime.strptime(field_value, "%Y-%m-%d %H:%M:%S.%f")
-                            data[field_name] = parsed_datetime.strftime("%Y-%m-%d %H:%M:%S")
-                        except ValueError:
-                            try:
-                                parsed_datetime = datetime.strptime(field_value, "%Y-%m-%d %H:%M:%S")
-                                data[field_name] = parsed_datetime.strftime("%Y-%m-%d %H:%M:%S")
-                            except ValueError:
-                                _logger.error(f"Error parsing datetime for field {field_name} with value {field_value}")
-                    elif 'image_' in field_name or 'avatar_' in field_name:
-                        if isinstance(field_value, str) and field_value.startswith("b'") and field_value.endswith("'"):
-                            image_data = field_value[2:-1]
-                            data[field_name] = image_data
-                    elif isinstance(field_value, list) and len(field_value) == 2 and isinstance(field_value[0], int):
-                        data[field_name] = field_value[0]
-
-                _logger.info(f"Attempting to create {model_name} with cleaned data: {data}")
-
-                # Create the new record
-                # import pdb;pdb.set_trace()
-                new_record = self.env[model_name].sudo().create(data)
-                new_record_id = new_record.id
-
-                # Log the restore action for the main record
-                self.log_restore_action(self.env, self.env.user, record)
-
-                # Restore related child records
-
-                for child in record.child_ids:
-                    _logger.info(f"Restoring child record: {child}")
-                    self.restore_child_record(child, new_record_id, record.record_id)
-
-                    # Log the restore action for the child record
-                    self.log_restore_action(self.env, self.env.user, child)
-
-                    restored_record_count += 1
-
-                # Handle related records if any
-                self.get_related_records_data(parent_record_id=record.record_id, new_parent_record_id=new_record_id)
-
-                # Remove the record from the recycle bin
-                self.env.cr.execute("DELETE FROM recycle_bin WHERE id = %s", (record.id,))
-                # record.unlink()
-
-                restored_record_count += 1
+    @api.model
+    @tools.ormcache()
+    def _get_bypass_models(self):
+        """Return the frozenset of models deleted without going through the recycle bin.
 
-            except Exception as e:
-                _logger.error(f"Error restoring record ID {record.id}: {e}", exc_info=True)
+        It is computed once per registry and recomputed when the registry cache
+        is cleared, which happens whenever the excluded models are saved.
+        """
+        return BYPASS_MODELS | frozenset(filter(None, self.get_excluded_models()))
+
+    def restore_record(self):
+        # ----- AccessError check for protected model -----
+        if 'ir.model' in self.mapped('model_id.model') and not self.env.user.has_group('base.group_system'):
+            msg = _("You are not allowed to restore 'Models' (ir.model) records.\n\n"
+                    "This operation is allowed for the following groups:\n"
+                    "        - Administration/Access Rights\n\n"
+                    "Contact your administrator to request access if necessary.")
+            raise AccessError(msg)
+        # ----- Security check END -----
+
+        restored_records, related_records, failed_records = self._restore_records()
+        restored_record_count = len(restored_records)
+
+        # Log the restore actions and remove the entries from the recycle bin at once
+        restored = restored_records | related_records
+        if restored:
+            self.log_restore_actions(self.env, self.env.user, restored_records)
+            restored.with_context(bypass_recycle_bin=True).unlink()
 
         # Notify the user about the result
         if restored_record_count > 0:
+            message = _('%s record(s) restored successfully.') % restored_record_count
+            if failed_records:
+                # Their parent entry is gone, they are kept as standalone entries
+                _logger.warning(f"Recycle bin records {failed_records.ids} could not be restored with their parent")
+                message += '\n' + _("%(count)s related record(s) could not be restored and were kept in the Recycle Bin: %(names)s") % {
+                    'count': len(failed_records),
+                    'names': ', '.join(entry.name or str(entry.record_id) for entry in failed_records),
+                }
             return {
                 "type": "ir.actions.client",
                 "tag": "display_notification",
                 "params": {
                     "title": _("Restoration Successful"),
-                    "message": _('%s record(s) restored successfully.') % restored_record_count,
-                    "type": "info",
-                    "sticky": False,
+                    "message": message,
+                    "type": "warning" if failed_records else "info",
+                    "sticky": bool(failed_records),
                     "next": {"type": "ir.actions.act_window_close"},
                 },
             }
@@ -284,98 +410,195 @@ class RecycleBin(models.Model):
                 },
             }
 
+    def _restore_records(self):
+        """Restore the deleted records of ``self`` and of their child entries.
 
-    def restore_child_record(self, child, new_order_id, original_order_id):
-        _logger.info(f"restore_child_record STARTING")
-
-        child_model_name = self.env['ir.model'].browse(child.model_id.id).model
-        child_data = json.loads(child.deleted_data)
-
-        # Update references and format Many2one fields
-        for field_name, field_value in list(child_data.items()):
-            # Check and replace specific record_id references with new_record_id
-            if isinstance(field_value, list) and len(field_value) == 2:
-                if field_value[0] == original_order_id:
-                    _logger.warning(f"Replacing {original_order_id} with {new_order_id} on {field_name} - {field_value}")
-                    child_data[field_name] = new_order_id  # Update with just the ID
-                else:
-                    # This ensures proper formatting for Many2one fields not being directly replaced
-                    child_data[field_name] = field_value[0]  # Keep only the ID, discard the name
-            elif field_value == original_order_id:
-                # Direct integer match, uncommon but handled if necessary
-                _logger.warning(f"Replacing {original_order_id} with {new_order_id} on {field_name} - {field_value}")
-                child_data[field_name] = new_order_id
-
-        # Exclude non-restorable fields
-        excluded_fields = ['id', 'create_date', 'write_date', '__last_update']
-        for field in excluded_fields:
-            child_data.pop(field, None)
-
-        _logger.info(f"Restoring {child_model_name} with corrected data: {child_data}")
-
-        # Attempt to create the child record
-        try:
-            self.env[child_model_name].create(child_data)
-        except Exception as e:
-            _logger.error(f"Error restoring {child_model_name}: {e}", exc_info=True)
-
-        # Skip logging action for child record
-        # Comment or remove the line below to skip logging for child records
-        # self.log_restore_action(self.env, self.env.user, child)
+        Entries are restored level by level, grouped by model with one create
+        per model. The ids of the restored records are kept in a map from the
+        old to the new ids, through which the many2one values of the following
+        levels are remapped. The entries linked through ``parent_record_id``
+        are restored last.
 
-        # Directly delete the recycle bin entry for the child
-        self.log_restore_action(self.env, self.env.user, child)
-        child.unlink()
+        :return: a tuple ``(restored_records, related_records, failed_records)``
+            of the restored recycle bin records and of the child or related
+            entries of restored records which could not be restored
+        """
+        id_map = {}
+        fields_cache = {}
+        restored_ids = []
+        # Selected child entries are restored along with their selected parent,
+        # once the new id of the parent is known
+        entries = self._filter_selected_roots()
+        while entries:
+            level_restored_ids = []
+            for model_name, model_entries in entries._group_by_model().items():
+                fields_info = fields_cache.setdefault(model_name, self.env[model_name].fields_get())
+                for entry, new_record in self._restore_model_records(
+                        model_name, model_entries, fields_info, id_map):
+                    id_map[(model_name, entry.record_id)] = new_record.id
+                    level_restored_ids.append(entry.id)
+            restored_ids += level_restored_ids
+            entries = self.search([
+                ('parent_id', 'in', level_restored_ids),
+                ('id', 'not in', restored_ids),
+            ]) if level_restored_ids else self.browse()
+        restored_records = self.browse(restored_ids)
+        failed_records = self.search([
+            ('parent_id', 'in', restored_ids),
+            ('id', 'not in', restored_ids),
+        ]) if restored_ids else self.browse()
+
+        # Handle related records if any
+        parent_ids = {
+            record.record_id: id_map[(record.model_id.model, record.record_id)]
+            for record in restored_records & self
+        }
+        related_ids = []
+        if parent_ids:
+            related_entries = self.search([
+                ('parent_record_id', 'in', list(parent_ids)),
+                ('id', 'not in', restored_ids),
+            ], order='record_id desc')
+            for model_name, model_entries in related_entries._group_by_model().items():
+                fields_info = fields_cache.setdefault(model_name, self.env[model_name].fields_get())
+                for entry, new_record in self._restore_model_records(
+                        model_name, model_entries, fields_info, id_map, parent_ids):
+                    related_ids.append(entry.id)
+            failed_records |= related_entries - self.browse(related_ids)
+        return restored_records, self.browse(related_ids), failed_records
+
+    def _filter_selected_roots(self):
+        """Return the entries of ``self`` none of whose ancestors is in ``self``."""
+        selected_ids = set(self.ids)
+        roots = []
+        for record in self:
+            parent = record.parent_id
+            seen = set()
+            while parent and parent.id not in selected_ids and parent.id not in seen:
+                seen.add(parent.id)
+                parent = parent.parent_id
+            if not parent or parent.id in seen:
+                roots.append(record.id)
+        return self.browse(roots)
+
+    def _group_by_model(self):
+        """Return ``{model_name: entries}`` of the entries holding restorable data."""
+        grouped = {}
+        for record in self:
+            # Validate deleted_data
+            if not record.payload:
+                _logger.error(f"Missing deleted_data for record ID {record.id}")
+                continue
+            grouped.setdefault(record.model_id.model, []).append(record.id)
+        return {model_name: self.browse(ids) for model_name, ids in grouped.items()}
 
+    @api.model
+    def _restore_model_records(self, model_name, entries, fields_info, id_map, parent_ids=None):
+        """Create the records of ``model_name`` deleted in ``entries``.
 
-    def get_related_records_data(self, parent_record_id, new_parent_record_id):
-        _logger.info(f"get_related_records_data STARTING with {parent_record_id} - {new_parent_record_id}")
-        related_records = self.env['recycle.bin'].search([('parent_record_id', '=', parent_record_id)], order='record_id desc')
+        They are created with a single create; should it fail, each record is
+        created on its own so that the valid ones are still restored.
 
-        if not related_records:
-            _logger.warning("There are no related records...")
-            return
-        _logger.warning(f"related_records: {related_records}")
+        :return: list of ``(entry, new_record)`` of the restored records
+        """
+        start = time.perf_counter()
+        restored = self._create_restored_records(model_name, entries, fields_info, id_map, parent_ids)
+        self.env['recycle.bin.metric']._record(
+            'restore', model_name, len(restored),
+            sum(entry.payload_size for entry, _new_record in restored), start)
+        return restored
 
-        for recycle_record in related_records:
+    @api.model
+    def _create_restored_records(self, model_name, entries, fields_info, id_map, parent_ids=None):
+        valid_entries = []
+        values_list = []
+        for entry in entries:
             try:
-                data = json.loads(recycle_record.deleted_data)
-                model_name = recycle_record.model_id.model
-                model = self.env[model_name]
-
-                prepared_data = {}
-                for field_name, field_value in data.items():
-                    _logger.warning(f"working on {field_name} with {field_value}")
-                    field = model._fields.get(field_name)
-                    _logger.warning(f"field: {field}")
-
-                    if field and field.type == 'many2one' and isinstance(field_value, list) and len(field_value) == 2:
-                        prepared_data[field_name] = field_value[0]
-                    elif field and field.type in ['one2many', 'many2many']:
-                        continue
-                    else:
-                        prepared_data[field_name] = field_value
-
-                # Correctly set 'res_id' if that's the intended logic
-                if 'res_id' in prepared_data and prepared_data['res_id'] == parent_record_id:
-                    prepared_data['res_id'] = new_parent_record_id
-
-                # Exclude non-restorable fields
-                excluded_fields = ['id', 'create_date', 'write_date', '__last_update']
-                for field in excluded_fields:
-                    prepared_data.pop(field, None)
-
-                _logger.info(f"Restoring {model_name} with corrected data: {prepared_data}")
-                new_related_record_id = self.env[model_name].create(prepared_data)
-                _logger.warning(f"new_related_record_id: {new_related_record_id} for {model_name}")
-
+                data = entry._get_deleted_values()
             except json.JSONDecodeError as e:
-                _logger.error(f"Error decoding JSON for recycle.bin record {recycle_record.id}: {e}")
+                _logger.error(f"Error decoding JSON for recycle.bin record {entry.id}: {e}")
                 continue
+            values_list.append(self._prepare_restore_values(data, fields_info, id_map, parent_ids))
+            valid_entries.append(entry)
+        if not values_list:
+            return []
+
+        _logger.info(f"Attempting to create {len(values_list)} {model_name} record(s)")
+        model = self.env[model_name].sudo()
+        try:
+            with self.env.cr.savepoint():
+                new_records = model.create(values_list)
+            return list(zip(valid_entries, new_records))
+        except Exception as e:
+            _logger.warning(f"Bulk restore of {model_name} failed, restoring records one by one: {e}")
+
+        restored = []
+        for entry, values in zip(valid_entries, values_list):
+            try:
+                with self.env.cr.savepoint():
+                    restored.append((entry, model.create(values)))
             except Exception as e:
-                _logger.error(f"Error restoring {model_name}: {e}", exc_info=True)
+                _logger.error(f"Error restoring record ID {entry.id}: {e}", exc_info=True)
+        return restored
 
-            recycle_record.unlink()
+    @api.model
+    def _prepare_restore_values(self, data, fields_info, id_map, parent_ids=None):
+        """Turn the serialized data of a deleted record into create values.
+
+        :param fields_info: the ``fields_get()`` of the record's model
+        :param id_map: dict mapping ``(model_name, old_id)`` of the records
+            restored so far to their new id, used to remap many2one values
+        :param parent_ids: dict mapping old to new ids of the parent records,
+            used to remap the ``res_id`` of related records
+        """
+        # Define fields to exclude from restoration
+        non_restorable_fields = [
+            'id', 'create_date', 'write_date', '__last_update',
+             'commercial_partner_id'
+        ]
+        child_relationship_fields = [
+            field for field, info in fields_info.items() if info.get('type') in ('one2many', 'many2many')
+        ]
+
+        # Combine excluded fields
+        excluded_fields = set(non_restorable_fields + child_relationship_fields)
+
+        # Remove excluded fields from the data
+        for field in excluded_fields:
+            data.pop(field, None)
+
+        # Adjust Many2one fields and other data transformations
+        for field_name, field_value in data.items():
+            field_info = fields_info.get(field_name, {})
+            if field_info.get('type') == 'many2one':
+                if isinstance(field_value, list) and len(field_value) == 2:
+                    field_value = field_value[0]
+                data[field_name] = id_map.get((field_info.get('relation'), field_value), field_value)
+            elif field_info.get('type') == 'datetime' and isinstance(field_value, str):
+                try:
+                    parsed_datetime = datetime.strptime(field_value, "%Y-%m-%d %H:%M:%S.%f")
+                    data[field_name] = parsed_datetime.strftime("%Y-%m-%d %H:%M:%S")
+                except ValueError:
+                    try:
+                        parsed_datetime = datetime.strptime(field_value, "%Y-%m-%d %H:%M:%S")
+                        data[field_name] = parsed_datetime.strftime("%Y-%m-%d %H:%M:%S")
+                    except ValueError:
+                        _logger.error(f"Error parsing datetime for field {field_name} with value {field_value}")
+            elif 'image_' in field_name or 'avatar_' in field_name:
+                if isinstance(field_value, str) and field_value.startswith("b'") and field_value.endswith("'"):
+                    image_data = field_value[2:-1]
+                    data[field_name] = image_data
+            elif isinstance(field_value, list) and len(field_value) == 2 and isinstance(field_value[0], int):
+                data[field_name] = field_value[0]
+
+        # Correctly set 'res_id' of the records related to a restored parent
+        if parent_ids and data.get('res_id'):
+            res_model = data.get('res_model')
+            if res_model and (res_model, data['res_id']) in id_map:
+                data['res_id'] = id_map[(res_model, data['res_id'])]
+            elif data['res_id'] in parent_ids:
+                data['res_id'] = parent_ids[data['res_id']]
+        return data
 
     def ensure_base64_encoded(self, data):
         """
@@ -403,14 +626,81 @@ class RecycleBin(models.Model):
                 self.log_delete_action(self.env, self.env.user, record)
             return super(RecycleBin, self).unlink()
 
-    def clear_recycle_bin(self):
+    def clear_recycle_bin(self, chunk_size=PURGE_CHUNK_SIZE):
+        """Permanently delete the records older than the recycle bin lifecycle.
+
+        Records are deleted oldest first in chunks of ``chunk_size``, each chunk
+        logging a single summary audit row and being committed on its own, so
+        a run interrupted by the cron time limit resumes where it stopped.
+        """
         lifecycle_days = int(self.env['ir.config_parameter'].sudo().get_param('recycle_bin.lifecycle_days', default=30))
         date_limit = fields.Datetime.now() - timedelta(days=lifecycle_days)
-        old_records = self.search([('deleted_datetime', '<', date_limit)])
-
-        # Log deletion action
-        for record in old_records:
-            self.log_delete_action(self.env, self.env.user, record)  # Log record deletion from recycle bin
-
-        # Then perform the actual deletion
-        old_records.with_context(bypass_recycle_bin=True).unlink()
+        remaining = self.search_count([('deleted_datetime', '<', date_limit)])
+        purged = 0
+        start = time.monotonic()
+        while remaining:
+            count = self._purge_chunk(date_limit, chunk_size)
+            if not count:
+                break
+            purged += count
+            remaining = max(remaining - count, 0)
+            # Commit the chunk, stopping when the cron runs out of time
+            if not self.env['ir.cron']._commit_progress(count, remaining=remaining):
+                break
+
+        # Finally drop the binary values only the deleted records referenced
+        self.env['recycle.bin.blob']._gc_blobs()
+
+        elapsed = time.monotonic() - start
+        _logger.info(
+            f"Purged {purged} record(s) from the recycle bin in {elapsed:.1f}s "
+            f"({purged / elapsed if elapsed else 0:.0f} records/s), {remaining} remaining")
+        return purged
+
+    def _purge_chunk(self, date_limit, chunk_size):
+        """Delete the ``chunk_size`` oldest records deleted before ``date_limit``
+        and log one audit row summing them up.
+
+        :return: the number of records deleted
+        """
+        self.env.flush_all()
+        self.env.cr.execute("""
+            WITH chunk AS (
+                SELECT id
+                  FROM recycle_bin
+                 WHERE deleted_datetime < %s
+              ORDER BY deleted_datetime, id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+            )
+            DELETE FROM recycle_bin
+             USING chunk
+             WHERE recycle_bin.id = chunk.id
+         RETURNING recycle_bin.model_id, recycle_bin.deleted_datetime
+        """, (date_limit, chunk_size))
+        rows = self.env.cr.fetchall()
+        if not rows:
+            return 0
+        self.invalidate_model()
+
+        counts = {}
+        for model_id, _deleted_datetime in rows:
+            counts[model_id] = counts.get(model_id, 0) + 1
+        model_names = {
+            model.id: model.model
+            for model in self.env['ir.model'].sudo().browse([model_id for model_id in counts if model_id])
+        }
+        details = ', '.join(
+            f"{model_names.get(model_id, _('Unknown'))}: {count}" for model_id, count in counts.items()
+        )
+        self.env['recycle.bin.audit.log'].create([{
+            'action': 'delete',
+            'user_id': self.env.uid,
+            'timestamp': fields.Datetime.now(),
+            'details': _("%(count)s record(s) deleted up to %(date)s were purged from the recycle bin (%(details)s)") % {
+                'count': len(rows),
+                'date': max(deleted_datetime for _model_id, deleted_datetime in rows),
+                'details': details,
+            },
+        }])
+        return len(rows)
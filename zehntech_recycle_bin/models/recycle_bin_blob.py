@@ -0,0 +1,73 @@
+import hashlib
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class RecycleBinBlob(models.Model):
+    _name = 'recycle.bin.blob'
+    _description = 'Recycle Bin Binary Data'
+    _rec_name = 'checksum'
+
+    checksum = fields.Char(
+        string='Checksum',
+        required=True,
+        readonly=True,
+        index=True,
+        help="SHA1 checksum of the binary value, shared by every deleted record holding the same content."
+    )
+    data = fields.Binary(
+        string='Binary Data',
+        attachment=True,
+        readonly=True,
+        help="The binary value of a deleted record, stored once per checksum."
+    )
+    recycle_bin_ids = fields.Many2many(
+        'recycle.bin', 'recycle_bin_blob_rel', 'blob_id', 'recycle_bin_id',
+        string='Recycle Bin Records',
+        readonly=True,
+        help="The recycle bin records referencing this binary value."
+    )
+
+    _checksum_uniq = models.Constraint(
+        'UNIQUE(checksum)',
+        'A binary value can only be stored once in the recycle bin.',
+    )
+
+    @api.model
+    def _compute_checksum(self, value):
+        if isinstance(value, str):
+            value = value.encode()
+        return hashlib.sha1(value).hexdigest()
+
+    @api.model
+    def _get_blobs(self, values):
+        """Return the blobs of ``values``, a dict ``{checksum: data}``, creating
+        only the ones whose content is not stored yet.
+
+        The rows are inserted with ``ON CONFLICT DO NOTHING`` so concurrent
+        deletions of the same content share one blob instead of failing on
+        the checksum constraint.
+        """
+        self.flush_model()
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO recycle_bin_blob (checksum, create_uid, create_date, write_uid, write_date)
+            SELECT checksum, %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%(checksums)s::varchar[]) AS checksum
+                ON CONFLICT (checksum) DO NOTHING
+         RETURNING id, checksum
+            """,
+            checksums=list(values),
+            uid=self.env.uid,
+        ))
+        # The content is stored as an attachment, written through the ORM
+        for blob_id, checksum in self.env.cr.fetchall():
+            self.sudo().browse(blob_id).write({'data': values[checksum]})
+        return self.sudo().search([('checksum', 'in', list(values))])
+
+    @api.model
+    def _gc_blobs(self):
+        """Delete the binary values no recycle bin record references anymore."""
+        orphans = self.sudo().search([('recycle_bin_ids', '=', False)])
+        orphans.unlink()
+        return len(orphans)
@@ -0,0 +1,207 @@
+import logging
+import time
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+
+class RecycleBinMetric(models.Model):
+    _name = 'recycle.bin.metric'
+    _description = 'Recycle Bin Metrics'
+    _order = 'date desc, id desc'
+    _rec_name = 'model_id'
+
+    date = fields.Date(
+        string='Date',
+        required=True,
+        readonly=True,
+        index=True,
+        default=fields.Date.context_today,
+        help="The day the operations were performed on."
+    )
+    model_id = fields.Many2one(
+        'ir.model',
+        string='Model',
+        required=True,
+        readonly=True,
+        ondelete='cascade',
+        help="The model of the records captured or restored."
+    )
+    operation = fields.Selection([
+        ('capture', 'Capture'),
+        ('restore', 'Restore'),
+    ],
+    string='Operation',
+    required=True,
+    readonly=True,
+    help="Capture of deleted records into the recycle bin, or restore of records out of it.")
+    event_count = fields.Integer(
+        string='Operations',
+        readonly=True,
+        default=1,
+        help="The number of capture or restore operations."
+    )
+    record_count = fields.Integer(
+        string='Records',
+        readonly=True,
+        help="The number of records captured or restored."
+    )
+    payload_bytes = fields.Integer(
+        string='Payload Size (bytes)',
+        readonly=True,
+        help="The size of the compressed data of the records captured or restored."
+    )
+    duration_ms = fields.Float(
+        string='Total Latency (ms)',
+        readonly=True,
+        help="The time spent capturing or restoring the records."
+    )
+    max_duration_ms = fields.Float(
+        string='Max Latency (ms)',
+        readonly=True,
+        aggregator='max',
+        help="The longest single capture or restore operation."
+    )
+    rolled_up = fields.Boolean(
+        string='Daily Rollup',
+        readonly=True,
+        help="Whether this row sums up all the operations of its day, model and operation type."
+    )
+
+    _daily_uniq = models.UniqueIndex('(date, model_id, operation) WHERE rolled_up')
+
+    @api.model
+    def _record(self, operation, model_name, record_count, payload_bytes, start):
+        """Record one capture or restore operation started at ``start``, a
+        ``time.perf_counter()`` value.
+
+        The operations are summed up per model and operation type for the
+        transaction, and written as one row each when it commits.
+        """
+        duration_ms = (time.perf_counter() - start) * 1000
+        pending = self.env.cr.precommit.data.get('recycle_bin_metrics')
+        if pending is None:
+            pending = self.env.cr.precommit.data['recycle_bin_metrics'] = {}
+            self.env.cr.precommit.add(self._flush_pending)
+        counters = pending.setdefault((model_name, operation), {
+            'event_count': 0,
+            'record_count': 0,
+            'payload_bytes': 0,
+            'duration_ms': 0.0,
+            'max_duration_ms': 0.0,
+        })
+        counters['event_count'] += 1
+        counters['record_count'] += record_count
+        counters['payload_bytes'] += payload_bytes
+        counters['duration_ms'] += duration_ms
+        counters['max_duration_ms'] = max(counters['max_duration_ms'], duration_ms)
+
+    @api.model
+    def _flush_pending(self):
+        """Write the operations recorded in the transaction."""
+        pending = self.env.cr.precommit.data.pop('recycle_bin_metrics', {})
+        if not pending:
+            return
+        self.sudo().create([{
+            'model_id': self._get_model_id(model_name),
+            'operation': operation,
+            **counters,
+        } for (model_name, operation), counters in pending.items()])
+
+    @api.model
+    def _cron_rollup_metrics(self):
+        """Sum up the operations of the past days into one row per day, model
+        and operation type, to keep the table small."""
+        self.flush_model()
+        self.env.cr.execute(SQL(
+            """
+            WITH rolled AS (
+                DELETE FROM recycle_bin_metric
+                 WHERE date < %(today)s AND rolled_up IS NOT TRUE
+             RETURNING date, model_id, operation, event_count, record_count,
+                       payload_bytes, duration_ms, max_duration_ms
+            )
+            INSERT INTO recycle_bin_metric AS metric (
+                date, model_id, operation, event_count, record_count, payload_bytes,
+                duration_ms, max_duration_ms, rolled_up,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT date, model_id, operation, SUM(event_count), SUM(record_count),
+                   SUM(payload_bytes), SUM(duration_ms), MAX(max_duration_ms), TRUE,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM rolled
+          GROUP BY date, model_id, operation
+                ON CONFLICT (date, model_id, operation) WHERE rolled_up
+                DO UPDATE SET event_count = metric.event_count + EXCLUDED.event_count,
+                              record_count = metric.record_count + EXCLUDED.record_count,
+                              payload_bytes = metric.payload_bytes + EXCLUDED.payload_bytes,
+                              duration_ms = metric.duration_ms + EXCLUDED.duration_ms,
+                              max_duration_ms = GREATEST(metric.max_duration_ms, EXCLUDED.max_duration_ms),
+                              write_date = EXCLUDED.write_date
+            """,
+            today=fields.Date.context_today(self),
+            uid=self.env.uid,
+        ))
+        _logger.info(f"Rolled up recycle bin metrics into {self.env.cr.rowcount} daily row(s)")
+        self.invalidate_model()
+
+    @api.model
+    def _get_prometheus_metrics(self):
+        """Return the metrics in the Prometheus text exposition format.
+
+        Operation metrics are counters summed over the whole history; storage
+        metrics are gauges of what the recycle bin currently holds.
+        """
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT model.model, metric.operation, SUM(metric.event_count), SUM(metric.record_count),
+                   SUM(metric.payload_bytes), SUM(metric.duration_ms)
+              FROM recycle_bin_metric metric
+              JOIN ir_model model ON model.id = metric.model_id
+          GROUP BY model.model, metric.operation
+          ORDER BY model.model, metric.operation
+        """)
+        operations = self.env.cr.fetchall()
+        self.env['recycle.bin'].flush_model(['model_id', 'payload_size'])
+        self.env.cr.execute("""
+            SELECT model.model, COUNT(*), COALESCE(SUM(bin.payload_size), 0)
+              FROM recycle_bin bin
+              JOIN ir_model model ON model.id = bin.model_id
+          GROUP BY model.model
+          ORDER BY model.model
+        """)
+        storage = self.env.cr.fetchall()
+
+        lines = []
+
+        def add_metric(name, metric_type, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        add_metric('recycle_bin_operations_total', 'counter', 'Capture and restore operations.', [
+            ({'model': model, 'operation': operation}, events)
+            for model, operation, events, _records, _size, _duration in operations
+        ])
+        add_metric('recycle_bin_records_total', 'counter', 'Records captured or restored.', [
+            ({'model': model, 'operation': operation}, records)
+            for model, operation, _events, records, _size, _duration in operations
+        ])
+        add_metric('recycle_bin_payload_bytes_total', 'counter', 'Compressed bytes captured or restored.', [
+            ({'model': model, 'operation': operation}, size)
+            for model, operation, _events, _records, size, _duration in operations
+        ])
+        add_metric('recycle_bin_duration_seconds_total', 'counter', 'Time spent capturing or restoring records.', [
+            ({'model': model, 'operation': operation}, (duration or 0.0) / 1000)
+            for model, operation, _events, _records, _size, duration in operations
+        ])
+        add_metric('recycle_bin_stored_records', 'gauge', 'Records currently held by the recycle bin.', [
+            ({'model': model}, count) for model, count, _size in storage
+        ])
+        add_metric('recycle_bin_stored_bytes', 'gauge', 'Compressed bytes currently held by the recycle bin.', [
+            ({'model': model}, size) for model, _count, size in storage
+        ])
+        return '\n'.join(lines) + '\n'
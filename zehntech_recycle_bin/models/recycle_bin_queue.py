@@ -0,0 +1,232 @@
+import base64
+import json
+import logging
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+QUEUE_BATCH_SIZE = 100
+
+
+class RecycleBinQueue(models.Model):
+    _name = 'recycle.bin.queue'
+    _description = 'Recycle Bin Capture Queue'
+    _order = 'id'
+
+    model_id = fields.Many2one(
+        'ir.model',
+        readonly=True,
+        ondelete='cascade',
+        help="The model of the deleted records."
+    )
+    record_count = fields.Integer(
+        string='Deleted Records',
+        readonly=True,
+        help="The number of records deleted, related records excluded."
+    )
+    user_id = fields.Many2one(
+        'res.users',
+        string="Deleted by",
+        readonly=True,
+        help="The user who deleted the records."
+    )
+    deleted_datetime = fields.Datetime(
+        string='Records Deleted at',
+        readonly=True,
+        help="The date and time when the records were deleted."
+    )
+    payload = fields.Binary(
+        string='Snapshot',
+        attachment=False,
+        readonly=True,
+        prefetch=False,
+        exportable=False,
+        help="The compressed raw column values of the deleted records and of the records deleted with them."
+    )
+    failed = fields.Boolean(
+        readonly=True,
+        help="The snapshot could not be expanded; it is kept aside and no longer processed."
+    )
+    error = fields.Text(
+        readonly=True,
+        help="The error raised when expanding the snapshot."
+    )
+
+    @api.model
+    def _is_enabled(self):
+        return self.env['ir.config_parameter'].sudo().get_param('recycle_bin.async_capture') == 'True'
+
+    @api.model
+    def _enqueue(self, records):
+        """Stage a snapshot of ``records``, about to be deleted, for the queue worker.
+
+        The snapshot holds the raw column values of the records and of the
+        records deleted in cascade with them, fetched with one query per model
+        and relation.
+
+        :return: the size of the compressed snapshot
+        """
+        groups = [{
+            'model': records._name,
+            'rows': self._fetch_rows(records._name, 'id', records.ids),
+        }]
+        depth = self.env['recycle.bin']._get_cascade_depth()
+        if depth > 0:
+            self._snapshot_related_rows(records._name, records.ids, depth, groups, {
+                (records._name, record_id) for record_id in records.ids
+            })
+        recycle_bin_env = self.env['recycle.bin']
+        payload = recycle_bin_env._encode_payload(json.dumps(groups))
+        self.sudo().create({
+            'model_id': records._get_model_id(records._name),
+            'record_count': len(records),
+            'user_id': self.env.uid,
+            'deleted_datetime': fields.Datetime.now(),
+            'payload': payload,
+        })
+        # Wake the worker up once per transaction, however many deletions it holds
+        if not self.env.cr.precommit.data.get('recycle_bin_queue_triggered'):
+            self.env.cr.precommit.data['recycle_bin_queue_triggered'] = True
+            self.env.ref('zehntech_recycle_bin.ir_cron_process_recycle_bin_queue').sudo()._trigger()
+        return recycle_bin_env._get_payload_size(payload)
+
+    @api.model
+    def _fetch_rows(self, model_name, column, ids):
+        model = self.env[model_name]
+        model.flush_model()
+        self.env.cr.execute(SQL(
+            "SELECT * FROM %s WHERE %s = ANY(%s) ORDER BY id",
+            SQL.identifier(model._table), SQL.identifier(column), list(ids),
+        ))
+        return [
+            {column: self._serialize_value(model, column, value) for column, value in row.items()}
+            for row in self.env.cr.dictfetchall()
+        ]
+
+    @api.model
+    def _serialize_value(self, model, column, value):
+        """Turn a raw column value into a JSON serializable one, losslessly."""
+        if isinstance(value, (bytes, memoryview)):
+            value = bytes(value)
+            field = model._fields.get(column)
+            # Binary fields store their base64 encoded content, other byte
+            # columns are encoded here
+            if field and field.type == 'binary':
+                return value.decode()
+            return base64.b64encode(value).decode()
+        if isinstance(value, datetime):
+            return fields.Datetime.to_string(value)
+        if isinstance(value, date):
+            return fields.Date.to_string(value)
+        if isinstance(value, Decimal):
+            # Numeric columns, read as floats by the ORM
+            return float(value)
+        return value
+
+    @api.model
+    def _snapshot_related_rows(self, model_name, ids, depth, groups, visited):
+        for comodel_name, inverse_name in self.env[model_name]._get_cascade_relations():
+            rows = [
+                row for row in self._fetch_rows(comodel_name, inverse_name, ids)
+                if (comodel_name, row['id']) not in visited
+            ]
+            if not rows:
+                continue
+            child_ids = [row['id'] for row in rows]
+            visited.update((comodel_name, child_id) for child_id in child_ids)
+            groups.append({
+                'model': comodel_name,
+                'parent_model': model_name,
+                'parent_field': inverse_name,
+                'rows': rows,
+            })
+            if depth > 1:
+                self._snapshot_related_rows(comodel_name, child_ids, depth - 1, groups, visited)
+
+    @api.model
+    def _normalize_row(self, model, row):
+        """Turn raw column values into the values ``read()`` would return."""
+        values = {}
+        for column, value in row.items():
+            field = model._fields.get(column)
+            if not field or not field.store:
+                continue
+            if field.translate and isinstance(value, dict):
+                value = value.get(self.env.lang) or value.get('en_US') or next(iter(value.values()), False)
+            values[column] = value
+        return values
+
+    def _expand(self):
+        """Create the recycle bin records of the snapshots of ``self``.
+
+        Each snapshot is expanded in its own savepoint: the ones failing are
+        flagged as failed with their error, the others are not held back.
+
+        :return: the entries expanded successfully
+        """
+        expanded_ids = []
+        for entry in self:
+            try:
+                with self.env.cr.savepoint():
+                    entry._expand_snapshot()
+            except Exception as e:
+                _logger.error(f"Failed to expand recycle bin snapshot {entry.id}: {e}", exc_info=True)
+                entry.write({'failed': True, 'error': str(e)})
+            else:
+                expanded_ids.append(entry.id)
+        return self.browse(expanded_ids)
+
+    def _expand_snapshot(self):
+        """Create the recycle bin records of the snapshot of ``self``."""
+        self.ensure_one()
+        recycle_bin_env = self.env['recycle.bin']
+        groups = json.loads(zlib.decompress(self.payload))
+        recycle_bin_ids = {}
+        for group in groups:
+            if group['model'] not in self.env:
+                _logger.warning(f"Skipping snapshot of unknown model {group['model']}")
+                continue
+            model = self.env[group['model']]
+            model_id = model._get_model_id(model._name)
+            binary_fields = [name for name, field in model._fields.items() if field.type == 'binary']
+            values_list = []
+            blob_data_list = []
+            for row in group['rows']:
+                record_data = self._normalize_row(model, row)
+                payload_values, blob_data = recycle_bin_env._prepare_payload(record_data, binary_fields)
+                values = {
+                    'name': record_data.get(model._rec_name) or f"{model._name},{row['id']}",
+                    'model_id': model_id,
+                    'record_id': row['id'],
+                    'deleted_datetime': self.deleted_datetime,
+                    'user_id': self.user_id.id,
+                    **payload_values,
+                }
+                if isinstance(record_data.get('res_id'), int):
+                    values['parent_record_id'] = record_data['res_id']
+                if group.get('parent_model'):
+                    values['parent_id'] = recycle_bin_ids.get(
+                        (group['parent_model'], row[group['parent_field']]))
+                values_list.append(values)
+                blob_data_list.append(blob_data)
+            recycle_bin_env._link_blobs(values_list, blob_data_list)
+            for row, recycle_record in zip(group['rows'], recycle_bin_env.create(values_list)):
+                recycle_bin_ids[(model._name, row['id'])] = recycle_record.id
+
+    @api.model
+    def _cron_process_queue(self, batch_size=QUEUE_BATCH_SIZE):
+        """Expand the staged snapshots into recycle bin records, committing
+        after each batch. Failed snapshots stay in the queue, flagged."""
+        while True:
+            entries = self.search([('failed', '=', False)], limit=batch_size)
+            if not entries:
+                break
+            expanded = entries._expand()
+            _logger.info(f"Expanded {len(expanded)} recycle bin snapshot(s), {len(entries - expanded)} failed")
+            expanded.unlink()
+            remaining = self.search_count([('failed', '=', False)])
+            if not self.env['ir.cron']._commit_progress(len(entries), remaining=remaining):
+                break
@@ -15,6 +15,19 @@ class ResConfigSettings(models.TransientModel):
         default=30  # Default lifecycle days
     )
 
+    recycle_bin_cascade_depth = fields.Integer(
+        string='Related Records Depth',
+        help='Number of levels of related records, deleted along with a record, that are captured in the recycle bin.',
+        config_parameter='recycle_bin.cascade_depth',
+        default=1
+    )
+
+    recycle_bin_async_capture = fields.Boolean(
+        string='Asynchronous Capture',
+        help='Only stage a snapshot of the deleted records, which a background job turns into recycle bin records. Binary values stored as attachments are not captured in this mode.',
+        config_parameter='recycle_bin.async_capture',
+    )
+
     recycle_bin_exclude_models = fields.Many2many(
         'ir.model',
         string='Exclude Models',
@@ -0,0 +1 @@
+from . import test_recycle_bin
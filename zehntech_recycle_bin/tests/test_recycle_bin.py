@@ -0,0 +1,372 @@
+import json
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import mute_logger
+from odoo.tools.sql import index_exists, make_index_name
+
+# 1x1 transparent PNG
+IMAGE = b'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=='
+
+
+@tagged('post_install', '-at_install')
+class TestRecycleBin(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.RecycleBin = cls.env['recycle.bin']
+        cls.Metric = cls.env['recycle.bin.metric']
+        cls.partner_model_id = cls.env['ir.model']._get_id('res.partner')
+        cls.bank_model_id = cls.env['ir.model']._get_id('res.partner.bank')
+        cls.set_param('recycle_bin.cascade_depth', 1)
+        cls.set_param('recycle_bin.async_capture', False)
+
+    @classmethod
+    def set_param(cls, key, value):
+        cls.env['ir.config_parameter'].sudo().set_param(key, value)
+
+    def _get_entries(self, model_id, record_ids):
+        return self.RecycleBin.search([('model_id', '=', model_id), ('record_id', 'in', record_ids)])
+
+    def _create_partner_with_banks(self, name):
+        partner = self.env['res.partner'].create({'name': name})
+        banks = self.env['res.partner.bank'].create([
+            {'acc_number': f'{name} {index}', 'partner_id': partner.id} for index in range(2)
+        ])
+        return partner, banks
+
+    def _patch_commit_progress(self):
+        # Tests cannot commit: report plenty of time left to the batch loops
+        return patch.object(self.registry['ir.cron'], '_commit_progress', return_value=3600.0)
+
+    def test_capture_batch(self):
+        partners = self.env['res.partner'].create([{'name': f'Captured {index}'} for index in range(3)])
+        partner_ids = partners.ids
+        partners.unlink()
+
+        entries = self._get_entries(self.partner_model_id, partner_ids)
+        self.assertEqual(sorted(entries.mapped('record_id')), partner_ids)
+        self.assertEqual(len(set(entries.mapped('deleted_datetime'))), 1)
+        self.assertEqual(entries[0]._get_deleted_values()['name'], entries[0].name)
+        self.assertTrue(all(entries.mapped('payload_size')))
+        # The column holds the compressed bytes themselves, not their base64
+        self.env.cr.execute("SELECT octet_length(payload), payload_size FROM recycle_bin WHERE id = ANY(%s)", (entries.ids,))
+        for length, payload_size in self.env.cr.fetchall():
+            self.assertEqual(length, payload_size)
+        audit_logs = self.env['recycle.bin.audit.log'].search([('recycle_bin_id', 'in', entries.ids)])
+        self.assertEqual(audit_logs.recycle_bin_id, entries)
+        self.assertEqual(set(audit_logs.mapped('action')), {'create'})
+
+    def test_capture_links_children_to_their_parent(self):
+        first, first_banks = self._create_partner_with_banks('First')
+        second, second_banks = self._create_partner_with_banks('Second')
+        partner_ids = [first.id, second.id]
+        bank_ids = {first.id: first_banks.ids, second.id: second_banks.ids}
+        (first | second).unlink()
+
+        for entry in self._get_entries(self.partner_model_id, partner_ids):
+            self.assertEqual(sorted(entry.child_ids.mapped('record_id')), bank_ids[entry.record_id])
+
+    def test_bypass_models(self):
+        self.set_param('recycle_bin.exclude_models', 'res.partner.category')
+        bypass_models = self.RecycleBin._get_bypass_models()
+        self.assertIn('recycle.bin.blob', bypass_models)
+        self.assertIn('res.partner.category', bypass_models)
+        self.assertNotIn('res.partner', bypass_models)
+
+        category = self.env['res.partner.category'].create({'name': 'Excluded'})
+        category_id = category.id
+        category.unlink()
+        param = self.env['ir.config_parameter'].create({'key': 'recycle_bin.test', 'value': '1'})
+        param_id = param.id
+        param.unlink()
+        self.assertFalse(self._get_entries(self.env['ir.model']._get_id('res.partner.category'), [category_id]))
+        self.assertFalse(self._get_entries(self.env['ir.model']._get_id('ir.config_parameter'), [param_id]))
+
+    def test_blob_dedup_and_restore(self):
+        partners = self.env['res.partner'].create([
+            {'name': 'Pictured A', 'image_1920': IMAGE},
+            {'name': 'Pictured B', 'image_1920': IMAGE},
+        ])
+        image = partners[0].image_1920
+        checksum = self.env['recycle.bin.blob']._compute_checksum(image)
+        partner_ids = partners.ids
+        partners.unlink()
+
+        entries = self._get_entries(self.partner_model_id, partner_ids)
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0].blob_ids, entries[1].blob_ids)
+        blob = self.env['recycle.bin.blob'].search([('checksum', '=', checksum)])
+        self.assertEqual(len(blob), 1)
+        self.assertIn(blob, entries[0].blob_ids)
+        # The payload only holds a reference to the image
+        self.assertEqual(json.loads(entries[0].deleted_data)['image_1920'], {'__recycle_bin_blob__': checksum})
+        self.assertEqual(entries[0]._get_deleted_values()['image_1920'], image)
+
+        # Storing the same content again reuses the blob
+        self.assertEqual(self.env['recycle.bin.blob']._get_blobs({checksum: image}), blob)
+
+        entry = entries.filtered(lambda entry: entry.record_id == partner_ids[0])
+        entry.restore_record()
+        restored = self.env['res.partner'].search([('name', '=', 'Pictured A')])
+        self.assertEqual(len(restored), 1)
+        self.assertEqual(restored.image_1920, image)
+        self.assertFalse(entry.exists())
+
+        # The blob is only dropped once no entry references it anymore
+        self.env['recycle.bin.blob']._gc_blobs()
+        self.assertTrue(blob.exists())
+        (entries - entry).with_context(bypass_recycle_bin=True).unlink()
+        self.env['recycle.bin.blob']._gc_blobs()
+        self.assertFalse(blob.exists())
+
+    def test_cascade_depth(self):
+        partner, banks = self._create_partner_with_banks('Shallow')
+        partner_id, bank_ids = partner.id, banks.ids
+        self.set_param('recycle_bin.cascade_depth', 0)
+        partner.unlink()
+        self.assertEqual(len(self._get_entries(self.partner_model_id, [partner_id])), 1)
+        self.assertFalse(self._get_entries(self.bank_model_id, bank_ids))
+
+        partner, banks = self._create_partner_with_banks('Deep')
+        partner_id, bank_ids = partner.id, banks.ids
+        self.set_param('recycle_bin.cascade_depth', 1)
+        partner.unlink()
+        entry = self._get_entries(self.partner_model_id, [partner_id])
+        self.assertEqual(sorted(entry.child_ids.mapped('record_id')), bank_ids)
+        self.assertEqual(entry.child_ids.model_id.id, self.bank_model_id)
+
+    def test_restore_remaps_children(self):
+        partner, _banks = self._create_partner_with_banks('Parent Only')
+        partner_id = partner.id
+        partner.unlink()
+        entry = self._get_entries(self.partner_model_id, [partner_id])
+        child_entries = entry.child_ids
+        self.assertEqual(len(child_entries), 2)
+
+        entry.restore_record()
+        restored = self.env['res.partner'].search([('name', '=', 'Parent Only')])
+        self.assertEqual(len(restored), 1)
+        self.assertEqual(len(restored.bank_ids), 2)
+        self.assertFalse((entry | child_entries).exists())
+        audit_logs = self.env['recycle.bin.audit.log'].search([('action', '=', 'restore')])
+        self.assertEqual(len(audit_logs), 3)
+
+    def test_restore_selected_parent_and_children(self):
+        partner, banks = self._create_partner_with_banks('Parent And Children')
+        partner_id, acc_numbers = partner.id, sorted(banks.mapped('acc_number'))
+        partner.unlink()
+        entry = self._get_entries(self.partner_model_id, [partner_id])
+        selection = entry | entry.child_ids
+
+        # The children are restored once, along with their parent
+        selection.restore_record()
+        restored = self.env['res.partner'].search([('name', '=', 'Parent And Children')])
+        self.assertEqual(len(restored), 1)
+        self.assertEqual(sorted(restored.bank_ids.mapped('acc_number')), acc_numbers)
+        self.assertFalse(self.env['res.partner.bank'].search([
+            ('acc_number', 'in', acc_numbers), ('partner_id', '!=', restored.id),
+        ]))
+        self.assertFalse(selection.exists())
+
+    def test_restore_reports_failed_children(self):
+        partner, banks = self._create_partner_with_banks('Partial Restore')
+        partner_id, bank_ids = partner.id, banks.ids
+        partner.unlink()
+        entry = self._get_entries(self.partner_model_id, [partner_id])
+        bad_entry = self._get_entries(self.bank_model_id, bank_ids[:1])
+        good_entry = entry.child_ids - bad_entry
+        bad_entry.payload = self.RecycleBin._encode_payload(json.dumps({'acc_number': False}))
+
+        with mute_logger('odoo.addons.zehntech_recycle_bin.models.recycle_bin', 'odoo.sql_db'):
+            action = entry.restore_record()
+        restored = self.env['res.partner'].search([('name', '=', 'Partial Restore')])
+        self.assertEqual(len(restored.bank_ids), 1)
+        self.assertEqual(action['params']['type'], 'warning')
+        self.assertIn(bad_entry.name, action['params']['message'])
+        # The failed child is kept, the restored entries are removed
+        self.assertFalse((entry | good_entry).exists())
+        self.assertTrue(bad_entry.exists())
+        self.assertFalse(bad_entry.parent_id)
+
+    def test_purge_in_chunks(self):
+        old = fields.Datetime.now() - timedelta(days=60)
+        old_entries = self.RecycleBin.create([{
+            'name': f'Old {index}',
+            'model_id': self.partner_model_id,
+            'record_id': index,
+            'deleted_datetime': old + timedelta(minutes=index),
+            'payload': self.RecycleBin._encode_payload('{}'),
+        } for index in range(5)])
+        recent_entry = self.RecycleBin.create({
+            'name': 'Recent',
+            'model_id': self.partner_model_id,
+            'record_id': 99,
+            'payload': self.RecycleBin._encode_payload('{}'),
+        })
+        with self._patch_commit_progress() as commit_progress:
+            purged = self.RecycleBin.clear_recycle_bin(chunk_size=2)
+        self.assertEqual(purged, 5)
+        self.assertEqual(commit_progress.call_count, 3)
+        self.assertFalse(old_entries.exists())
+        self.assertTrue(recent_entry.exists())
+        # One summary audit row per chunk
+        audit_logs = self.env['recycle.bin.audit.log'].search([
+            ('action', '=', 'delete'), ('details', 'ilike', 'purged'),
+        ])
+        self.assertEqual(len(audit_logs), 3)
+
+    def test_date_filter_domain(self):
+        entries = self.RecycleBin.create([{
+            'name': f'Filtered {day}',
+            'model_id': self.partner_model_id,
+            'record_id': day,
+            'deleted_datetime': datetime(2024, 1, day, 12),
+            'payload': self.RecycleBin._encode_payload('{}'),
+        } for day in (1, 10, 20)])
+        wizard = self.RecycleBin.new({'start_date': date(2024, 1, 5)})
+        self.assertEqual(wizard._get_date_filter_domain(), [('deleted_datetime', '>=', date(2024, 1, 5))])
+
+        wizard.end_date = date(2024, 1, 15)
+        action = wizard.apply_date_filter()
+        self.assertEqual(action['view_mode'], 'list,form')
+        self.assertEqual(action['domain'], [
+            ('deleted_datetime', '>=', date(2024, 1, 5)),
+            ('deleted_datetime', '<=', date(2024, 1, 15)),
+        ])
+        self.assertEqual(self.RecycleBin.search(action['domain']) & entries, entries[1])
+
+    def test_lookup_indexes(self):
+        for table, column in [
+            ('recycle_bin', 'name'),
+            ('recycle_bin', 'model_id'),
+            ('recycle_bin', 'parent_record_id'),
+            ('recycle_bin', 'deleted_datetime'),
+            ('recycle_bin', 'user_id'),
+            ('recycle_bin', 'parent_id'),
+            ('recycle_bin_audit_log', 'recycle_bin_id'),
+        ]:
+            with self.subTest(table=table, column=column):
+                self.assertTrue(index_exists(self.env.cr, make_index_name(table, column)))
+
+    def test_queue_capture(self):
+        self.set_param('recycle_bin.async_capture', True)
+        partner, banks = self._create_partner_with_banks('Queued')
+        partner_id, bank_ids = partner.id, banks.ids
+        partner.unlink()
+        self.assertFalse(self._get_entries(self.partner_model_id, [partner_id]))
+        self.assertEqual(self.env['recycle.bin.queue'].search_count([]), 1)
+
+        with self._patch_commit_progress():
+            self.env['recycle.bin.queue']._cron_process_queue()
+        self.assertFalse(self.env['recycle.bin.queue'].search_count([]))
+        entry = self._get_entries(self.partner_model_id, [partner_id])
+        self.assertEqual(entry._get_deleted_values()['name'], 'Queued')
+        self.assertEqual(sorted(entry.child_ids.mapped('record_id')), bank_ids)
+
+    def test_queue_expand_binary_values(self):
+        Queue = self.env['recycle.bin.queue']
+        # Raw binary columns are fetched as memoryview and kept as base64 text
+        Attachment = self.env['ir.attachment']
+        self.assertEqual(Queue._serialize_value(Attachment, 'db_datas', memoryview(IMAGE)), IMAGE.decode())
+        self.assertEqual(Queue._serialize_value(Queue, 'unknown', b'\x00\x01'), 'AAE=')
+
+        groups = [{
+            'model': 'res.partner',
+            'rows': [{'id': 123456, 'name': 'Snapshot', 'image_1920': IMAGE.decode()}],
+        }]
+        entry = Queue.create({
+            'model_id': self.partner_model_id,
+            'record_count': 1,
+            'user_id': self.env.uid,
+            'deleted_datetime': fields.Datetime.now(),
+            'payload': self.RecycleBin._encode_payload(json.dumps(groups)),
+        })
+        entry._expand()
+        recycle_entry = self._get_entries(self.partner_model_id, [123456])
+        self.assertEqual(recycle_entry.name, 'Snapshot')
+        self.assertEqual(len(recycle_entry.blob_ids), 1)
+        self.assertEqual(recycle_entry._get_deleted_values()['image_1920'], IMAGE)
+
+    def test_queue_skips_failed_snapshot(self):
+        Queue = self.env['recycle.bin.queue']
+
+        def snapshot(payload):
+            return {
+                'model_id': self.partner_model_id,
+                'record_count': 1,
+                'user_id': self.env.uid,
+                'deleted_datetime': fields.Datetime.now(),
+                'payload': payload,
+            }
+
+        first, bad, last = Queue.create([
+            snapshot(self.RecycleBin._encode_payload(json.dumps([
+                {'model': 'res.partner', 'rows': [{'id': 123457, 'name': 'First'}]},
+            ]))),
+            snapshot(b'not a compressed snapshot'),
+            snapshot(self.RecycleBin._encode_payload(json.dumps([
+                {'model': 'res.partner', 'rows': [{'id': 123458, 'name': 'Last'}]},
+            ]))),
+        ])
+        with self._patch_commit_progress(), mute_logger('odoo.addons.zehntech_recycle_bin.models.recycle_bin_queue'):
+            Queue._cron_process_queue(batch_size=2)
+        self.assertEqual(
+            sorted(self._get_entries(self.partner_model_id, [123457, 123458]).mapped('name')),
+            ['First', 'Last'])
+        self.assertFalse((first | last).exists())
+        self.assertEqual(Queue.search([]), bad)
+        self.assertTrue(bad.failed)
+        self.assertTrue(bad.error)
+
+    def test_metric_written_at_commit(self):
+        domain = [('model_id', '=', self.partner_model_id), ('operation', '=', 'capture')]
+        before = self.Metric.search(domain)
+        for index in range(3):
+            self.env['res.partner'].create({'name': f'Measured {index}'}).unlink()
+        self.assertEqual(self.Metric.search(domain), before)
+
+        # One row sums up the captures of the transaction
+        self.env.cr.precommit.run()
+        metric = self.Metric.search(domain) - before
+        self.assertEqual(len(metric), 1)
+        self.assertEqual((metric.event_count, metric.record_count), (3, 3))
+        entries = self.RecycleBin.search([('name', 'like', 'Measured %')])
+        self.assertEqual(metric.payload_bytes, sum(entries.mapped('payload_size')))
+
+    def test_metric_rollup(self):
+        yesterday = fields.Date.context_today(self.Metric) - timedelta(days=1)
+        values = {'model_id': self.bank_model_id, 'operation': 'restore'}
+        self.Metric.create([
+            {**values, 'date': yesterday, 'record_count': 2, 'payload_bytes': 100,
+             'duration_ms': 5.0, 'max_duration_ms': 5.0},
+            {**values, 'date': yesterday, 'record_count': 3, 'payload_bytes': 50,
+             'duration_ms': 7.0, 'max_duration_ms': 7.0},
+        ])
+        today_metric = self.Metric.create({**values, 'record_count': 1})
+        self.Metric._cron_rollup_metrics()
+
+        rolled = self.Metric.search([('date', '=', yesterday), ('model_id', '=', self.bank_model_id)])
+        self.assertEqual(len(rolled), 1)
+        self.assertTrue(rolled.rolled_up)
+        self.assertEqual(
+            (rolled.event_count, rolled.record_count, rolled.payload_bytes),
+            (2, 5, 150),
+        )
+        self.assertEqual(rolled.duration_ms, 12.0)
+        self.assertEqual(rolled.max_duration_ms, 7.0)
+        self.assertFalse(today_metric.rolled_up)
+
+        # A later rollup of the same day adds up to the existing row
+        self.Metric.create({**values, 'date': yesterday, 'record_count': 4, 'max_duration_ms': 9.0})
+        self.Metric._cron_rollup_metrics()
+        rolled = self.Metric.search([('date', '=', yesterday), ('model_id', '=', self.bank_model_id)])
+        self.assertEqual(len(rolled), 1)
+        self.assertEqual((rolled.event_count, rolled.record_count), (3, 9))
+        self.assertEqual(rolled.max_duration_ms, 9.0)
+
+        metrics = self.Metric._get_prometheus_metrics()
+        self.assertIn('recycle_bin_operations_total{model="res.partner.bank",operation="restore"} 4', metrics)